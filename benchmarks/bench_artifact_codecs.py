@@ -0,0 +1,74 @@
+# benchmarks/bench_artifact_codecs.py
+"""
+Encode time and size of the artifact codecs on a screen-like frame, and
+bytes stored per step (before + after) by the artifact store with and
+without tile deltas.
+
+Run:
+    python -m benchmarks.bench_artifact_codecs [--size 1920x1080] [--rounds 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from benchmarks.frames import screen_frame
+from os_automation.utils.artifact_store import ArtifactStore
+from os_automation.utils.artifacts import CODECS, ArtifactWriter, resolve_codec, save_frame
+
+
+def _store_bytes(frames, delta_chain):
+    store = ArtifactStore(tempfile.mkdtemp(prefix="bench_store_"),
+                          writer=ArtifactWriter(codec="png"), delta_chain=delta_chain)
+    store.begin_run("bench")
+    start = time.perf_counter()
+    for i, f in enumerate(frames):
+        store.record(Image.fromarray(f), f"f{i}.png")
+    store.end_run(collect=False)
+    return store.total_bytes(), (time.perf_counter() - start) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    img = Image.fromarray(screen_frame(width, height))
+    tmp = tempfile.mkdtemp(prefix="bench_codecs_")
+
+    print(f"frame: {width}x{height}, rounds: {args.rounds}")
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        img.save(os.path.join(tmp, "default.png"))
+    ms = (time.perf_counter() - start) / args.rounds * 1000.0
+    print(f"{'png (PIL default)':>18}: {ms:8.1f} ms  {os.path.getsize(os.path.join(tmp, 'default.png')) / 1e3:8.0f} kB")
+
+    for name in CODECS:
+        if resolve_codec(name) != name:
+            print(f"{name:>18}: unavailable")
+            continue
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            path = save_frame(img, os.path.join(tmp, "frame"), name)
+        ms = (time.perf_counter() - start) / args.rounds * 1000.0
+        print(f"{name:>18}: {ms:8.1f} ms  {os.path.getsize(path) / 1e3:8.0f} kB")
+
+    # steps: each "after" differs from its "before" around a 200x40 control
+    frames = [screen_frame(width, height)]
+    for step in range(args.rounds):
+        after = frames[-1].copy()
+        x, y = 100 + 150 * step, height // 3
+        after[y:y + 40, x:x + 200] = (30, 90, 200)
+        frames.append(after)
+    steps = len(frames) - 1
+    print(f"store, {steps} steps:")
+    for label, chain in (("full frames", 0), ("tile deltas", 8)):
+        size, ms = _store_bytes(frames, chain)
+        print(f"{label:>18}: {ms:8.1f} ms  {size / steps / 1e3:8.0f} kB/step")
+
+
+if __name__ == "__main__":
+    main()
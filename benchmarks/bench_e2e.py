@@ -0,0 +1,203 @@
+# benchmarks/bench_e2e.py
+"""
+End-to-end benchmark: Orchestrator.run on a virtual X display.
+
+Starts Xvfb, the mock OS-Atlas server (benchmarks.mock_services), the
+bundled chat-completions stand-in (os_automation.tools.llm_stub_server)
+scripted with the scenario plans and, per scenario, a deterministic Tk
+stand-in app (benchmarks.standin_apps). Each scenario is a fixed prompt with a
+scripted plan and an expected app state, so runs are reproducible on any
+Linux box with Xvfb and Tk and no network.
+
+Per-phase latencies (capture / detect / action / validate spans and whole
+steps) come from the run database written by the orchestrator; planning
+is timed around MainAIAgent.plan. Reports p50/p90/p99 and throughput.
+
+Run:
+    python -m benchmarks.bench_e2e [--rounds 3] [--llm-latency lognormal:-3,0.5] [--detector-latency 0.1]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+import yaml
+
+from benchmarks.mock_services import MockOSAtlas, rewrite_target
+from os_automation.tools.llm_stub_server import LLMStubServer
+
+SCREEN = "1280x800x24"
+
+SCENARIOS = [
+    {
+        "name": "calculator",
+        "app": "calculator",
+        "prompt": "Compute 12+7 in the calculator",
+        "steps": ["Click the 1 button", "Click the 2 button", "Click the + button",
+                  "Click the 7 button", "Click the = button"],
+        "expect": lambda s: s.get("display") == "19",
+    },
+    {
+        "name": "editor",
+        "app": "editor",
+        "prompt": "Write hello world in the editor and save it",
+        "steps": ["Click the text area", "Type 'hello world'", "Click the Save button"],
+        "expect": lambda s: s.get("saved") == "hello world",
+    },
+    {
+        "name": "form",
+        "app": "form",
+        "prompt": "Fill the form with name Ada and email ada@example.com, then submit",
+        "steps": ["Click the Name field", "Type 'Ada'", "Click the Email field",
+                  "Type 'ada@example.com'", "Click the Submit button"],
+        "expect": lambda s: (s.get("submitted") or {}).get("Email") == "ada@example.com",
+    },
+]
+
+
+def _plan(scenario):
+    return [{"step_id": i, "description": d} for i, d in enumerate(scenario["steps"], 1)]
+
+
+def llm_rules(scenarios):
+    """Stand-in script: scenario plans for the planner, short targets for rewrites,
+    "pass" for validator tie-breaks, "continue" for replanning."""
+    planner = "automation planner for"
+    rules = [{"name": f"plan:{s['name']}", "system": planner, "user": "^" + re.escape(s["prompt"]) + "$",
+              "response": yaml.safe_dump({"steps": _plan(s)}, sort_keys=False)} for s in scenarios]
+    return rules + [
+        {"name": "plan:unknown", "system": planner, "response": "steps: []\n"},
+        {"name": "rewrite", "system": "rewrite UI descriptions", "response": lambda _system, user: rewrite_target(user)},
+        {"name": "validate", "system": "(?i)validator", "response": "pass"},
+        {"name": "continue", "user": "Should we continue", "response": "continue"},
+    ]
+
+
+def _wait_for(path, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if os.path.exists(path):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def start_xvfb(display: str) -> subprocess.Popen:
+    if shutil.which("Xvfb") is None:
+        sys.exit("Xvfb not found (apt install xvfb)")
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", SCREEN, "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not _wait_for(f"/tmp/.X11-unix/X{display.lstrip(':')}", 5.0):
+        proc.kill()
+        sys.exit(f"Xvfb did not start on {display}")
+    return proc
+
+
+def _percentiles(values):
+    if not values:
+        return "n/a"
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return f"n={len(values):4d}  p50 {p50:8.1f}  p90 {p90:8.1f}  p99 {p99:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--display", default=":99")
+    parser.add_argument("--llm-latency", default="0", help="chat-completion latency, e.g. 0.2 or lognormal:-3,0.5")
+    parser.add_argument("--detector-latency", type=float, default=0.0, help="seconds per OS-Atlas call")
+    parser.add_argument("--scenario", action="append", help="run only these scenarios")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_e2e_")
+    xvfb = start_xvfb(args.display)
+    llm = LLMStubServer(llm_rules(SCENARIOS), latency=args.llm_latency).start()
+    atlas = MockOSAtlas(os.path.join(work, "*.layout.json"), latency=args.detector_latency).start()
+
+    # must be set before pyautogui / the agents are imported
+    os.environ.update({
+        "DISPLAY": args.display,
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": llm.base_url,
+        "OSATLAS_URL": atlas.predict_url,
+        "RUN_DB": os.path.join(work, "runs.sqlite"),
+        "ARTIFACT_DIR": os.path.join(work, "store"),
+    })
+    from os_automation.core.orchestrator import Orchestrator
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s["name"] in args.scenario]
+    plan_ms, outcomes = [], []
+    orch = Orchestrator(detection_name="osatlas", executor_name="pyautogui")
+    plan = orch.main_agent.plan
+
+    def timed_plan(prompt):
+        t0 = time.perf_counter()
+        try:
+            return plan(prompt)
+        finally:
+            plan_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    orch.main_agent.plan = timed_plan
+
+    started = time.perf_counter()
+    try:
+        for round_no in range(args.rounds):
+            for s in scenarios:
+                layout = os.path.join(work, f"{s['app']}.layout.json")
+                state = os.path.join(work, f"{s['app']}.state.json")
+                for p in (layout, state):
+                    if os.path.exists(p):
+                        os.remove(p)
+                app = subprocess.Popen(
+                    [sys.executable, "-m", "benchmarks.standin_apps", s["app"], "--layout", layout, "--state", state])
+                try:
+                    if not _wait_for(layout):
+                        raise RuntimeError(f"{s['app']} did not start")
+                    t0 = time.perf_counter()
+                    orch.run(s["prompt"])
+                    elapsed = time.perf_counter() - t0
+                    time.sleep(0.2)  # let the app write its last state
+                    ok = bool(s["expect"](_read_json(state)))
+                finally:
+                    app.terminate()
+                    app.wait(5)
+                    if os.path.exists(layout):
+                        os.remove(layout)
+                outcomes.append((s["name"], ok, elapsed))
+                print(f"round {round_no + 1} {s['name']:>10}: {'ok ' if ok else 'FAIL'} {elapsed:6.2f} s")
+    finally:
+        wall = time.perf_counter() - started
+        llm.stop()
+        atlas.stop()
+        xvfb.terminate()
+
+    db = orch.run_db
+    steps = db.durations()
+    print(f"\nscenarios: {len(outcomes)}, passed: {sum(ok for _, ok, _ in outcomes)}, "
+          f"wall: {wall:.1f} s, llm calls: {llm.calls}, detector calls: {atlas.calls}")
+    print("llm calls by rule: " + ", ".join(f"{k} {v}" for k, v in Counter(e["rule"] for e in llm.log).items()))
+    print(f"{'plan':>10}: {_percentiles(plan_ms)}")
+    for name in ("capture", "detect", "action", "validate"):
+        print(f"{name:>10}: {_percentiles(db.durations(name))}")
+    print(f"{'step':>10}: {_percentiles(steps)}")
+    print(f"throughput: {len(steps) / wall:.2f} steps/s, {len(outcomes) / wall * 60:.1f} scenarios/min")
+    print(f"artifacts: {work}")
+
+
+if __name__ == "__main__":
+    main()
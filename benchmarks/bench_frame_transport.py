@@ -0,0 +1,109 @@
+# benchmarks/bench_frame_transport.py
+"""
+Frame transport to a same-host detector server: multipart HTTP vs shared memory.
+
+Both servers run the same model-free stub (utils.shm_frames.stub_handler),
+so only transport costs are measured:
+  - http+encode: PNG-encode the frame, POST it, server decodes the PNG
+  - http       : POST an already saved PNG (current OSAtlasAdapter path)
+  - shm        : copy raw RGB into a ring slot, send the header over a Unix socket
+
+Run:
+    python -m benchmarks.bench_frame_transport [--size 1920x1080] [--rounds 30]
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+from PIL import Image
+
+from benchmarks.frames import screen_frame
+from os_automation.utils.shm_frames import SHM_AVAILABLE, ShmFrameClient, ShmFrameServer, stub_handler
+
+
+class _PredictHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        msg = BytesParser().parsebytes(
+            b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+        )
+        fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                  for part in msg.get_payload()}
+        frame = np.asarray(Image.open(io.BytesIO(fields["image"])).convert("RGB"))
+        out = json.dumps(stub_handler(frame, fields["text"].decode())).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+def _bench(fn, rounds):
+    fn()  # warm-up (connections, ring allocation)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    frame = screen_frame(width, height)
+
+    tmp = tempfile.mkdtemp(prefix="bench_transport_")
+    png_path = os.path.join(tmp, "frame.png")
+    Image.fromarray(frame).save(png_path)
+
+    http = ThreadingHTTPServer(("127.0.0.1", 0), _PredictHandler)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{http.server_address[1]}/predict"
+    session = requests.Session()
+
+    def via_http_encode():
+        buf = io.BytesIO()
+        Image.fromarray(frame).save(buf, format="PNG")
+        session.post(url, files={"image": buf.getvalue()}, data={"text": "ok"}).json()
+
+    def via_http_file():
+        with open(png_path, "rb") as f:
+            session.post(url, files={"image": f}, data={"text": "ok"}).json()
+
+    results = [
+        ("http+encode", _bench(via_http_encode, args.rounds)),
+        ("http", _bench(via_http_file, args.rounds)),
+    ]
+
+    if SHM_AVAILABLE:
+        sock_path = os.path.join(tmp, "det.sock")
+        shm_server = ShmFrameServer(sock_path)
+        threading.Thread(target=shm_server.serve_forever, daemon=True).start()
+        client = ShmFrameClient(sock_path, slot_bytes=frame.nbytes)
+        results.append(("shm", _bench(lambda: client.predict(frame, "ok"), args.rounds)))
+        client.close()
+        shm_server.shutdown()
+        shm_server.server_close()
+    http.shutdown()
+
+    print(f"frame: {width}x{height} RGB ({frame.nbytes / 1e6:.1f} MB, PNG {os.path.getsize(png_path) / 1e3:.0f} kB), "
+          f"rounds: {args.rounds}")
+    for name, ms in results:
+        print(f"{name:>12}: {ms:8.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
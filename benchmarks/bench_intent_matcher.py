@@ -0,0 +1,58 @@
+# benchmarks/bench_intent_matcher.py
+"""
+Micro-benchmark for the compiled intent matcher.
+
+Compares, over the planner corpus:
+  - linear : every rule of the table evaluated with plain substring scans
+  - scan   : single automaton pass (uncached)
+  - match  : cached entry point used by the step compiler
+  - compile: full compile_step() (matcher + CompiledStep construction)
+
+Run:
+    python -m benchmarks.bench_intent_matcher [--rounds 2000]
+"""
+import argparse
+import time
+
+from benchmarks.corpus import PLANNER_CORPUS
+from os_automation.core.intent_matcher import AHOCORASICK_AVAILABLE
+from os_automation.core.step_compiler import INTENT_MATCHER, compile_step
+
+
+def _bench(fn, corpus, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = list(PLANNER_CORPUS)
+
+    # Sanity: automaton and linear evaluation must agree on every description
+    for text in corpus:
+        a = [m.name for m in INTENT_MATCHER.scan(text)]
+        b = [m.name for m in INTENT_MATCHER.match_linear(text)]
+        if a != b:
+            raise SystemExit(f"matcher mismatch for {text!r}: {a} != {b}")
+
+    print(f"corpus: {len(corpus)} descriptions, {len(INTENT_MATCHER.rules)} rules, "
+          f"rounds: {args.rounds}, pyahocorasick: {AHOCORASICK_AVAILABLE}")
+    results = [
+        ("linear", _bench(INTENT_MATCHER.match_linear, corpus, args.rounds)),
+        ("scan", _bench(INTENT_MATCHER.scan, corpus, args.rounds)),
+        ("match", _bench(INTENT_MATCHER.match, corpus, args.rounds)),
+        ("compile", _bench(compile_step, corpus, max(1, args.rounds // 10))),
+    ]
+    for name, us in results:
+        print(f"{name:>8}: {us:8.2f} us/description")
+
+
+if __name__ == "__main__":
+    main()
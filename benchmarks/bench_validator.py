@@ -0,0 +1,171 @@
+# benchmarks/bench_validator.py
+"""
+Validator micro-benchmark on synthetic before/after frame pairs.
+
+Every ValidatorAgent branch (GUI / terminal typing, enter, click, keypress,
+default) is fed through validate_step_yaml() with a change pattern that
+makes it take its expensive path:
+
+  local  : a 200x40 control repaints around the bbox (click, keypress→OCR)
+  text   : a line of text strokes appears (typing, enter → OCR)
+  subtle : the whole frame brightens by 1 level (default → LLM tie-break)
+  none   : identical frames
+
+OCR and the LLM are stubs with a fixed latency by default (--ocr/--llm real
+use the installed OCR engine / the configured OpenAI endpoint). Frame-diff
+caches are cleared before each call unless --warm. Reports latency p50/p90
+and peak Python allocation (tracemalloc, separate pass) per branch.
+
+Run:
+    python -m benchmarks.bench_validator [--sizes 1080p,1440p,4k] [--rounds 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from benchmarks.frames import screen_frame
+from os_automation.agents import validator_agent
+from os_automation.agents.validator_agent import ValidatorAgent
+from os_automation.utils import frame_diff
+
+SIZES = {"1080p": (1920, 1080), "1440p": (2560, 1440), "4k": (3840, 2160)}
+CONTROL = (200, 40)
+
+# branch → (step description, executed event, bbox given, change pattern)
+CASES = {
+    "type_gui": ("Type 'hello'", "type", False, "text"),
+    "type_terminal": ("Type 'ls -la' in the terminal", "type", False, "text"),
+    "enter": ("Press Enter", "keypress", False, "text"),
+    "click": ("Click the Save button", "click", True, "local"),
+    "keypress": ("Press Tab", "keypress", False, "local"),
+    "default": ("Scroll down", "scroll", False, "subtle"),
+}
+
+
+def _pattern(before: np.ndarray, pattern: str, rng) -> np.ndarray:
+    after = before.copy()
+    h, w = before.shape[:2]
+    if pattern == "local":
+        x, y = w // 3, h // 3
+        after[y:y + CONTROL[1], x:x + CONTROL[0]] = (30, 90, 200)
+    elif pattern == "text":
+        y = h // 2
+        for x in range(40, min(w - 20, 900), 14):
+            after[y:y + 14, x:x + rng.integers(4, 11)] = 20
+    elif pattern == "subtle":
+        after = np.minimum(before.astype(np.int16) + 1, 255).astype(np.uint8)
+    return after
+
+
+class _StubCompletions:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, **_kwargs):
+        time.sleep(self.latency)
+        self.calls += 1
+        message = SimpleNamespace(content="pass")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _stub_ocr(latency: float, counter: list):
+    def ocr(image_path, region=None):
+        time.sleep(latency)
+        counter.append(region)
+        return "ls -la"
+    return ocr
+
+
+def _exec_yaml(description, event, before, after, bbox):
+    execution = {"status": "success", "event": event, "before": before, "after": after}
+    if bbox is not None:
+        execution["bbox"] = list(bbox)
+    return yaml.safe_dump({"step": {"step_id": 1, "description": description}, "execution": execution})
+
+
+def _clear_caches():
+    frame_diff._hash_file.cache_clear()
+    frame_diff._changed_tiles.cache_clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1080p,1440p,4k")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--ocr", choices=["stub", "real"], default="stub")
+    parser.add_argument("--llm", choices=["stub", "real"], default="stub")
+    parser.add_argument("--ocr-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--warm", action="store_true", help="keep frame-diff caches between calls")
+    args = parser.parse_args()
+
+    validator = ValidatorAgent()
+    llm = _StubCompletions(args.llm_latency)
+    if args.llm == "stub":
+        validator.llm_client = SimpleNamespace(chat=SimpleNamespace(completions=llm))
+    elif validator.llm_client is None:
+        parser.error("--llm real needs OPENAI_API_KEY (and OPENAI_BASE_URL for a local server)")
+
+    ocr_calls = []
+    saved = validator_agent.OCR_AVAILABLE, validator_agent._ocr
+    if args.ocr == "stub":
+        validator_agent.OCR_AVAILABLE = True
+        validator_agent._ocr = _stub_ocr(args.ocr_latency, ocr_calls)
+    elif not validator_agent.OCR_AVAILABLE:
+        parser.error("--ocr real needs tesserocr or pytesseract")
+
+    tmp = tempfile.mkdtemp(prefix="bench_validator_")
+    rng = np.random.default_rng(0)
+    print(f"ocr: {args.ocr}, llm: {args.llm}, rounds: {args.rounds}, caches: {'warm' if args.warm else 'cold'}")
+    print(f"{'size':>6} {'branch':>14} {'method':>28} {'p50 ms':>8} {'p90 ms':>8} {'peak MB':>8} {'ocr':>4} {'llm':>4}")
+    try:
+        for size in args.sizes.split(","):
+            width, height = SIZES[size]
+            before = screen_frame(width, height)
+            before_path = os.path.join(tmp, f"{size}_before.png")
+            Image.fromarray(before).save(before_path, compress_level=1)
+            for branch, (description, event, with_bbox, pattern) in CASES.items():
+                after_path = os.path.join(tmp, f"{size}_{branch}_after.png")
+                Image.fromarray(_pattern(before, pattern, rng)).save(after_path, compress_level=1)
+                bbox = (width // 3, height // 3) + CONTROL if with_bbox else None
+                exec_yaml = _exec_yaml(description, event, before_path, after_path, bbox)
+
+                ocr_calls.clear()
+                llm_before = llm.calls
+                times, report = [], {}
+                for _ in range(args.rounds):
+                    if not args.warm:
+                        _clear_caches()
+                    t0 = time.perf_counter()
+                    report = yaml.safe_load(validator.validate_step_yaml(exec_yaml))
+                    times.append((time.perf_counter() - t0) * 1000.0)
+
+                if not args.warm:
+                    _clear_caches()
+                tracemalloc.start()
+                validator.validate_step_yaml(exec_yaml)
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+
+                details = report.get("details") or {}
+                method = details.get("method") or details.get("reason") or (
+                    "ocr_excerpt" if "ocr_excerpt" in details else "-")
+                if details.get("llm_override") or details.get("llm_confirmation"):
+                    method += "+llm"
+                p50, p90 = np.percentile(times, [50, 90])
+                print(f"{size:>6} {branch:>14} {method:>28} {p50:8.1f} {p90:8.1f} {peak:8.1f} "
+                      f"{len(ocr_calls) / (args.rounds + 1):4.1f} {(llm.calls - llm_before) / (args.rounds + 1):4.1f}")
+    finally:
+        validator_agent.OCR_AVAILABLE, validator_agent._ocr = saved
+
+
+if __name__ == "__main__":
+    main()
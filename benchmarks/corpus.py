@@ -0,0 +1,77 @@
+# benchmarks/corpus.py
+"""
+Step descriptions in the shape MainAIAgent.plan() produces.
+Taken from the planner prompt examples and real runs of tests/agents_testing.py.
+"""
+
+PLANNER_CORPUS = [
+    # OS launcher / apps
+    "Press Super key",
+    "Press Windows key",
+    "Press Command+Space",
+    "Type 'Text Editor'",
+    "Type 'Calculator'",
+    "Type 'Settings'",
+    "Press Enter",
+    "Wait for application to open",
+    "Wait 3 seconds",
+    # Text editor
+    "Type 'Meeting at 5'",
+    "Press Ctrl+S",
+    "Type '/home/emptyops/Documents/Vedanshi/TestingNote.txt'",
+    # Terminal
+    "Open Terminal",
+    "Type 'gnome-screenshot -f /home/emptyops/Documents/imageTest.png'",
+    "Run command 'ls -la'",
+    "Type 'code --new-window'",
+    "Type 'ftp ftp.emptyops.com 21'",
+    "Type 'get index.php ~/Downloads/index.php'",
+    # VS Code
+    "Click VSCode Explorer icon",
+    "Click New File button",
+    "Click File menu",
+    "Click Save As option",
+    "Click filename field",
+    "Click Run button",
+    "Click Extensions icon",
+    "Press Ctrl+N",
+    "Type 'print(\"Hello World\")'",
+    "Press Ctrl+Shift+X",
+    "Type 'Python'",
+    "Click Install button",
+    "Select all text",
+    "Paste from clipboard",
+    "Press Backspace",
+    "Press Delete",
+    # Calculator
+    "Type '10'",
+    "Press '+'",
+    "Type '500'",
+    "Press '='",
+    # File explorer
+    "Open file explorer",
+    "Click Documents folder",
+    "Double click Vedanshi folder in file list",
+    "Right click empty area",
+    "Scroll Down",
+    "Scroll Up",
+    "Press Arrow Down",
+    # Browser-ish GUI steps
+    "Open the browser",
+    "Open Chrome",
+    "Click browser address bar",
+    "Type 'dogs'",
+    "Click first result",
+    "Click first link",
+    "Click Compose button",
+    "Click To field",
+    "Click Subject field",
+    "Click Send button",
+    "Click profile icon",
+    "Click three dots menu",
+    "Click OK",
+    "Click Close",
+    "Click play button",
+    "Click Wi-Fi toggle button",
+    "Click search box",
+]
@@ -0,0 +1,14 @@
+# benchmarks/frames.py
+"""Synthetic screen-like frames for the frame / artifact benchmarks."""
+import numpy as np
+
+
+def screen_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Flat panels, a title bar and text-like strokes (uint8 RGB)."""
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), 235, dtype=np.uint8)
+    frame[: height // 12] = (45, 45, 48)
+    for _ in range(400):
+        x, y = rng.integers(0, width - 80), rng.integers(0, height - 12)
+        frame[y:y + 10, x:x + rng.integers(20, 80)] = rng.integers(0, 120)
+    return frame
@@ -0,0 +1,133 @@
+# benchmarks/mock_services.py
+"""
+Local stand-in for the detection service the agents call.
+
+  MockOSAtlas : the OS-Atlas /predict API; answers from the layout files
+                written by benchmarks.standin_apps (no model, exact bboxes)
+
+It runs on 127.0.0.1 in a daemon thread and can add a fixed latency. The
+chat-completions side is the bundled os_automation.tools.llm_stub_server;
+rewrite_target() is the query rewrite the benchmark scripts into it.
+"""
+import glob
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+
+class _Server:
+    handler = BaseHTTPRequestHandler
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.httpd.service = self
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, status: int, body: Dict):
+        out = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def log_message(self, *args):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# OS-Atlas
+# ---------------------------------------------------------------------------
+def _norm(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+def match_widget(layouts: Dict[str, list], text: str) -> Optional[list]:
+    """Widget whose label equals the query (else the longest label it contains) → [x1, y1, x2, y2]."""
+    query = _norm(text.split("\n")[0]).strip("'\"")
+    best = None
+    for label, (x, y, w, h) in layouts.items():
+        lab = _norm(label)
+        if lab == query:
+            return [x, y, x + w, y + h]
+        if re.search(r"(^|\W)" + re.escape(lab) + r"($|\W)", query) and (best is None or len(lab) > best[0]):
+            best = (len(lab), [x, y, x + w, y + h])
+    return best[1] if best else None
+
+
+class _OSAtlasHandler(_Handler):
+    def do_POST(self):
+        service = self.server.service
+        if not self.path.rstrip("/").endswith("/predict"):
+            return self._reply(404, {"error": "not found"})  # no batch endpoint (OSATLAS_BATCH_URL unset)
+        body = self._body()
+        msg = BytesParser().parsebytes(
+            b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body)
+        fields = {p.get_param("name", header="content-disposition"): p.get_payload(decode=True)
+                  for p in msg.get_payload()}
+        text = (fields.get("text") or b"").decode()
+        time.sleep(service.latency)
+        service.calls += 1
+        box = match_widget(service.widgets(), text)
+        self._reply(200, {"response": box} if box else {"response": None})
+
+
+class MockOSAtlas(_Server):
+    handler = _OSAtlasHandler
+
+    def __init__(self, layout_glob: str, latency: float = 0.0):
+        super().__init__(latency)
+        self.layout_glob = layout_glob
+
+    def widgets(self) -> Dict[str, list]:
+        out = {}
+        for path in glob.glob(self.layout_glob):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    out.update(json.load(f)["widgets"])
+            except (OSError, ValueError, KeyError):
+                continue
+        return out
+
+    @property
+    def predict_url(self) -> str:
+        return self.url + "/predict"
+
+
+# ---------------------------------------------------------------------------
+# Query rewrites
+# ---------------------------------------------------------------------------
+_QUOTED = re.compile(r"['\"]([^'\"]+)['\"]")
+_VERBS = re.compile(r"^(double click|right click|click|press|select|open|tap)\s+(on\s+)?(the\s+)?", re.I)
+_NOUNS = re.compile(r"\s+(button|key|icon|link|tab)$", re.I)
+
+
+def rewrite_target(description: str) -> str:
+    m = _QUOTED.search(description)
+    if m:
+        return m.group(1)
+    return _NOUNS.sub("", _VERBS.sub("", description.strip())).strip()
@@ -0,0 +1,172 @@
+# benchmarks/standin_apps.py
+"""
+Deterministic Tk stand-in apps for the end-to-end benchmark.
+
+Each app opens at a fixed position and size with fixed fonts, then writes
+  - its widget layout (screen bboxes keyed by label) to --layout, read by
+    the mock OS-Atlas server to answer detection queries, and
+  - its state (display / text / form values) to --state on every change,
+    read by the benchmark to check the scenario outcome.
+
+Run:
+    python -m benchmarks.standin_apps calculator --layout /tmp/l.json --state /tmp/s.json
+"""
+import argparse
+import json
+import os
+import tkinter as tk
+
+FONT = ("DejaVu Sans Mono", 16)
+GEOMETRY = "640x480+0+0"
+
+
+def _write_json(path, data):
+    if not path:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class StandinApp:
+    name = "app"
+
+    def __init__(self, layout_path=None, state_path=None):
+        self.layout_path = layout_path
+        self.state_path = state_path
+        self.root = tk.Tk(className=self.name)
+        self.root.title(self.name)
+        self.root.geometry(GEOMETRY)
+        self.root.resizable(False, False)
+        self.widgets = {}  # label → widget
+        self.build()
+        self.root.after(200, self._publish_layout)
+
+    def build(self):
+        raise NotImplementedError
+
+    def state(self):
+        raise NotImplementedError
+
+    def add(self, label, widget):
+        self.widgets[label] = widget
+        return widget
+
+    def changed(self, *_):
+        _write_json(self.state_path, self.state())
+
+    def _publish_layout(self):
+        self.root.update_idletasks()
+        layout = {
+            label: [w.winfo_rootx(), w.winfo_rooty(), w.winfo_width(), w.winfo_height()]
+            for label, w in self.widgets.items()
+        }
+        _write_json(self.layout_path, {"app": self.name, "widgets": layout})
+        self.changed()
+
+    def run(self):
+        self.root.mainloop()
+
+
+class Calculator(StandinApp):
+    name = "calculator"
+
+    def build(self):
+        self.expr = ""
+        self.display = tk.Label(self.root, text="0", font=FONT, anchor="e", width=20, relief="sunken")
+        self.display.grid(row=0, column=0, columnspan=4, padx=8, pady=8, sticky="we")
+        self.add("display", self.display)
+        keys = ["7", "8", "9", "/", "4", "5", "6", "*", "1", "2", "3", "-", "C", "0", "=", "+"]
+        for i, key in enumerate(keys):
+            b = tk.Button(self.root, text=key, font=FONT, width=4, command=lambda k=key: self.press(k))
+            b.grid(row=1 + i // 4, column=i % 4, padx=4, pady=4)
+            self.add(key, b)
+
+    def press(self, key):
+        if key == "C":
+            self.expr = ""
+        elif key == "=":
+            try:
+                # only digits and + - * / reach here
+                self.expr = str(eval(self.expr or "0", {"__builtins__": {}}))
+            except Exception:
+                self.expr = "error"
+        else:
+            self.expr = ("" if self.expr == "error" else self.expr) + key
+        self.display.config(text=self.expr or "0")
+        self.changed()
+
+    def state(self):
+        return {"display": self.display.cget("text")}
+
+
+class TextEditor(StandinApp):
+    name = "editor"
+
+    def build(self):
+        bar = tk.Frame(self.root)
+        bar.pack(fill="x")
+        self.add("Save", tk.Button(bar, text="Save", font=FONT, command=self.save)).pack(side="left", padx=4, pady=4)
+        self.add("Clear", tk.Button(bar, text="Clear", font=FONT, command=self.clear)).pack(side="left", padx=4, pady=4)
+        self.text = self.add("text area", tk.Text(self.root, font=FONT, width=40, height=14))
+        self.text.pack(padx=8, pady=8)
+        self.text.bind("<<Modified>>", self._modified)
+        self.saved = None
+
+    def _modified(self, _event):
+        self.text.edit_modified(False)
+        self.changed()
+
+    def save(self):
+        self.saved = self.text.get("1.0", "end-1c")
+        self.changed()
+
+    def clear(self):
+        self.text.delete("1.0", "end")
+
+    def state(self):
+        return {"text": self.text.get("1.0", "end-1c"), "saved": self.saved}
+
+
+class Form(StandinApp):
+    name = "form"
+
+    def build(self):
+        self.vars = {}
+        for row, field in enumerate(("Name", "Email", "City")):
+            tk.Label(self.root, text=field, font=FONT, width=8, anchor="w").grid(row=row, column=0, padx=8, pady=8)
+            var = self.vars[field] = tk.StringVar()
+            var.trace_add("write", self.changed)
+            self.add(f"{field} field", tk.Entry(self.root, textvariable=var, font=FONT, width=24)).grid(
+                row=row, column=1, padx=8, pady=8)
+        self.agree = tk.BooleanVar()
+        self.add("Agree checkbox", tk.Checkbutton(self.root, text="Agree", font=FONT, variable=self.agree,
+                                                 command=self.changed)).grid(row=3, column=1, sticky="w")
+        self.add("Submit", tk.Button(self.root, text="Submit", font=FONT, command=self.submit)).grid(
+            row=4, column=1, sticky="w", pady=12)
+        self.submitted = None
+
+    def submit(self):
+        self.submitted = {k: v.get() for k, v in self.vars.items()}
+        self.changed()
+
+    def state(self):
+        return {"fields": {k: v.get() for k, v in self.vars.items()},
+                "agree": bool(self.agree.get()), "submitted": self.submitted}
+
+
+APPS = {cls.name: cls for cls in (Calculator, TextEditor, Form)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("app", choices=sorted(APPS))
+    parser.add_argument("--layout", default=None)
+    parser.add_argument("--state", default=None)
+    args = parser.parse_args()
+    APPS[args.app](args.layout, args.state).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1175,17 +1175,37 @@ import uuid
 import yaml
 import logging
 import random
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, Tuple
 
 import platform
 import subprocess
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from PIL import Image
-import pyautogui
+
+# pyautogui needs a display at import time; without one the executor still
+# loads for offline work on recorded frames (replay, normalization)
+try:
+    import pyautogui
+except Exception:
+    pyautogui = None
 
 from os_automation.agents.validator_agent import ValidatorAgent
+from os_automation.core.adapters import has_native_batch
 from os_automation.core.registry import registry
+from os_automation.core.step_compiler import compile_step, local_ui_query, map_event
+from os_automation.core.tal import CompiledStep, ExecutionResult, StepOutcome, ValidationResult
+from os_automation.tools.ocr import normalize
+from os_automation.tools.ui_atlas import UIAtlas
+from os_automation.utils.artifact_store import get_artifact_store, prune_files
+from os_automation.utils.artifacts import save_frame
+from os_automation.utils.frame_diff import changed_tiles, frame_hash, pad_region
+from os_automation.utils.llm import llm_configured
+from os_automation.utils.tracing import record_attempt, record_detection, span
+from os_automation.utils.window_info import active_window_info, window_fingerprint
 
 # try to import MainAIAgent only if available (used for optional rewrite)
 try:
@@ -1194,11 +1214,40 @@ except Exception:
     MainAIAgent = None
 
 logger = logging.getLogger(__name__)
-pyautogui.FAILSAFE = True
+if pyautogui is not None:
+    pyautogui.FAILSAFE = True
+
+# screen size assumed for point-only detections when no display is attached
+HEADLESS_SCREEN_SIZE = (1920, 1080)
 
 # Default attempts: retry 3 times; after that, escalate to planner
 DEFAULT_MAX_ATTEMPTS = 3
 
+# Batch detection: how many upcoming click targets to resolve with the current one
+BATCH_LOOKAHEAD = 3
+BATCH_EVENTS = ("click", "double_click", "right_click")
+# held (resolved-ahead) bboxes are all dropped once this share of the frame changed
+HELD_MAX_CHANGE = 0.2
+
+# Coarse-to-fine detection on large frames: locate on a COARSE_WIDTH-wide
+# downscale, then re-query on a full-resolution crop (at least FINE_CROP)
+COARSE_WIDTH = 1280
+FINE_CROP = (960, 640)
+
+# Speculative detection: max wait for a prefetched result of the step about to run,
+# and for a wrong guess to finish before the real detection (it then runs on in the background)
+SPECULATION_WAIT = 60.0
+SPECULATION_STALE_WAIT = 0.5
+
+# rewritten detector queries kept per description (least recently used dropped first)
+QUERY_CACHE_SIZE = 256
+
+# detector result types that mean "not found" (bbox None)
+DETECTION_MISS_TYPES = {
+    "none", "no_match", "no_label", "no_tree", "no_bbox", "error",
+    "ocr_unavailable", "a11y_unavailable",
+}
+
 # ---------- OUTPUT PATH (GLOBAL, IMPORT-SAFE) ----------
 _THIS_FILE = os.path.abspath(__file__)
 
@@ -1213,18 +1262,43 @@ PROJECT_PARENT = os.path.dirname(_REPO_ROOT)
 DEFAULT_OUTPUT_DIR = os.path.join(
     PROJECT_PARENT, "os_automation_output"
 )
+
+# working frames older than this are swept from output_dir at the end of a run
+# (their pixels stay in the artifact store, referenced by the run manifest)
+WORKING_FRAME_TTL = float(os.getenv("WORKING_FRAME_TTL", 24 * 3600))
 # ------------------------------------------------------
 
 
+# `screen` below is what frames are captured from and keys are sent to:
+# pyautogui, or an in-memory VirtualScreen (tools.virtual_screen) offering
+# the same calls. Each ExecutorAgent holds its own (ExecutorAgent.screen).
+def _screen_size(screen: Any) -> Tuple[int, int]:
+    if screen is None:
+        return HEADLESS_SCREEN_SIZE
+    width, height = screen.size()
+    return int(width), int(height)
+
+
+def _settle(seconds: float, screen: Any = None) -> None:
+    """Wait for the UI to catch up with an input; a virtual screen never lags."""
+    if not getattr(screen, "instant", False):
+        time.sleep(seconds)
+
+
 # -------------------------------------------------------
 # Screenshot helper
 # -------------------------------------------------------
-def _screenshot(output_dir: str, prefix: str = "shot") -> str:
+def _screenshot(output_dir: str, prefix: str = "shot", screen: Any = pyautogui) -> str:
     fname = f"{prefix}_{int(time.time())}_{uuid.uuid4().hex[:6]}.png"
     path = os.path.join(output_dir, fname)
     try:
-        img = pyautogui.screenshot()
-        img.save(path)
+        with span("capture"):
+            img = screen.screenshot()
+            # working copy: fast PNG, read right away by detection / validation
+            save_frame(img, path)
+        store = get_artifact_store()
+        if store is not None:
+            store.submit(img, fname)  # deduplicated audit copy: digest, delta and encoding off this thread
         return path
     except Exception as e:
         logger.debug("screenshot failed: %s", e)
@@ -1254,6 +1328,9 @@ class ExecutorAgent:
         chrome_preference: bool = True,
         output_dir: str = None,
         max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        ui_atlas: Optional[UIAtlas] = None,
+        speculative: Optional[bool] = None,
+        coarse_min_width: Optional[int] = None,
     ):
         self.execution_mode = "gui"  # or "terminal"
 
@@ -1267,8 +1344,36 @@ class ExecutorAgent:
         self.max_attempts = int(max_attempts)
 
         self.output_dir = output_dir or DEFAULT_OUTPUT_DIR
-
+        self._detectors: Dict[str, Any] = {}
+        self._last_detection: Optional[Dict[str, Any]] = None
+        # upcoming ops (set by the orchestrator) and bboxes resolved ahead in a batch
+        self._upcoming: List[CompiledStep] = []
+        self._held: Dict[str, Any] = {}
+        # speculative mode: next step's rewrite + detection run while this step validates
+        if speculative is None:
+            speculative = os.getenv("SPECULATIVE_DETECTION", "0").lower() in ("1", "true", "yes")
+        self.speculative = bool(speculative)
+        self._spec_pool: Optional[ThreadPoolExecutor] = None
+        self._speculation: Optional[tuple] = None  # (target, shot, future)
+        # LLM rewrites run beside capture; results memoized per description (temperature 0)
+        self._rewrite_pool: Optional[ThreadPoolExecutor] = None
+        self._queries: "OrderedDict[str, str]" = OrderedDict()
+        self._queries_lock = threading.Lock()
+        # frames at least this wide are detected coarse-to-fine (0 disables)
+        if coarse_min_width is None:
+            coarse_min_width = int(os.getenv("COARSE_TO_FINE_MIN_WIDTH", 2560))
+        self.coarse_min_width = int(coarse_min_width)
         os.makedirs(self.output_dir, exist_ok=True)
+        # per output_dir (UI_ATLAS_PATH shares one atlas between them)
+        if ui_atlas is None:
+            ui_atlas = UIAtlas(os.getenv("UI_ATLAS_PATH") or os.path.join(self.output_dir, "ui_atlas.json"))
+        self.atlas = ui_atlas
+        self.store = get_artifact_store()  # opt-in: ARTIFACT_DIR
+
+        # an executor adapter with its own screen (virtual_screen) replaces the display
+        # for this executor only
+        screen = getattr(registry.get_adapter(self.default_executor), "screen", None)
+        self.screen = screen if screen is not None else pyautogui
 
         try:
             pyautogui.FAILSAFE = True
@@ -1279,7 +1384,7 @@ class ExecutorAgent:
         # If not available, use a lightweight fallback rewrite function.
         self._rewrite_fn: Optional[Callable[[str], str]] = None
         try:
-            if MainAIAgent and os.getenv("OPENAI_API_KEY"):
+            if MainAIAgent and llm_configured():
                 ma = MainAIAgent()
                 # use the agent's method for rewrite (may call LLM)
                 self._rewrite_fn = ma.rewrite_ui_query
@@ -1296,7 +1401,13 @@ class ExecutorAgent:
         factory = registry.get_adapter(self.default_detection)
         if factory is None:
             return None
-        return factory() if callable(factory) else factory
+        # keep one instance per factory: detectors hold per-frame caches
+        cached = self._detectors.get(self.default_detection)
+        if cached is not None and cached[0] is factory:
+            return cached[1]
+        adapter = factory() if callable(factory) else factory
+        self._detectors[self.default_detection] = (factory, adapter)
+        return adapter
 
     def _get_executor_adapter(self):
         factory = registry.get_adapter(self.default_executor)
@@ -1304,6 +1415,185 @@ class ExecutorAgent:
             return None
         return factory() if callable(factory) else factory
 
+    # ====================================================================
+    # UI ATLAS / DETECTION FEEDBACK
+    # ====================================================================
+    def _atlas_lookup(self, shot: str) -> Optional[List[int]]:
+        last = self._last_detection
+        if self.atlas is None or not last or not last["fingerprint"] or not last["target"]:
+            return None
+        try:
+            with Image.open(shot) as frame:
+                bbox = self.atlas.lookup(last["fingerprint"], last["target"], frame, last["window"])
+        except Exception as e:
+            logger.debug("atlas lookup failed: %s", e)
+            return None
+        if bbox is not None:
+            logger.info("UI atlas hit for '%s' in %s", last["target"], last["fingerprint"])
+        return bbox
+
+    def _learn_detection(self, bbox: Optional[List[int]]) -> None:
+        """
+        Feed a detection that passed validation back to the UI atlas and to
+        the detector (if it learns).
+        """
+        last, self._last_detection = self._last_detection, None
+        if not last or not bbox:
+            return
+
+        if self.atlas is not None and last["fingerprint"] and last["target"]:
+            try:
+                with Image.open(last["step"]["image_path"]) as frame:
+                    self.atlas.record(last["fingerprint"], last["target"], frame, bbox, last["window"])
+            except Exception as e:
+                logger.debug("atlas record failed: %s", e)
+
+        learn = getattr(last["detector"], "learn", None)
+        if learn is None:
+            return
+        try:
+            learn(last["step"], {"bbox": list(bbox)})
+        except Exception as e:
+            logger.debug("detector learn() failed: %s", e)
+
+    def begin_run(self, **meta) -> Optional[str]:
+        """Start a run manifest in the artifact store; returns the run id."""
+        if self.store is None:
+            return None
+        return self.store.begin_run(**meta).run_id
+
+    def end_run(self) -> None:
+        """Close the run manifest, apply store retention and sweep stale working frames."""
+        if self.store is None:
+            return
+        try:
+            self.store.end_run()
+            prune_files(self.output_dir, WORKING_FRAME_TTL)
+        except Exception as e:
+            logger.warning("artifact retention failed: %s", e)
+
+    def set_upcoming(self, ops: List[CompiledStep]) -> None:
+        """Ops that follow the step about to run (batch detection look-ahead)."""
+        self._upcoming = list(ops or [])
+
+    def _upcoming_steps(self, shot: str, app: str) -> List[Dict[str, Any]]:
+        steps = []
+        for op in self._upcoming:
+            if len(steps) >= BATCH_LOOKAHEAD:
+                break
+            if op.action != "visual" or op.event not in BATCH_EVENTS:
+                continue
+            if normalize(op.description) in self._held:
+                continue
+            # local query only: look-ahead must not cost an LLM call per target
+            steps.append({"image_path": shot, "description": op.description, "app": app,
+                          "text": op.target_query or self._local_rewrite_ui_query(op.description)})
+        return steps
+
+    def _held_lookup(self, target: str, shot: str) -> Optional[List[int]]:
+        """
+        A bbox resolved ahead of time is reused only if no changed tile
+        between its screenshot and the current one touches it. A larger
+        change (new page / dialog: HELD_MAX_CHANGE of the frame) drops
+        every held bbox.
+        """
+        held = self._held.pop(target, None)
+        if held is None:
+            return None
+        held_shot, bbox = held
+        if held_shot != shot:
+            try:
+                with Image.open(held_shot) as a, Image.open(shot) as b:
+                    size = a.size
+                    if a.size != b.size:
+                        self._held = {}
+                        return None
+            except Exception:
+                return None
+            if not frame_hash(held_shot) or not frame_hash(shot):
+                return None
+            tiles = changed_tiles(held_shot, shot)
+            if sum(tw * th for _, _, tw, th in tiles) >= HELD_MAX_CHANGE * size[0] * size[1]:
+                logger.debug("Screen changed since '%s' was resolved ahead; dropping held bboxes", target)
+                self._held = {}
+                return None
+            x, y, w, h = pad_region(tuple(bbox), 8, size[0], size[1])
+            for tx, ty, tw, th in tiles:
+                if tx < x + w and x < tx + tw and ty < y + h and y < ty + th:
+                    logger.debug("Held bbox for '%s' is stale (screen changed there)", target)
+                    return None
+        logger.info("Reusing detection resolved ahead for '%s'", target)
+        return list(bbox)
+
+    # ====================================================================
+    # SPECULATIVE PREFETCH
+    # ====================================================================
+    def _speculate(self, shot: Optional[str]) -> None:
+        """
+        Start the next step's rewrite + detection on this step's post-action
+        frame while it is being validated. Used by _detect_bbox only if the
+        next step's pre-state still matches that frame (see _held_lookup).
+        """
+        if not self.speculative or not shot or not self._upcoming or self._speculation:
+            return
+        op = self._upcoming[0]
+        target = normalize(op.description)
+        if op.action != "visual" or not target or target in self._held:
+            return
+        det = self._get_detection_adapter()
+        if det is None:
+            return
+        app = (active_window_info().get("app") or "").lower()
+        if self._spec_pool is None:
+            self._spec_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        future = self._spec_pool.submit(self._speculative_detect, det, op, shot, app)
+        self._speculation = (target, shot, future)
+
+    def _speculative_detect(self, det, op: CompiledStep, shot: str, app: str) -> Optional[List[int]]:
+        query = self._cached_query(op.description, op)
+        res = det.detect({"image_path": shot, "text": query, "description": op.description, "app": app})
+        return self._normalize_detection(res)
+
+    def _collect_speculation(self, target: str) -> None:
+        spec, self._speculation = self._speculation, None
+        if spec is None:
+            return
+        spec_target, spec_shot, future = spec
+        if spec_target != target:
+            # wrong guess (retry / replanned step): give it a moment to free the
+            # detector, but never hold the real detection up behind it
+            if not future.cancel():
+                try:
+                    future.result(timeout=SPECULATION_STALE_WAIT)
+                except Exception:
+                    logger.debug("Stale speculative detection still running; not waiting for it")
+            return
+        try:
+            bbox = future.result(timeout=SPECULATION_WAIT)
+        except Exception as e:
+            logger.debug("Speculative detection failed: %s", e)
+            return
+        if bbox is not None:
+            self._held[target] = (spec_shot, bbox)
+
+    def _reject_detection(self) -> None:
+        """
+        Validation failed: an atlas-provided position is no longer trusted,
+        and a detector that learns (template tier) forgets what it answered.
+        """
+        last, self._last_detection = self._last_detection, None
+        if not last:
+            return
+        if last["source"] == "atlas" and self.atlas is not None:
+            self.atlas.invalidate(last["fingerprint"], last["target"])
+        unlearn = getattr(last["detector"], "unlearn", None)
+        if last["source"] != "detector" or unlearn is None or not isinstance(last.get("response"), dict):
+            return
+        try:
+            unlearn(last["step"], last["response"])
+        except Exception as e:
+            logger.debug("detector unlearn() failed: %s", e)
+
     # ====================================================================
     # LOCAL REWRITE (fallback)
     # ====================================================================
@@ -1312,53 +1602,7 @@ class ExecutorAgent:
         Lightweight heuristic to convert vague step descriptions into short
         queries that detectors handle better.
         """
-        desc = (description or "").lower()
-        # common mappings
-        mapping = {
-            "search box": "address bar",
-            "search": "address bar",
-            "address bar": "address bar",
-            "search box": "search",
-            "searchbar": "search",
-            "search bar": "search",
-            "google search": "search",
-            "vscode explorer": "explorer",
-            "explorer icon": "explorer",
-            "new file": "new file",
-            "new file button": "new file",
-            "file name field": "file name",
-            "filename field": "file name",
-            "first result": "first result",
-            "first link": "first result",
-            "profile icon": "profile icon",
-            "menu": "menu",
-            "settings": "settings",
-            "three dots": "menu",
-            "submit": "submit",
-            "ok": "ok button",
-            "close": "close button",
-            "play": "play button",
-            "pause": "pause button",
-        }
-        for k, v in mapping.items():
-            if k in desc:
-                return v
-
-        # extract quoted text
-        m = re.search(r"['\"]([^'\"]{1,60})['\"]", description)
-        if m:
-            return m.group(1)
-
-        # last-resort: pick last noun-like token
-        tokens = re.findall(r"[a-zA-Z0-9_-]{2,50}", desc)
-        if tokens:
-            # prefer short tokens near start that indicate UI
-            for t in tokens:
-                if t in ("button", "icon", "link", "menu", "search", "address", "file", "run"):
-                    return t
-            return tokens[-1]
-
-        return description.strip()
+        return local_ui_query(description)
     
     
     # ====================================================================
@@ -1397,41 +1641,93 @@ class ExecutorAgent:
     # DETECT BBOX
     # ====================================================================
     def _detect_bbox(
-        self, description: str, image_path: Optional[str] = None
+        self,
+        description: str,
+        image_path: Optional[str] = None,
+        op: Optional[CompiledStep] = None,
+        shot_prefix: str = "shot",
     ) -> Optional[List[int]]:
         """
         Use detection adapter (OSAtlas or other) to find target region.
 
         Returns bbox as [x, y, w, h] in SCREEN coordinates or None.
+        Without image_path the screenshot is taken here, while the query
+        rewrite runs on a worker thread.
+
         Strategy:
           - rewrite query to something detector-friendly
-          - call detector with image + text
-          - prefer structured bbox from response
-          - if only point provided, create an adaptive bbox sized by screen dims
-          - if raw_output contains coords, parse them
+          - reuse a bbox held from an earlier batch / the UI atlas
+          - call detector with image + text; batched with the upcoming
+            targets when the detector supports it, coarse-to-fine on
+            large (high-DPI) frames
+          - normalize the response (_normalize_detection)
         """
         det = self._get_detection_adapter()
         if not det:
             logger.warning("No detection adapter configured.")
             return None
 
-        shot = image_path or _screenshot(self.output_dir, "shot")
+        # rewrite needs only the description: overlap it with capture + encode
+        query_future = self._query_future(description, op)
+        shot = image_path or _screenshot(self.output_dir, shot_prefix, self.screen)
+        query = query_future.result()
+
+        window = active_window_info()
+        det_step = {"image_path": shot, "text": query, "description": description,
+                    "app": (window.get("app") or "").lower()}
+        # remembered so the validation verdict can be fed back (atlas / learning detectors)
+        self._last_detection = {
+            "detector": det,
+            "step": det_step,
+            "source": "detector",
+            "fingerprint": window_fingerprint(window),
+            "target": normalize(description),
+            "window": window.get("geometry"),
+        }
 
-        # Prepare a short query to improve detection
-        query = description or ""
-        try:
-            if self._rewrite_fn:
-                rq = self._rewrite_fn(description)
-                if isinstance(rq, str) and rq.strip():
-                    query = rq
-        except Exception as e:
-            logger.debug("rewrite_ui_query failed: %s", e)
-            # fallback to local cleanup
-            query = self._local_rewrite_ui_query(description)
+        # Resolved ahead (batch / speculation) and that part of the screen is unchanged
+        self._collect_speculation(normalize(description))
+        bbox = self._held_lookup(normalize(description), shot)
+        if bbox is not None:
+            self._last_detection["source"] = "held"
+            return bbox
+
+        # Known element of this window → no detector call
+        bbox = self._atlas_lookup(shot)
+        if bbox is not None:
+            self._last_detection["source"] = "atlas"
+            return bbox
+
+        if self._is_large_frame(shot):
+            # only the model tier sees the downscale; template / OCR tiers keep full resolution
+            if hasattr(det, "detect_with"):
+                res = det.detect_with(dict(det_step), self._tier_detect)
+            else:
+                res = self._tier_detect(det, dict(det_step))
+            self._last_detection["response"] = res
+            return self._normalize_detection(res)
+
+        upcoming = self._upcoming_steps(shot, det_step["app"]) if has_native_batch(det) else []
+        if upcoming:
+            # one upload / one model pass for this target and the next ones
+            try:
+                results = det.detect_batch(shot, [dict(det_step)] + upcoming)
+            except Exception as e:
+                logger.debug("Batch detection error: %s", e)
+                results = None
+            if results and len(results) == len(upcoming) + 1:
+                self._held = {}
+                # a detector that lost its batch route mid-call answers the look-ahead with misses
+                for up, up_res in zip(upcoming, results[1:]):
+                    up_bbox = self._normalize_detection(up_res)
+                    if up_bbox is not None:
+                        self._held[normalize(up["description"])] = (shot, up_bbox)
+                self._last_detection["response"] = results[0]
+                return self._normalize_detection(results[0])
 
         # Try detector call with both text keys (some adapters accept different names)
         try:
-            res = det.detect({"image_path": shot, "text": query})
+            res = det.detect(dict(det_step))
         except TypeError:
             try:
                 res = det.detect({"image_path": shot, "description": query})
@@ -1442,6 +1738,154 @@ class ExecutorAgent:
             logger.debug("Detection error (1): %s", e)
             return None
 
+        # raw response kept for the run database (offline replay of the parsing)
+        self._last_detection["response"] = res
+        return self._normalize_detection(res)
+
+    def _traced_detect(self, description: str, op: CompiledStep,
+                       shot_prefix: str = "shot") -> Optional[List[int]]:
+        """_detect_bbox() under a "detect" span, with its outcome recorded for the run database."""
+        t0 = time.perf_counter()
+        with span("detect"):
+            bbox = self._detect_bbox(description, op=op, shot_prefix=shot_prefix)
+        last = self._last_detection or {}
+        record_detection(
+            detector=self.default_detection,
+            source=last.get("source"),
+            target=last.get("target"),
+            found=bbox is not None,
+            duration_ms=(time.perf_counter() - t0) * 1000.0,
+            shot=(last.get("step") or {}).get("image_path"),
+            response=last.get("response"),
+            bbox=bbox,
+        )
+        return bbox
+
+    # ====================================================================
+    # COARSE-TO-FINE (high-DPI frames)
+    # ====================================================================
+    def _is_large_frame(self, shot: str) -> bool:
+        if self.coarse_min_width <= 0:
+            return False
+        try:
+            with Image.open(shot) as frame:
+                return frame.width >= self.coarse_min_width
+        except Exception:
+            return False
+
+    def _tier_detect(self, adapter, step: Dict[str, Any]) -> Any:
+        """One detector on a large frame: coarse-to-fine if it accepts a downscale."""
+        if getattr(adapter, "downscale_ok", False):
+            return self._coarse_to_fine(adapter, step)
+        return adapter.detect(step)
+
+    def _detect_on(self, det, det_step: Dict[str, Any], frame: Image.Image, path: str) -> Any:
+        try:
+            frame.save(path)
+            return det.detect(dict(det_step, image_path=path))
+        except Exception as e:
+            logger.debug("Detection error on %s: %s", path, e)
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _coarse_to_fine(self, det, det_step: Dict[str, Any]) -> Any:
+        """
+        Locate the target on a downscaled frame, then re-query the detector
+        on a full-resolution crop around it. Returns the detector result
+        with its bbox in SCREEN coordinates (None when nothing was found).
+        """
+        shot = det_step["image_path"]
+        base = os.path.splitext(shot)[0]
+        with Image.open(shot) as frame:
+            frame = frame.convert("RGB")
+        W, H = frame.size
+        scale = COARSE_WIDTH / float(W)
+
+        coarse_img = frame.resize((COARSE_WIDTH, max(1, int(round(H * scale)))), Image.BILINEAR)
+        res = self._detect_on(det, det_step, coarse_img, base + "_coarse.png")
+        if isinstance(res, dict) and res.get("space") == "screen":
+            # detector ignores the pixels (accessibility tree): already screen coordinates
+            return res
+        coarse = self._normalize_detection(res, screen=coarse_img.size)
+        if coarse is None:
+            return res
+        found = dict(res) if isinstance(res, dict) else {"confidence": 1.0, "raw": res}
+
+        bx, by = int(coarse[0] / scale), int(coarse[1] / scale)
+        bw, bh = max(1, int(coarse[2] / scale)), max(1, int(coarse[3] / scale))
+        cw, ch = min(W, max(FINE_CROP[0], 3 * bw)), min(H, max(FINE_CROP[1], 3 * bh))
+        x0 = min(max(0, bx + bw // 2 - cw // 2), W - cw)
+        y0 = min(max(0, by + bh // 2 - ch // 2), H - ch)
+
+        fine_res = self._detect_on(det, det_step, frame.crop((x0, y0, x0 + cw, y0 + ch)), base + "_fine.png")
+        if isinstance(fine_res, dict) and fine_res.get("space") == "screen":
+            return fine_res
+        fine = self._normalize_detection(fine_res, screen=(cw, ch))
+        if fine is not None and fine[0] >= 0 and fine[1] >= 0 and fine[0] + fine[2] <= cw and fine[1] + fine[3] <= ch:
+            logger.info("Coarse-to-fine: refined '%s' on a %dx%d crop", det_step.get("text"), cw, ch)
+            return dict(found, bbox=[fine[0] + x0, fine[1] + y0, fine[2], fine[3]], point=None, refined=True)
+
+        logger.debug("Coarse-to-fine: no refinement, using the scaled coarse bbox")
+        return dict(found, bbox=[bx, by, bw, bh], point=None, refined=False)
+
+    def _remote_rewrite(self) -> bool:
+        return bool(self._rewrite_fn) and self._rewrite_fn != self._local_rewrite_ui_query
+
+    def _cached_query(self, description: str, op: Optional[CompiledStep] = None) -> str:
+        """_query_for(), memoized per description when it costs an LLM call."""
+        if not self._remote_rewrite():
+            return self._query_for(description, op)
+        key = description or ""
+        with self._queries_lock:
+            query = self._queries.get(key)
+            if query is not None:
+                self._queries.move_to_end(key)
+                return query
+        query = self._query_for(description, op)
+        with self._queries_lock:
+            self._queries[key] = query
+            while len(self._queries) > QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+        return query
+
+    def _query_future(self, description: str, op: Optional[CompiledStep] = None) -> Future:
+        """Detector query; a remote rewrite runs on a worker thread."""
+        if not self._remote_rewrite() or (description or "") in self._queries:
+            future: Future = Future()
+            future.set_result(self._cached_query(description, op))
+            return future
+        if self._rewrite_pool is None:
+            self._rewrite_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rewrite")
+        return self._rewrite_pool.submit(self._cached_query, description, op)
+
+    def _query_for(self, description: str, op: Optional[CompiledStep] = None) -> str:
+        """Short detector-friendly query for a step description."""
+        query = description or ""
+        try:
+            if self._rewrite_fn == self._local_rewrite_ui_query and op and op.target_query:
+                query = op.target_query
+            elif self._rewrite_fn:
+                rq = self._rewrite_fn(description)
+                if isinstance(rq, str) and rq.strip():
+                    query = rq
+        except Exception as e:
+            logger.debug("rewrite_ui_query failed: %s", e)
+            # fallback to local cleanup (already compiled into the op)
+            query = op.target_query if op and op.target_query else self._local_rewrite_ui_query(description)
+        return query
+
+    def _normalize_detection(self, res: Any, screen: Optional[Tuple[int, int]] = None) -> Optional[List[int]]:
+        """
+        Detector result → bbox [x, y, w, h] in SCREEN coordinates or None.
+          - prefer structured bbox from response
+          - if only point provided, create an adaptive bbox sized by screen dims
+            (`screen`, default: this executor's screen size)
+          - if raw_output contains coords, parse them
+        """
         # Normalize response into dict if adapter returned something else
         if not isinstance(res, dict):
             # maybe direct coordinate or list
@@ -1457,8 +1901,9 @@ class ExecutorAgent:
             if parsed:
                 # create small adaptive bbox from point
                 cx, cy = int(parsed[0]), int(parsed[1])
-                w = max(30, int(pyautogui.size().width * 0.03))
-                h = max(20, int(pyautogui.size().height * 0.03))
+                screen_w, screen_h = screen or _screen_size(self.screen)
+                w = max(30, int(screen_w * 0.03))
+                h = max(20, int(screen_h * 0.03))
                 return [cx - w // 2, cy - h // 2, w, h]
             return None
 
@@ -1467,6 +1912,10 @@ class ExecutorAgent:
         dtype = res.get("type")
         conf = float(res.get("confidence", 0.0) or 0.0)
 
+        # Explicit miss: don't go digging for numbers in its diagnostics
+        if not bbox and not res.get("point") and dtype in DETECTION_MISS_TYPES:
+            return None
+
         # If bbox exists and looks sane (x,y,w,h)
         if bbox and len(bbox) >= 4:
             try:
@@ -1488,7 +1937,7 @@ class ExecutorAgent:
         if point and isinstance(point, (list, tuple)) and len(point) >= 2:
             try:
                 cx, cy = int(point[0]), int(point[1])
-                screen_w, screen_h = pyautogui.size()
+                screen_w, screen_h = screen or _screen_size(self.screen)
                 # box size ~ 3% of screen width/height, clamped
                 bw = max(28, int(screen_w * 0.03))
                 bh = max(20, int(screen_h * 0.03))
@@ -1520,7 +1969,7 @@ class ExecutorAgent:
             nums = [float(n) for n in re.findall(r"-?\d+\.?\d*", raw)]
             if len(nums) >= 2:
                 cx, cy = int(nums[0]), int(nums[1])
-                screen_w, screen_h = pyautogui.size()
+                screen_w, screen_h = screen or _screen_size(self.screen)
                 bw = max(28, int(screen_w * 0.03))
                 bh = max(20, int(screen_h * 0.03))
                 return [cx - bw // 2, cy - bh // 2, bw, bh]
@@ -1532,7 +1981,7 @@ class ExecutorAgent:
         if bbox:
             try:
                 x, y, w, h = bbox
-                screen_w, screen_h = pyautogui.size()
+                screen_w, screen_h = screen or _screen_size(self.screen)
                 if x < 0 or y < 0 or x + w > screen_w or y + h > screen_h:
                     logger.warning("Discarding out-of-screen bbox")
                     return None
@@ -1551,87 +2000,7 @@ class ExecutorAgent:
         Interpret a natural-language step description and convert it into a
         low-level event structure for PyAutoGUIAdapter.
         """
-        
-        import re
-
-        desc = (description or "").strip()
-        low = desc.lower()
-
-        # TYPE 'text'
-        m = re.search(r"type\s+['\"]([^'\"]+)['\"]", desc, re.IGNORECASE)
-        if m:
-            return {"event": "type", "text": m.group(1)}
-
-        m2 = re.search(r"['\"]([^'\"]+)['\"]", desc)
-        if "type" in low and m2:
-            return {"event": "type", "text": m2.group(1)}
-
-        if "press enter" in low or low == "enter":
-            return {"event": "keypress", "key": "enter"}
-
-        if "backspace" in low:
-            return {"event": "keypress", "key": "backspace"}
-
-        if "delete" in low and "backspace" not in low:
-            return {"event": "keypress", "key": "delete"}
-        
-        # Generic Ctrl+<Key> hotkeys
-        m = re.search(r"press\s+ctrl\+([a-z])", low)
-        if m:
-            return {"event": "hotkey", "keys": ["ctrl", m.group(1)]}
-
-        if "select all" in low or "ctrl+a" in low:
-            return {"event": "hotkey", "keys": ["ctrl", "a"]}
-
-        if "paste" in low or "ctrl+v" in low:
-            return {"event": "hotkey", "keys": ["ctrl", "v"]}
-
-        if "arrow left" in low:
-            return {"event": "keypress", "key": "left"}
-        if "arrow right" in low:
-            return {"event": "keypress", "key": "right"}
-        if "arrow up" in low:
-            return {"event": "keypress", "key": "up"}
-        if "arrow down" in low:
-            return {"event": "keypress", "key": "down"}
-
-        if "scroll down" in low:
-            return {"event": "scroll", "direction": "down"}
-        if "scroll up" in low:
-            return {"event": "scroll", "direction": "up"}
-
-        if "double click" in low:
-            return {"event": "double_click"}
-        if "right click" in low or "context menu" in low:
-            return {"event": "right_click"}
-        
-        # Calculator / operator buttons
-        m = re.search(r"press\s+'([^']+)'", low)
-        if m:
-            symbol = m.group(1)
-            return {"event": "keypress", "key": symbol}
-
-
-        if "click" in low or "open " in low or "select " in low:
-            return {"event": "click"}
-
-        if "wait" in low or "pause" in low or low in ("noop", "no-op"):
-            return {"event": "noop"}
-        
-        if "press super key" in low:
-            return {"event": "hotkey", "keys": ["win"]}
-
-        if "press windows key" in low:
-            return {"event": "hotkey", "keys": ["win"]}
-
-        if "press command+space" in low:
-            return {"event": "hotkey", "keys": ["command", "space"]}
-
-        # Fallback: treat as typing (e.g., ambiguous "Type something...")
-        return {
-            "event": "unknown",
-            "error": "ambiguous_step_no_action"
-        }
+        return map_event(description)
 
 
     # ====================================================================
@@ -1641,14 +2010,15 @@ class ExecutorAgent:
         self,
         bbox: Optional[List[int]],
         event_spec: Dict[str, Any],
-    ) -> Dict[str, Any]:
+        step_id: int = 0,
+    ) -> ExecutionResult:
         """
         Use PyAutoGUIAdapter (or configured executor adapter) to perform
         the low-level event. Always screenshot BEFORE & AFTER.
         """
         exec_adapter = self._get_executor_adapter()
 
-        before = _screenshot(self.output_dir, "before")
+        before = _screenshot(self.output_dir, "before", self.screen)
         
         # -------------------------------
         # 🛡️ Adapter capability validation
@@ -1665,27 +2035,18 @@ class ExecutorAgent:
                 event,
                 supported,
             )
-            after = _screenshot(self.output_dir, "after_unsupported_event")
-            return {
-                "status": "failed",
-                "before": before,
-                "after": after,
-                "error": f"unsupported_event:{event}",
-                "event": event,
-            }
+            after = _screenshot(self.output_dir, "after_unsupported_event", self.screen)
+            return self._execution(
+                step_id, "failed", before, after,
+                event=event, error=f"unsupported_event:{event}",
+            )
 
 
         if not exec_adapter:
             logger.error("No executor adapter configured.")
-            after = _screenshot(self.output_dir, "after")
-            return {
-                "status": "failed",
-                "before": before,
-                "after": after,
-                "error": "no_executor_adapter",
-            }
+            after = _screenshot(self.output_dir, "after", self.screen)
+            return self._execution(step_id, "failed", before, after, error="no_executor_adapter")
 
-        event = event_spec.get("event")
         text = event_spec.get("text")
         key = event_spec.get("key")
         keys = event_spec.get("keys")
@@ -1712,39 +2073,86 @@ class ExecutorAgent:
             adapter_result = exec_adapter.execute(step_for_adapter)
         except Exception as e:
             logger.exception("Executor adapter error: %s", e)
-            after = _screenshot(self.output_dir, "after")
-            return {
-                "status": "failed",
-                "before": before,
-                "after": after,
-                "error": str(e),
-                "adapter_step": step_for_adapter,
-            }
+            after = _screenshot(self.output_dir, "after", self.screen)
+            return self._execution(
+                step_id, "failed", before, after,
+                error=str(e), raw={"adapter_step": step_for_adapter},
+            )
 
-        after = _screenshot(self.output_dir, "after")
+        after = _screenshot(self.output_dir, "after", self.screen)
 
         if not isinstance(adapter_result, dict):
             adapter_result = {"status": "success" if adapter_result else "failed"}
 
-        return {
-            "status": adapter_result.get("status", "failed"),
-            "before": before,
-            "after": after,
-            "bbox": bbox,
-            "event": event,
-            "adapter_raw": adapter_result,
-        }
+        return self._execution(
+            step_id, adapter_result.get("status", "failed"), before, after,
+            event=event, bbox=bbox, raw={"adapter_raw": adapter_result},
+        )
+
+    def _execution(
+        self,
+        step_id: int,
+        status: str,
+        before: Optional[str],
+        after: Optional[str],
+        event: Optional[str] = None,
+        bbox: Optional[List[int]] = None,
+        error: Optional[str] = None,
+        raw: Optional[Dict[str, Any]] = None,
+    ) -> ExecutionResult:
+        return ExecutionResult(
+            step_id=step_id,
+            repo_used=self.default_executor,
+            decided_event=event or "",
+            status=status,
+            screenshot_before=before,
+            screenshot_after=after,
+            bbox=bbox,
+            error=error,
+            raw=raw,
+        )
+
+    def _trusted(self, execution: ExecutionResult, escalate_on_fail: bool = True) -> StepOutcome:
+        """Outcome for short-circuit steps that are not pixel-validated."""
+        passed = execution.status == "success"
+        return StepOutcome(
+            attempts=1,
+            last=execution,
+            validation=ValidationResult(validation_status="pass" if passed else "fail"),
+            escalate=not passed and escalate_on_fail,
+        )
+
+    def _validated(
+        self,
+        op: CompiledStep,
+        execution: ExecutionResult,
+        validator_agent: ValidatorAgent,
+        attempts: int = 1,
+    ) -> StepOutcome:
+        self._speculate(execution.screenshot_after)
+        with span("validate"):
+            validation = validator_agent.validate(op, execution)
+        record_attempt(attempt=attempts, status=execution.status,
+                       validation_status=validation.validation_status, bbox=execution.bbox,
+                       event=execution.decided_event, llm_verdict=validation.llm_verdict,
+                       before=execution.screenshot_before, after=execution.screenshot_after)
+        return StepOutcome(
+            attempts=attempts,
+            last=execution,
+            validation=validation,
+            escalate=not validation.passed,
+        )
 
     # ====================================================================
     # SPECIAL SYSTEM ACTIONS
     # ====================================================================
-    def _handle_open_terminal(self, step: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_open_terminal(self, op: CompiledStep, validator_agent: Optional[ValidatorAgent] = None) -> StepOutcome:
         self.execution_mode = "terminal"
 
-        desc = (step.get("description") or "").strip()
+        desc = op.description.strip()
         logger.info("Handling special step: %s", desc)
 
-        before = _screenshot(self.output_dir, "before")
+        before = _screenshot(self.output_dir, "before", self.screen)
         home = os.path.expanduser("~")
         system = platform.system()
 
@@ -1797,37 +2205,24 @@ class ExecutorAgent:
                 subprocess.Popen(["cmd.exe"], cwd=home)
                 time.sleep(1.2)
 
-            after = _screenshot(self.output_dir, "after")
+            after = _screenshot(self.output_dir, "after", self.screen)
 
-            exec_res = {"status": "success", "before": before, "after": after}
+            exec_res = self._execution(op.step_id, "success", before, after)
 
         except Exception as e:
-            after = _screenshot(self.output_dir, "after")
-            exec_res = {
-                "status": "failed",
-                "before": before,
-                "after": after,
-                "error": str(e),
-            }
+            after = _screenshot(self.output_dir, "after", self.screen)
+            exec_res = self._execution(op.step_id, "failed", before, after, error=str(e))
 
-        exec_yaml = yaml.safe_dump({"step": step, "execution": exec_res}, sort_keys=False)
-        validation_yaml = self.validator.validate_step_yaml(exec_yaml)
-        validation = yaml.safe_load(validation_yaml)
-
-        return {
-            "execution": {"attempts": 1, "last": exec_res},
-            "validation": validation,
-            "escalate": validation.get("validation_status") != "pass",
-        }
+        return self._validated(op, exec_res, validator_agent or self.validator)
 
 
-    def _handle_open_browser(self, step: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_open_browser(self, op: CompiledStep, validator_agent: Optional[ValidatorAgent] = None) -> StepOutcome:
         self.execution_mode = "gui"
 
-        desc = (step.get("description") or "").strip()
+        desc = op.description.strip()
         logger.info("Handling special step: %s", desc)
 
-        before = _screenshot(self.output_dir, "before")
+        before = _screenshot(self.output_dir, "before", self.screen)
         system = platform.system()
 
         try:
@@ -1881,32 +2276,19 @@ class ExecutorAgent:
                 webbrowser.open("https://google.com", new=1)
 
             time.sleep(2.5)
-            after = _screenshot(self.output_dir, "after")
+            after = _screenshot(self.output_dir, "after", self.screen)
 
-            exec_res = {"status": "success", "before": before, "after": after}
+            exec_res = self._execution(op.step_id, "success", before, after)
         except Exception as e:
-            after = _screenshot(self.output_dir, "after")
-            exec_res = {
-                "status": "failed",
-                "before": before,
-                "after": after,
-                "error": str(e),
-            }
+            after = _screenshot(self.output_dir, "after", self.screen)
+            exec_res = self._execution(op.step_id, "failed", before, after, error=str(e))
 
-        exec_yaml = yaml.safe_dump({"step": step, "execution": exec_res}, sort_keys=False)
-        validation_yaml = self.validator.validate_step_yaml(exec_yaml)
-        validation = yaml.safe_load(validation_yaml)
-
-        return {
-            "execution": {"attempts": 1, "last": exec_res},
-            "validation": validation,
-            "escalate": validation.get("validation_status") != "pass",
-        }
+        return self._validated(op, exec_res, validator_agent or self.validator)
 
 
-    def _handle_open_file_explorer(self, step):
+    def _handle_open_file_explorer(self, op: CompiledStep) -> StepOutcome:
         system = platform.system()
-        before = _screenshot(self.output_dir, "before")
+        before = _screenshot(self.output_dir, "before", self.screen)
 
         try:
             if system == "Linux":
@@ -1917,189 +2299,118 @@ class ExecutorAgent:
                 subprocess.Popen(["explorer.exe"])
 
             time.sleep(1.5)
-            after = _screenshot(self.output_dir, "after")
+            after = _screenshot(self.output_dir, "after", self.screen)
 
-            return {
-                "execution": {"attempts": 1, "last": {"status": "success", "before": before, "after": after}},
-                "validation": {"validation_status": "pass"},
-                "escalate": False
-            }
+            return self._trusted(self._execution(op.step_id, "success", before, after))
 
         except Exception as e:
-            after = _screenshot(self.output_dir, "after")
-            return {
-                "execution": {"attempts": 1, "last": {"status": "failed", "error": str(e)}},
-                "validation": {"validation_status": "fail"},
-                "escalate": True
-            }
+            return self._trusted(self._execution(op.step_id, "failed", None, None, error=str(e)))
 
     # ====================================================================
-    # MAIN YAML EXECUTION FOR ONE STEP
+    # COMPILED STEP (parsed once per plan by the orchestrator)
     # ====================================================================
-    def run_step_yaml(
+    def _compiled_op(self, step: Dict[str, Any]) -> CompiledStep:
+        """
+        Return the CompiledStep carried by the step, compiling it here only
+        when the caller did not (e.g. direct run_step_yaml usage).
+        """
+        op = step.get("op")
+        if isinstance(op, CompiledStep):
+            return op
+        if isinstance(op, dict):
+            return CompiledStep(**op)
+        return compile_step(step)
+
+    # ====================================================================
+    # MAIN EXECUTION FOR ONE STEP (in-process, typed)
+    # ====================================================================
+    def run_step_op(
         self,
-        step_yaml: str,
-        validator_agent: Optional[ValidatorAgent],
+        op: CompiledStep,
+        validator_agent: Optional[ValidatorAgent] = None,
         max_attempts: Optional[int] = None,
-        original_prompt: Optional[str] = None,
-    ) -> str:
-            
+    ) -> StepOutcome:
+        """
+        Execute one compiled step and validate it. Executions and verdicts
+        are passed to/from the ValidatorAgent as typed objects; YAML is only
+        produced by run_step_yaml() for callers that want it.
+        """
         validator_agent = validator_agent or self.validator
         max_attempts = max_attempts or self.max_attempts
 
-        step = yaml.safe_load(step_yaml) or {}
-        description = step.get("description") or ""
-        step_id = step.get("step_id", 0)
-        low = description.lower().strip()
+        description = op.description
+        step_id = op.step_id
         
         # 🚫 SAFETY NET: Browser tasks must not reach GUI executor when MCP is preferred
-        if self.chrome_preference and any(
-            k in low for k in (
-                "browser", "website", "click link", "fill form",
-                "submit", "login", "inspect", "devtools"
-            )
-        ):
+        if self.chrome_preference and op.browser_task:
             raise RuntimeError(
                 "Browser automation detected in ExecutorAgent. "
                 "Task should have been routed to MCP."
             )
         
         
-        is_gui_type = low.startswith("type ")
-        is_gui_enter = low == "press enter" or low == "enter"
+        is_gui_type = op.action == "gui_type"
+        is_gui_enter = op.action == "gui_enter"
         
         # ============================================================
         # OS LAUNCHER HOTKEY SHORT-CIRCUIT
         # ============================================================
-        if "press super key" in low or "press windows key" in low:
-            before = _screenshot(self.output_dir, "before_launcher")
-            pyautogui.press("win")
-            time.sleep(0.6)
-            after = _screenshot(self.output_dir, "after_launcher")
-
-            return yaml.safe_dump(
-                {
-                    "execution": {
-                        "attempts": 1,
-                        "last": {
-                            "status": "success",
-                            "before": before,
-                            "after": after,
-                            "event": "os_launcher",
-                        },
-                    },
-                    "validation": {"validation_status": "pass"},
-                    "escalate": False,
-                },
-                sort_keys=False,
-            )
+        if op.action == "os_launcher":
+            before = _screenshot(self.output_dir, "before_launcher", self.screen)
+            self.screen.press("win")
+            _settle(0.6, self.screen)
+            after = _screenshot(self.output_dir, "after_launcher", self.screen)
 
-        if "press command+space" in low:
-            before = _screenshot(self.output_dir, "before_launcher")
-            pyautogui.hotkey("command", "space")
-            time.sleep(0.6)
-            after = _screenshot(self.output_dir, "after_launcher")
-
-            return yaml.safe_dump(
-                {
-                    "execution": {
-                        "attempts": 1,
-                        "last": {
-                            "status": "success",
-                            "before": before,
-                            "after": after,
-                            "event": "spotlight",
-                        },
-                    },
-                    "validation": {"validation_status": "pass"},
-                    "escalate": False,
-                },
-                sort_keys=False,
-            )
+            return self._trusted(self._execution(step_id, "success", before, after, event="os_launcher"))
+
+        if op.action == "spotlight":
+            before = _screenshot(self.output_dir, "before_launcher", self.screen)
+            self.screen.hotkey("command", "space")
+            _settle(0.6, self.screen)
+            after = _screenshot(self.output_dir, "after_launcher", self.screen)
+
+            return self._trusted(self._execution(step_id, "success", before, after, event="spotlight"))
         
         # ============================================================
         # GUI TYPE / ENTER SHORT-CIRCUIT (NO BBOX, NO RETRY)
         # ============================================================
         if is_gui_type:
-            before = _screenshot(self.output_dir, "before_gui_type")
+            before = _screenshot(self.output_dir, "before_gui_type", self.screen)
             try:
-                m = re.search(r"['\"]([^'\"]+)['\"]", description)
-                if m:
-                    # pyautogui.write(m.group(1), interval=0.03)
-                    text = m.group(1)
-                    pyautogui.write(text, interval=0.03)
+                if op.text:
+                    text = op.text
+                    self.screen.write(text, interval=0.03)
 
                     # ⏳ HARD SAFETY DELAY (length-aware)
-                    time.sleep(max(0.3, len(text) * 0.02))
+                    _settle(max(0.3, len(text) * 0.02), self.screen)
                     
-                after = _screenshot(self.output_dir, "after_gui_type")
-
-                return yaml.safe_dump({
-                    "execution": {
-                            "attempts": 1,
-                        "last": {
-                            "status": "success",
-                            "before": before,
-                            "after": after,
-                            "event": "gui_type"
-                        }
-                    },
-                    "validation": {"validation_status": "pass"},
-                    "escalate": False
-                }, sort_keys=False)
+                after = _screenshot(self.output_dir, "after_gui_type", self.screen)
+
+                return self._trusted(self._execution(step_id, "success", before, after, event="gui_type"))
 
             except Exception as e:
-                after = _screenshot(self.output_dir, "after_gui_type")
-                return yaml.safe_dump({
-                    "execution": {
-                        "attempts": 1,
-                        "last": {
-                            "status": "failed",
-                            "before": before,
-                            "after": after,
-                            "error": str(e)
-                        }
-                    },
-                    "validation": {"validation_status": "fail"},
-                    "escalate": True
-                }, sort_keys=False)
+                after = _screenshot(self.output_dir, "after_gui_type", self.screen)
+                return self._trusted(self._execution(step_id, "failed", before, after, error=str(e)))
 
 
         if is_gui_enter:
-            before = _screenshot(self.output_dir, "before_gui_enter")
-            pyautogui.press("enter")
-            after = _screenshot(self.output_dir, "after_gui_enter")
-
-            return yaml.safe_dump({
-                "execution": {
-                    "attempts": 1,
-                    "last": {
-                        "status": "success",
-                        "before": before,
-                        "after": after,
-                        "event": "gui_enter"
-                    }
-                },
-                "validation": {"validation_status": "pass"},
-                "escalate": False
-            }, sort_keys=False)
+            before = _screenshot(self.output_dir, "before_gui_enter", self.screen)
+            self.screen.press("enter")
+            after = _screenshot(self.output_dir, "after_gui_enter", self.screen)
+
+            return self._trusted(self._execution(step_id, "success", before, after, event="gui_enter"))
             
             
         # ============================================================
         # WAIT / PAUSE SHORT-CIRCUIT (NO BBOX, NO RETRY)
         # ============================================================
-        if "wait" in low or "pause" in low:
+        if op.action == "wait":
             logger.info("Wait step detected → sleeping")
 
-            before = _screenshot(self.output_dir, "before_wait")
+            before = _screenshot(self.output_dir, "before_wait", self.screen)
 
-            # Default wait duration
-            duration = 1.5
-
-            # Optional: parse "wait 3 seconds"
-            m = re.search(r"wait\s+(\d+(?:\.\d+)?)", low)
-            if m:
-                duration = float(m.group(1))
+            # Duration parsed at compile time ("wait 3 seconds" → 3.0)
+            duration = op.duration
 
             time.sleep(duration)
             
@@ -2107,149 +2418,111 @@ class ExecutorAgent:
             # if "wait for application to open" in low:
             #     self.execution_mode = "gui"
 
-            after = _screenshot(self.output_dir, "after_wait")
-
-            return yaml.safe_dump(
-                {
-                    "execution": {
-                        "attempts": 1,
-                        "last": {
-                            "status": "success",
-                            "before": before,
-                            "after": after,
-                            "event": "wait",
-                            "duration": duration,
-                        },
-                    },
-                    "validation": {"validation_status": "pass"},
-                    "escalate": False,
-                },
-                sort_keys=False,
-            )
+            after = _screenshot(self.output_dir, "after_wait", self.screen)
+
+            return self._trusted(self._execution(
+                step_id, "success", before, after, event="wait", raw={"duration": duration}
+            ))
 
         
         # ============================================================
         # TERMINAL MODE SHORT-CIRCUIT (CRITICAL FIX)
         # ============================================================
         is_terminal_type = (
-            self.execution_mode == "terminal" and low.startswith("type ")
+            self.execution_mode == "terminal" and op.action == "gui_type"
         )
 
         is_terminal_enter = (
-            self.execution_mode == "terminal"
-            and ("press enter" in low or low == "enter")
+            self.execution_mode == "terminal" and op.hints.is_enter
         )
 
 
         if is_terminal_type or is_terminal_enter:
             logger.info("Terminal input detected → bypassing bbox detection")
 
-            before = _screenshot(self.output_dir, "before_terminal")
+            before = _screenshot(self.output_dir, "before_terminal", self.screen)
 
             try:
                 # DO NOT click anywhere
                 # DO NOT detect bbox
                 if is_terminal_type:
-                    m = re.search(r"['\"]([^'\"]+)['\"]", description)
-                    if m:
-                        # pyautogui.write(m.group(1), interval=0.03)
-                        text = m.group(1)
-                        pyautogui.write(text, interval=0.03)
+                    if op.text:
+                        text = op.text
+                        self.screen.write(text, interval=0.03)
 
                         # ⏳ terminal buffers need a bit more time
-                        time.sleep(max(0.4, len(text) * 0.025))
+                        _settle(max(0.4, len(text) * 0.025), self.screen)
 
 
                 if is_terminal_enter:
-                    pyautogui.press("enter")
+                    self.screen.press("enter")
 
-                after = _screenshot(self.output_dir, "after_terminal")
+                after = _screenshot(self.output_dir, "after_terminal", self.screen)
 
-                exec_res = {
-                    "status": "success",
-                    "before": before,
-                    "after": after,
-                    "event": "terminal_input",
-                }
+                exec_res = self._execution(step_id, "success", before, after, event="terminal_input")
 
             except Exception as e:
-                after = _screenshot(self.output_dir, "after_terminal")
-                exec_res = {
-                    "status": "failed",
-                    "before": before,
-                    "after": after,
-                    "error": str(e),
-                }
+                after = _screenshot(self.output_dir, "after_terminal", self.screen)
+                exec_res = self._execution(step_id, "failed", before, after, error=str(e))
 
-            exec_yaml = yaml.safe_dump({"step": step, "execution": exec_res}, sort_keys=False)
-            validation_yaml = validator_agent.validate_step_yaml(exec_yaml)
-            validation = yaml.safe_load(validation_yaml)
-
-            return yaml.safe_dump(
-                {
-                    "execution": {"attempts": 1, "last": exec_res},
-                    "validation": validation,
-                    "escalate": validation.get("validation_status") != "pass",
-                },
-                sort_keys=False,
-            )
+            return self._validated(op, exec_res, validator_agent)
 
         # Special-case handlers
-        if low.startswith("open terminal"):
-            result = self._handle_open_terminal(step)
-            return yaml.safe_dump(result, sort_keys=False)
+        if op.action == "open_terminal":
+            return self._handle_open_terminal(op, validator_agent)
 
-        if low in ("open browser", "open the browser") or "open chrome" in low:
-            result = self._handle_open_browser(step)
-            return yaml.safe_dump(result, sort_keys=False)
+        if op.action == "open_browser":
+            return self._handle_open_browser(op, validator_agent)
         
-        if low.startswith("open file explorer"):
-            return yaml.safe_dump(self._handle_open_file_explorer(step), sort_keys=False)
+        if op.action == "open_file_explorer":
+            return self._handle_open_file_explorer(op)
 
 
         attempt = 0
-        last_execution = None
-        last_validation = None
+        last_execution: Optional[ExecutionResult] = None
+        last_validation: Optional[ValidationResult] = None
 
         while attempt < max_attempts:
             attempt += 1
             logger.info("Executor attempt %d for step %s: %s", attempt, step_id, description)
 
-            # Screenshot BEFORE for visual state check
-            shot = _screenshot(self.output_dir, "shot")
-            bbox = self._detect_bbox(description, image_path=shot)
+            # Screenshot BEFORE for visual state check (taken while the query is rewritten)
+            bbox = self._traced_detect(description, op)
 
             # No bbox found
             if bbox is None:
                 logger.warning("No bbox found → waiting and retrying detection")
 
-                time.sleep(0.7)
+                _settle(0.7, self.screen)
 
-                shot_retry = _screenshot(self.output_dir, "shot_retry")
-                bbox = self._detect_bbox(description, image_path=shot_retry)
+                bbox = self._traced_detect(description, op, shot_prefix="shot_retry")
 
                 if bbox is None:
-                    exec_result = {
-                        "status": "failed",
-                        "before": _screenshot(self.output_dir, "before_no_bbox"),
-                        "after": _screenshot(self.output_dir, "after_no_bbox"),
-                        "error": "no_bbox_detected"
-                    }
+                    exec_result = self._execution(
+                        step_id, "failed",
+                        _screenshot(self.output_dir, "before_no_bbox", self.screen),
+                        _screenshot(self.output_dir, "after_no_bbox", self.screen),
+                        error="no_bbox_detected",
+                    )
 
                     last_execution = exec_result
-                    exec_yaml = yaml.safe_dump({"step": step, "execution": exec_result}, sort_keys=False)
-                    validation_yaml = validator_agent.validate_step_yaml(exec_yaml)
-                    last_validation = yaml.safe_load(validation_yaml)
-
-                    time.sleep(0.8)
+                    with span("validate"):
+                        last_validation = validator_agent.validate(op, exec_result)
+                    record_attempt(attempt=attempt, status=exec_result.status,
+                                   validation_status=last_validation.validation_status, bbox=None,
+                                   event=exec_result.decided_event, llm_verdict=last_validation.llm_verdict,
+                                   before=exec_result.screenshot_before, after=exec_result.screenshot_after)
+
+                    _settle(0.8, self.screen)
                     continue 
             
-            event_spec = self._map_description_to_event(description)
+            event_spec = op.event_spec()
+            click_point = None
 
 
             # ---------------- SAFE CLICK POLICY ----------------
             if event_spec.get("event") == "click":
-                cx, cy = self._safe_click_point(bbox)
+                cx, cy = click_point = self._safe_click_point(bbox)
                 # event_spec = {
                 #     "event": "click_at",
                 #     "coords": [cx, cy],
@@ -2260,32 +2533,55 @@ class ExecutorAgent:
                 }
 
 
-            exec_result = self._perform_via_adapter(bbox, event_spec)
+            with span("action"):
+                exec_result = self._perform_via_adapter(bbox, event_spec, step_id=step_id)
             last_execution = exec_result
 
-            exec_yaml = yaml.safe_dump({"step": step, "execution": exec_result}, sort_keys=False)
-            validation_yaml = validator_agent.validate_step_yaml(exec_yaml)
-            validation = yaml.safe_load(validation_yaml)
+            self._speculate(exec_result.screenshot_after)
+            with span("validate"):
+                validation = validator_agent.validate(op, exec_result)
             last_validation = validation
-
-            if validation.get("validation_status") == "pass":
-                return yaml.safe_dump(
-                    {"execution": {"attempts": attempt, "last": last_execution},
-                     "validation": validation, "escalate": False},
-                    sort_keys=False,
+            record_attempt(attempt=attempt, status=exec_result.status,
+                           validation_status=validation.validation_status, bbox=list(bbox),
+                           event=exec_result.decided_event, point=click_point,
+                           before=exec_result.screenshot_before, after=exec_result.screenshot_after,
+                           llm_verdict=validation.llm_verdict)
+
+            if validation.passed:
+                self._learn_detection(bbox)
+                return StepOutcome(
+                    attempts=attempt, last=last_execution,
+                    validation=validation, escalate=False,
                 )
 
+            self._reject_detection()
             logger.debug("Step attempt %d failed: %s", attempt, validation)
-            time.sleep(1.1)
+            _settle(1.1, self.screen)
 
         # All attempts failed → escalate to planner
-        return yaml.safe_dump(
-            {"execution": {"attempts": attempt, "last": last_execution},
-             "validation": last_validation,
-             "escalate": True},
-            sort_keys=False,
+        return StepOutcome(
+            attempts=attempt, last=last_execution,
+            validation=last_validation, escalate=True,
         )
 
+    # ====================================================================
+    # YAML ENTRYPOINT (reporting edge)
+    # ====================================================================
+    def run_step_yaml(
+        self,
+        step_yaml: str,
+        validator_agent: Optional[ValidatorAgent],
+        max_attempts: Optional[int] = None,
+        original_prompt: Optional[str] = None,
+    ) -> str:
+        step = yaml.safe_load(step_yaml) or {}
+        outcome = self.run_step_op(
+            self._compiled_op(step),
+            validator_agent=validator_agent,
+            max_attempts=max_attempts,
+        )
+        return yaml.safe_dump(outcome.to_report(), sort_keys=False)
+
     # ====================================================================
     # BACKWARDS + ORCHESTRATOR-COMPATIBLE ENTRYPOINT
     # ====================================================================
@@ -2297,6 +2593,7 @@ class ExecutorAgent:
         validator_agent: Optional[ValidatorAgent] = None,
         max_attempts: Optional[int] = None,
         original_prompt: Optional[str] = None,
+        op: Optional[CompiledStep] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         if step is None:
@@ -2311,21 +2608,12 @@ class ExecutorAgent:
         if "step_id" not in step or step["step_id"] is None:
             step["step_id"] = step_id or 1
 
-        yaml_result = self.run_step_yaml(
-            yaml.safe_dump(step),
+        if op is None:
+            op = self._compiled_op(step)
+
+        outcome = self.run_step_op(
+            op,
             validator_agent=validator_agent or self.validator,
             max_attempts=max_attempts or self.max_attempts,
-            original_prompt=original_prompt or step_description,
         )
-
-        try:
-            return yaml.safe_load(yaml_result)
-        except Exception:
-            return {
-                "execution": None,
-                "validation": {
-                    "validation_status": "fail",
-                    "reason": "invalid_yaml",
-                },
-                "raw": yaml_result,
-            }
\ No newline at end of file
+        return outcome.to_report()
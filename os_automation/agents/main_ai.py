@@ -7,6 +7,9 @@ import logging
 from typing import List, Dict, Any, Optional
 from openai import OpenAI   # Official client
 
+from os_automation.core.step_compiler import match_mcp_adapter
+from os_automation.utils.llm import openai_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,10 +42,11 @@ class MainAIAgent:
     Produces atomic OS micro-steps compatible with ExecutorAgent + ValidatorAgent.
     """
 
-    def __init__(self, model: str = "gpt-4o"):
+    def __init__(self, model: str = "gpt-4o", base_url: Optional[str] = None):
       
         self.model = model
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # base_url / OPENAI_BASE_URL: any chat-completions server (e.g. tools.llm_stub_server)
+        self.client = openai_client(base_url)
         
         # ==== NEW FIELDS FOR OPENCOMPUTERUSE STYLE FEEDBACK LOOPS ====
         self.history: List[Dict[str, Any]] = []
@@ -55,35 +59,8 @@ class MainAIAgent:
         Returns adapter name if yes, otherwise None.
         """
 
-        text = user_prompt.lower()
-
-        # Browser / web / devtools signals
-        chrome_keywords = [
-            "browser",
-            "website",
-            "web page",
-            "open url",
-            "inspect",
-            "devtools",
-            "dom",
-            "css",
-            "html",
-            "console",
-            "network tab",
-            "elements tab",
-            "run javascript",
-            "click button",
-            "fill form",
-            "web automation",
-            "browser automation",
-            "test website"
-        ]
-
-        if any(k in text for k in chrome_keywords):
-            # return "mcp_chrome_devtools"
-            return "gemini_mcp_chrome_devtools"
-
-        return None
+        # Keyword table shared with the step compiler (core.step_compiler)
+        return match_mcp_adapter(user_prompt)
 
     # -----------------------------------------------------
     # Step 1 — High-level → micro-plan
@@ -10,17 +10,17 @@ from PIL import Image, ImageChops, ImageStat
 
 from openai import OpenAI
 
+from os_automation.core.step_compiler import compile_step
+from os_automation.core.tal import CompiledStep, ExecutionResult, ValidationResult
+
 logger = logging.getLogger(__name__)
 
-# Try OCR
-try:
-    import pytesseract
+from os_automation.tools.ocr_service import OCR_AVAILABLE, get_ocr_service
+from os_automation.utils.frame_diff import changed_region, pad_region
+from os_automation.utils.llm import llm_configured, openai_client
 
-    OCR_AVAILABLE = True
-except Exception:
-    pytesseract = None
-    OCR_AVAILABLE = False
-    logger.debug("pytesseract not available; using pixel diff only.")
+if not OCR_AVAILABLE:
+    logger.debug("tesserocr/pytesseract not available; using pixel diff only.")
 
 
 def _pixel_diff(before_path: str, after_path: str) -> float:
@@ -46,16 +46,29 @@ def _pixel_diff(before_path: str, after_path: str) -> float:
         return 0.0
 
 
-def _ocr(image_path: str) -> str:
+def _ocr(image_path: str, region=None) -> str:
     if not OCR_AVAILABLE:
         return ""
-    try:
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img)
-        return text or ""
-    except Exception as e:
-        logger.debug("OCR failed: %s", e)
-        return ""
+    return get_ocr_service().ocr(image_path, region)
+
+
+def _ocr_region(before: str, after: str, bbox=None, pad: int = 18):
+    """
+    Part of the after-frame worth reading: the changed tiles, else the
+    padded target bbox. None (read the whole frame) when nothing changed
+    and nothing was targeted.
+    """
+    region = changed_region(before, after)
+    if region is not None:
+        return region
+    if bbox and len(bbox) >= 4:
+        try:
+            with Image.open(after) as img:
+                width, height = img.size
+            return pad_region(tuple(int(v) for v in bbox[:4]), pad, width, height)
+        except Exception as e:
+            logger.debug("bbox OCR region failed: %s", e)
+    return None
 
 
 class ValidatorAgent:
@@ -77,12 +90,11 @@ class ValidatorAgent:
     KEYPRESS_THRESHOLD = 0.6
 
 
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None):
         self.llm_client: Optional[OpenAI] = None
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
+        if llm_configured(base_url):
             try:
-                self.llm_client = OpenAI(api_key=api_key)
+                self.llm_client = openai_client(base_url)
             except Exception as e:
                 logger.debug("ValidatorAgent: failed to init OpenAI client: %s", e)
 
@@ -153,61 +165,43 @@ class ValidatorAgent:
             logger.debug("LLM validation failed: %s", e)
         return None
 
-    # ========================= YAML Entry =========================
-    def validate_step_yaml(self, exec_yaml: str) -> str:
-        import yaml
-
-        try:
-            data = yaml.safe_load(exec_yaml) or {}
-        except Exception:
-            return yaml.safe_dump(
-                {
-                    "validation_status": "fail",
-                    "details": {"reason": "invalid_exec_yaml"},
-                }
-            )
-
-        step = data.get("step", {})
-        exe = data.get("execution", {})
-
-        desc = (step.get("description") or "").lower()
-        before = exe.get("before")
-        after = exe.get("after")
+    # ========================= Typed Entry =========================
+    def validate(self, op: CompiledStep, execution: ExecutionResult) -> ValidationResult:
+        """
+        Validate one execution of a compiled step. Step-type decisions come
+        from op.hints (same op the executor routed on).
+        """
+        hints = op.hints
+        before = execution.screenshot_before
+        after = execution.screenshot_after
 
-        if exe.get("status") == "failed":
-            return yaml.safe_dump(
-                {"validation_status": "fail", "details": {"reason": "executor_failed"}}
-            )
+        if execution.status == "failed":
+            return ValidationResult(validation_status="fail", details={"reason": "executor_failed"})
 
         if not before or not after or not os.path.exists(before) or not os.path.exists(
             after
         ):
-            return yaml.safe_dump(
-                {
-                    "validation_status": "fail",
-                    "details": {"reason": "missing_screenshots"},
-                }
-            )
+            return ValidationResult(validation_status="fail", details={"reason": "missing_screenshots"})
 
         diff = _pixel_diff(before, after)
         
         # ===================== HOTKEY SHORT-CIRCUIT =====================
-        event = exe.get("event")
+        event = execution.decided_event
 
         if event == "hotkey":
-            return yaml.safe_dump({
-                "validation_status": "pass",
-                "details": {
+            return ValidationResult(
+                validation_status="pass",
+                details={
                     "method": "trust_hotkey_execution",
                     "note": "hotkeys may not cause visible pixel change"
-                }
-            })
+                },
+            )
         
         # ===== LOCAL REGION DIFF (BBOX-LEVEL CHANGE CHECK) =====
-        bbox = exe.get("bbox")
+        bbox = execution.bbox
         
         # Skip bbox-based validation for hotkeys
-        if exe.get("event") == "hotkey":
+        if execution.decided_event == "hotkey":
             bbox = None
             
         if bbox and len(bbox) >= 4:
@@ -234,82 +228,69 @@ class ValidatorAgent:
                 local_diff = sum(local_diff) / len(local_diff)
 
                 if local_diff > 1.0:
-                    return yaml.safe_dump({
-                        "validation_status": "pass",
-                        "details": {
+                    return ValidationResult(
+                        validation_status="pass",
+                        details={
                             "method": "local_region_diff",
                             "local_diff": float(local_diff),
                             "global_diff": float(diff)
-                        }
-                    })
+                        },
+                    )
             except Exception as e:
                 logger.debug("local region diff failed: %s", e)
 
 
+        def read_after() -> str:
+            # OCR only when a branch needs text: the changed area (or the target),
+            # else the whole frame; the OCR service caches it per frame + region
+            if not OCR_AVAILABLE:
+                return ""
+            return _ocr(after, _ocr_region(before, after, execution.bbox)).lower()
+
         # Special-case "first search result" type clicks – still allow some optimism
-        if any(
-            k in desc
-            for k in (
-                "first search result",
-                "first result",
-                "first link",
-                "open first result",
-            )
-        ):
-            return yaml.safe_dump(
-                {
-                    "validation_status": "pass",
-                    "details": {
-                        "method": "special_case",
-                        "reason": "first_search_result_click_assumed_ok",
-                        "diff": diff,
-                    },
-                }
+        if hints.first_result:
+            return ValidationResult(
+                validation_status="pass",
+                details={
+                    "method": "special_case",
+                    "reason": "first_search_result_click_assumed_ok",
+                    "diff": diff,
+                },
             )
 
-        import re
-
-        is_type_step = desc.startswith("type ") or "type '" in desc
-        is_run_cmd_step = "run command" in desc
-        looks_like_terminal = is_run_cmd_step or "terminal" in desc or "shell" in desc
+        is_type_step = hints.is_type_step
+        is_run_cmd_step = hints.is_run_cmd_step
+        looks_like_terminal = hints.looks_like_terminal
 
         # ===================== Typing / Run Command =====================
         if is_type_step or is_run_cmd_step:
             # ===== GUI TYPING: TRUST EXECUTION =====
             if is_type_step and not looks_like_terminal:
-                return yaml.safe_dump({
-                    "validation_status": "pass",
-                    "details": {
+                return ValidationResult(
+                    validation_status="pass",
+                    details={
                         "method": "trust_executor_typing",
                         "note": "GUI typing validated by execution success"
-                    }
-                })
+                    },
+                )
 
-            m = re.search(r"['\"](.+?)['\"]", step.get("description", ""))
-            expected = (m.group(1) if m else "").strip()
-            ocr_after = _ocr(after).lower() if OCR_AVAILABLE else ""
+            expected = hints.expected_text or ""
+            ocr_after = read_after()
 
             # Exact OCR match if available
             if expected and expected.lower() in ocr_after:
-                return yaml.safe_dump(
-                    {
-                        "validation_status": "pass",
-                        "details": {"method": "ocr", "matched": expected, "diff": diff},
-                    }
-                )
+                return ValidationResult(validation_status="pass", details={"method": "ocr", "matched": expected, "diff": diff})
 
             # Terminal: content just changed somehow
             if looks_like_terminal:
                 if ocr_after.strip():
-                    return yaml.safe_dump(
-                        {
-                            "validation_status": "pass",
-                            "details": {
-                                "method": "ocr_terminal_heuristic",
-                                "ocr_excerpt": ocr_after[:200],
-                                "diff": diff,
-                            },
-                        }
+                    return ValidationResult(
+                        validation_status="pass",
+                        details={
+                            "method": "ocr_terminal_heuristic",
+                            "ocr_excerpt": ocr_after[:200],
+                            "diff": diff,
+                        },
                     )
 
                 # Pixel-based decision
@@ -323,7 +304,7 @@ class ValidatorAgent:
                 # Use LLM only when diff is non-zero but below threshold
                 if status == "fail" and diff > 0.5:
                     llm_decision = self._llm_validation_decision(
-                        step.get("description", ""),
+                        op.description,
                         "terminal_type_or_run",
                         diff,
                         ocr_after[:200],
@@ -334,9 +315,7 @@ class ValidatorAgent:
                     elif llm_decision is False:
                         details["llm_confirmation"] = "fail"
 
-                return yaml.safe_dump(
-                    {"validation_status": status, "details": details}
-                )
+                return ValidationResult(validation_status=status, details=details)
 
             # Non-terminal typing
             status = "pass" if diff > self.TYPE_THRESHOLD else "fail"
@@ -347,7 +326,7 @@ class ValidatorAgent:
             }
             if status == "fail" and diff > 0.5:
                 llm_decision = self._llm_validation_decision(
-                    step.get("description", ""),
+                    op.description,
                     "typing",
                     diff,
                     "",
@@ -357,21 +336,15 @@ class ValidatorAgent:
                     details["llm_override"] = True
                 elif llm_decision is False:
                     details["llm_confirmation"] = "fail"
-            return yaml.safe_dump({"validation_status": status, "details": details})
+            return ValidationResult(validation_status=status, details=details)
 
         # ===================== Press Enter / Navigation =====================
-        if "press enter" in desc or desc == "enter":
-            ocr_after = _ocr(after).lower() if OCR_AVAILABLE else ""
+        if hints.is_enter:
+            ocr_after = read_after()
             # GNOME rule → Enter passes ONLY if content changed
             if diff > 2.5 or len(ocr_after) > 0:
-                return yaml.safe_dump(
-                    {"validation_status": "pass",
-                    "details": {"diff": diff, "ocr_excerpt": ocr_after[:200]}}
-                )
-            return yaml.safe_dump(
-                {"validation_status": "fail",
-                "details": {"reason": "enter_no_effect", "diff": diff}}
-            )
+                return ValidationResult(validation_status="pass", details={"diff": diff, "ocr_excerpt": ocr_after[:200]})
+            return ValidationResult(validation_status="fail", details={"reason": "enter_no_effect", "diff": diff})
 
         # ===================== Special Search Box / Omnibox =====================
         # if any(
@@ -390,8 +363,7 @@ class ValidatorAgent:
         
 
         # ===================== Generic Click =====================
-        if "click" in desc or "double click" in desc or "right click" in desc:
-            ocr_after = _ocr(after).lower() if OCR_AVAILABLE else ""
+        if hints.is_click:
             # status = "pass" if diff > self.CLICK_THRESHOLD else "fail"
             # try global diff
             if diff > self.CLICK_THRESHOLD or diff > 0.5:
@@ -410,37 +382,37 @@ class ValidatorAgent:
             }
             if status == "fail" and diff > 0.5:
                 llm_decision = self._llm_validation_decision(
-                    step.get("description", ""), "click", diff, ocr_after[:200]
+                    op.description, "click", diff, read_after()[:200]
                 )
                 if llm_decision is True:
                     status = "pass"
                     details["llm_override"] = True
                 elif llm_decision is False:
                     details["llm_confirmation"] = "fail"
-            return yaml.safe_dump({"validation_status": status, "details": details})
+            return ValidationResult(validation_status=status, details=details)
         
         # ===================== Keypress (non-navigation) =====================
-        if exe.get("event") == "keypress":
+        if execution.decided_event == "keypress":
             # Keypresses often change internal state with minimal pixel change
             if diff > 0.5:
-                return yaml.safe_dump({
-                    "validation_status": "pass",
-                    "details": {
+                return ValidationResult(
+                    validation_status="pass",
+                    details={
                         "method": "keypress_low_visual_change",
                         "diff": diff
-                    }
-                })
+                    },
+                )
 
             # fallback to OCR if available
-            ocr_after = _ocr(after).lower() if OCR_AVAILABLE else ""
+            ocr_after = read_after()
             if ocr_after.strip():
-                return yaml.safe_dump({
-                    "validation_status": "pass",
-                    "details": {
+                return ValidationResult(
+                    validation_status="pass",
+                    details={
                         "method": "keypress_ocr_fallback",
                         "ocr_excerpt": ocr_after[:200]
-                    }
-                })
+                    },
+                )
 
 
         # ===================== Default: any other change =====================
@@ -451,9 +423,9 @@ class ValidatorAgent:
             "threshold": self.NAVIGATION_THRESHOLD,
         }
         if status == "fail" and diff > 0.5:
-            ocr_after = _ocr(after).lower() if OCR_AVAILABLE else ""
+            ocr_after = read_after()
             llm_decision = self._llm_validation_decision(
-                step.get("description", ""), "default", diff, ocr_after[:200]
+                op.description, "default", diff, ocr_after[:200]
             )
             if llm_decision is True:
                 status = "pass"
@@ -461,11 +433,28 @@ class ValidatorAgent:
             elif llm_decision is False:
                 details["llm_confirmation"] = "fail"
 
-        import yaml as _yaml
+        return ValidationResult(validation_status=status, details=details)
+
+    # ========================= YAML Entry =========================
+    def validate_step_yaml(self, exec_yaml: str) -> str:
+        import yaml
+
+        try:
+            data = yaml.safe_load(exec_yaml) or {}
+        except Exception:
+            return yaml.safe_dump(
+                {
+                    "validation_status": "fail",
+                    "details": {"reason": "invalid_exec_yaml"},
+                }
+            )
+
+        step = data.get("step", {})
+        op = step.get("op")
+        op = CompiledStep(**op) if isinstance(op, dict) else compile_step(step)
+        execution = ExecutionResult.from_report(op.step_id, data.get("execution", {}))
 
-        return _yaml.safe_dump(
-            {"validation_status": status, "details": details}
-        )
+        return yaml.safe_dump(self.validate(op, execution).to_report())
 
     # ----------------------------------------------------------------
     # Optional: Advanced validator (kept as-is for compatibility)
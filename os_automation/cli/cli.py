@@ -1,7 +1,18 @@
 # os_automation/cli/cli.py
 import click
 import json
-from os_automation.core.orchestrator import Orchestrator
+import os
+
+
+def _table(rows):
+    if not rows:
+        return "(no rows)"
+    cols = list(rows[0])
+    cells = [[("" if r[c] is None else str(r[c])) for c in cols] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(cols, widths))]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
 
 @click.group()
 def cli():
@@ -13,10 +24,87 @@ def cli():
 @click.option("--tool", default=None, help="Override executor tool (pyautogui|sikuli)")
 @click.option("--detection", default=None, help="Override detection (omniparser|osatlas)")
 def run(prompt, image, tool, detection):
+    from os_automation.core.orchestrator import Orchestrator
+
     orch = Orchestrator(config_tool_override=tool, config_detection_override=detection)
     result = orch.run(prompt, image_path=image)
     click.echo(json.dumps(result, indent=2))
 
+@cli.command()
+@click.argument("report", type=click.Choice(["runs", "slowest", "detectors", "retries", "spans"]))
+@click.option("--db", "db_path", default=None, help="Run database (default: RUN_DB or <output_dir>/runs.sqlite)")
+@click.option("--limit", default=20, show_default=True)
+@click.option("--json", "as_json", is_flag=True, help="Print rows as JSON")
+def query(report, db_path, limit, as_json):
+    """Reports over the run database."""
+    from os_automation.utils.run_db import DEFAULT_RUN_DB, RunDatabase
+
+    db_path = db_path or os.getenv("RUN_DB") or DEFAULT_RUN_DB
+    if not os.path.exists(db_path):
+        raise click.ClickException(f"no run database at {db_path}")
+    db = RunDatabase(db_path)
+    rows = {
+        "runs": lambda: db.runs(limit),
+        "slowest": lambda: db.slowest_steps(limit),
+        "detectors": db.detector_hit_rates,
+        "retries": lambda: db.retry_counts(limit),
+        "spans": db.span_summary,
+    }[report]()
+    click.echo(json.dumps(rows, indent=2) if as_json else _table(rows))
+
+@cli.command()
+@click.option("--db", "db_path", default=None, help="Run database (default: RUN_DB or <output_dir>/runs.sqlite)")
+@click.option("--store", "store_root", default=None, help="Artifact store for frames no longer on disk (default: ARTIFACT_DIR)")
+@click.option("--run", "run_ids", multiple=True, help="Replay only these runs")
+@click.option("--repeat", default=1, show_default=True, help="Replay passes (timing only after the first)")
+@click.option("--stage", "stages", multiple=True, type=click.Choice(["detect", "click", "validate"]),
+              help="Replay only these stages")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def replay(db_path, store_root, run_ids, repeat, stages, as_json):
+    """Replay recorded runs offline and compare decisions with the recording."""
+    from os_automation.tools.replay import STAGES, replay_runs
+    from os_automation.utils.run_db import DEFAULT_RUN_DB
+
+    db_path = db_path or os.getenv("RUN_DB") or DEFAULT_RUN_DB
+    if not os.path.exists(db_path):
+        raise click.ClickException(f"no run database at {db_path}")
+    store_root = store_root or os.getenv("ARTIFACT_DIR") or os.path.join(os.path.dirname(db_path), "store")
+    report = replay_runs(db_path, store_root, run_ids=run_ids or None, repeat=repeat, stages=stages or STAGES)
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2, default=str))
+    else:
+        click.echo(_table(report.rows()))
+        rate = f"{report.steps_per_s:.1f} steps/s" if report.steps_per_s else "n/a"
+        click.echo(f"\n{report.steps} steps in {report.seconds:.3f} s ({rate})")
+        for m in report.mismatches:
+            click.echo(f"MISMATCH {m.stage} {m.run_id}#{m.seq} {m.description!r}: "
+                       f"recorded {m.recorded}, replayed {m.replayed}")
+    if not report.ok:
+        raise click.exceptions.Exit(1)
+
+@cli.command("llm-stub")
+@click.option("--script", "script_path", default=None, help="Rules file (YAML/JSON, see tools.llm_stub_server)")
+@click.option("--port", default=8089, show_default=True)
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--latency", default=None, help="Latency before the first token, e.g. fixed:0.2 or lognormal:-2,0.5")
+@click.option("--seed", default=None, type=int, help="Seed of the latency distributions")
+def llm_stub(script_path, port, host, latency, seed):
+    """Serve the local chat-completions stand-in (point OPENAI_BASE_URL at it)."""
+    from os_automation.tools.llm_stub_server import LLMStubServer
+
+    overrides = {"host": host, "port": port, "latency": latency, "seed": seed}
+    if script_path:
+        server = LLMStubServer.from_file(script_path, **overrides)
+    else:
+        server = LLMStubServer(**{k: v for k, v in overrides.items() if v is not None})
+    click.echo(f"OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
 if __name__ == "__main__":
     cli()
 
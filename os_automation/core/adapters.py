@@ -1,6 +1,6 @@
 # os_automation/core/adapters.py
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence, Union
 
 from os_automation.core.integration_contract import IntegrationMode
 
@@ -21,3 +21,35 @@ class BaseAdapter(ABC):
     @abstractmethod
     def validate(self, step: Dict[str, Any]) -> Dict[str, Any]:
         pass
+
+    def detect_batch(
+        self, image_path: str, queries: Sequence[Union[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Resolve several targets on one screenshot. Each query is a text or a
+        detect()-style step dict (image_path is filled in). Returns one
+        detect() result per query, in order.
+
+        Default: one detect() call per query. Adapters backed by a model
+        override this to do a single upload / single pass.
+        """
+        return [self.detect(batch_step(image_path, q)) for q in queries]
+
+
+def batch_step(image_path: str, query: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """detect() step for one detect_batch() query."""
+    step = dict(query) if isinstance(query, dict) else {"text": query}
+    step["image_path"] = image_path
+    return step
+
+
+def has_native_batch(adapter: Any) -> bool:
+    """
+    True when detect_batch() is more than the per-query default loop.
+    Adapters whose batch route depends on the server expose
+    `batch_supported` (False once the route turned out to be missing).
+    """
+    fn = getattr(type(adapter), "detect_batch", None)
+    if fn is None or fn is BaseAdapter.detect_batch:
+        return False
+    return bool(getattr(adapter, "batch_supported", True))
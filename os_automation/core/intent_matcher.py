@@ -0,0 +1,242 @@
+# os_automation/core/intent_matcher.py
+"""
+Declarative intent rules compiled into a single matcher.
+
+Rules are grouped ("event", "route", "hint", ...) and ordered by priority
+inside a group. All literal keywords of all rules are compiled into one
+Aho-Corasick automaton, so a description is scanned once; anchored checks
+(startswith / equals) and regexes are only evaluated for rules whose
+literal anchors were found.
+
+Uses pyahocorasick when installed, otherwise a pure-Python automaton.
+"""
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional C implementation of the automaton
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except Exception:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+class Capture(int):
+    """Placeholder in a rule payload, replaced by regex group N."""
+
+
+class IntentRule(NamedTuple):
+    """
+    One row of an intent table.
+
+    A rule fires when ANY trigger holds (any_of literal found, text starts
+    with / equals one of the anchors) AND every requirement holds (all_of
+    literals present, none_of literals absent, regex matches).
+    Rules without triggers fire on requirements alone.
+    """
+    name: str
+    group: str
+    priority: int = 0
+    any_of: Tuple[str, ...] = ()
+    startswith: Tuple[str, ...] = ()
+    equals: Tuple[str, ...] = ()
+    all_of: Tuple[str, ...] = ()
+    none_of: Tuple[str, ...] = ()
+    regex: Optional[Pattern] = None
+    regex_on_raw: bool = False
+    payload: Optional[Dict[str, Any]] = None
+
+
+class IntentMatch(NamedTuple):
+    rule: IntentRule
+    groups: Tuple[str, ...] = ()
+
+    @property
+    def name(self) -> str:
+        return self.rule.name
+
+    def fields(self) -> Dict[str, Any]:
+        """Rule payload with Capture placeholders resolved."""
+        return _resolve(self.rule.payload or {}, self.groups)
+
+
+def _resolve(value, groups):
+    if isinstance(value, Capture):
+        return groups[int(value) - 1]
+    if isinstance(value, dict):
+        return {k: _resolve(v, groups) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, groups) for v in value]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Aho-Corasick automaton (pure Python fallback)
+# ---------------------------------------------------------------------------
+class _Automaton:
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+
+        for kw in keywords:
+            state = 0
+            for ch in kw:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] = self._out[state] + (kw,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set:
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class _CAutomaton:
+    def __init__(self, keywords: Iterable[str]):
+        self._a = ahocorasick.Automaton()
+        for kw in keywords:
+            self._a.add_word(kw, kw)
+        self._a.make_automaton()
+
+    def find(self, text: str) -> set:
+        return {kw for _, kw in self._a.iter(text)}
+
+
+# ---------------------------------------------------------------------------
+# Matcher
+# ---------------------------------------------------------------------------
+class IntentMatcher:
+    """
+    Compiled form of an intent table.
+
+    match(text) returns every firing rule, ordered by (group, priority);
+    first(text, group) returns the highest-priority match of one group.
+    """
+
+    def __init__(self, rules: Sequence[IntentRule], cache_size: int = 2048):
+        self.rules: Tuple[IntentRule, ...] = tuple(
+            sorted(rules, key=lambda r: (r.group, r.priority))
+        )
+        # Rules are referenced by index (payload dicts are not hashable)
+        keywords = set()
+        self._by_literal: Dict[str, List[int]] = {}
+        self._unanchored: List[int] = []
+        for i, rule in enumerate(self.rules):
+            keywords.update(rule.any_of)
+            keywords.update(rule.all_of)
+            keywords.update(rule.none_of)
+            for kw in rule.any_of:
+                self._by_literal.setdefault(kw, []).append(i)
+            if rule.startswith or rule.equals or not rule.any_of:
+                self._unanchored.append(i)
+
+        keywords.discard("")
+        if AHOCORASICK_AVAILABLE and keywords:
+            self._automaton = _CAutomaton(keywords)
+        else:
+            self._automaton = _Automaton(sorted(keywords))
+
+        # Plans repeat descriptions ("Press Enter", retries, replans)
+        self.match = lru_cache(maxsize=cache_size)(self.scan)
+
+    # -------------------------------------------------------------
+    def _fires(self, rule: IntentRule, raw: str, low: str, found: set) -> Optional[IntentMatch]:
+        if rule.any_of or rule.startswith or rule.equals:
+            if not (
+                any(kw in found for kw in rule.any_of)
+                or any(low.startswith(p) for p in rule.startswith)
+                or low in rule.equals
+            ):
+                return None
+        if any(kw not in found for kw in rule.all_of):
+            return None
+        if any(kw in found for kw in rule.none_of):
+            return None
+        if rule.regex is not None:
+            m = rule.regex.search(raw if rule.regex_on_raw else low)
+            if not m:
+                return None
+            return IntentMatch(rule, m.groups())
+        return IntentMatch(rule)
+
+    def scan(self, text: str) -> Tuple[IntentMatch, ...]:
+        """Uncached single pass; match() is the cached entry point."""
+        raw = (text or "").strip()
+        low = raw.lower()
+        found = self._automaton.find(low)
+
+        candidates = set(self._unanchored)
+        for kw in found:
+            candidates.update(self._by_literal.get(kw, ()))
+
+        matches = []
+        for i in sorted(candidates):
+            hit = self._fires(self.rules[i], raw, low, found)
+            if hit is not None:
+                matches.append(hit)
+        return tuple(matches)
+
+    def match_linear(self, text: str) -> Tuple[IntentMatch, ...]:
+        """
+        Reference evaluation: every rule checked with plain substring scans.
+        Used by tests and the micro-benchmark to verify the automaton.
+        """
+        raw = (text or "").strip()
+        low = raw.lower()
+        matches = []
+        for rule in self.rules:
+            found = {kw for kw in rule.any_of + rule.all_of + rule.none_of if kw in low}
+            hit = self._fires(rule, raw, low, found)
+            if hit is not None:
+                matches.append(hit)
+        return tuple(matches)
+
+    # -------------------------------------------------------------
+    def first(self, text: str, group: str) -> Optional[IntentMatch]:
+        for m in self.match(text):
+            if m.rule.group == group:
+                return m
+        return None
+
+    def names(self, text: str, group: str) -> List[str]:
+        return [m.rule.name for m in self.match(text) if m.rule.group == group]
+
+
+def first_in_group(matches: Iterable[IntentMatch], group: str) -> Optional[IntentMatch]:
+    """Highest-priority match of a group from an already computed match list."""
+    for m in matches:
+        if m.rule.group == group:
+            return m
+    return None
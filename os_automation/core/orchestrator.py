@@ -1,12 +1,24 @@
 # # os_automation/core/orchestrator.py
+import logging
+import os
+import uuid
 import yaml
 from pathlib import Path
 from os_automation.core.tal import ExecutionResult
+from os_automation.core.step_compiler import compile_plan, compile_step
 from os_automation.core.registry import registry
 from os_automation.repos.omniparser_adapter import OmniParserAdapter
 from os_automation.repos.osatlas_adapter import OSAtlasAdapter
+from os_automation.repos.ocr_text_adapter import OCRTextAdapter
+from os_automation.repos.screen_index_adapter import ScreenIndexAdapter
+from os_automation.repos.cascade_adapter import CascadeDetector
+from os_automation.repos.hedged_adapter import HedgedDetector
+from os_automation.repos.template_adapter import TemplateAdapter
+from os_automation.repos.atspi_adapter import ATSPIAdapter
 from os_automation.repos.pyautogui_adapter import PyAutoGUIAdapter
 from os_automation.repos.sikuli_adapter import SikuliAdapter
+from os_automation.repos.virtual_screen_adapter import VirtualScreenAdapter
+from os_automation.tools.virtual_screen import VirtualScreen
 from os_automation.agents.main_ai import MainAIAgent
 from os_automation.agents.executor_agent import ExecutorAgent
 from os_automation.agents.validator_agent import ValidatorAgent
@@ -14,6 +26,10 @@ from os_automation.repos.mcp_adapter import MCPFileSystemAdapter
 from os_automation.core.integration_contract import IntegrationMode
 from os_automation.repos.chrome_devtools_mcp_adapter import ChromeDevToolsMCPAdapter
 from os_automation.repos.gemini_chrome_devtools_mcp_adapter import GeminiChromeDevToolsMCPAdapter
+from os_automation.utils.run_db import get_run_db
+from os_automation.utils.tracing import trace_step
+
+logger = logging.getLogger(__name__)
 
 def _load_config():
     cfg_path = Path(__file__).resolve().parents[2] / "configs" / "repos.yaml"
@@ -30,8 +46,31 @@ class Orchestrator:
         # Register adapters (store classes or factory lambdas)
         registry.register_adapter("omniparser", OmniParserAdapter)
         registry.register_adapter("osatlas", OSAtlasAdapter)
+        registry.register_adapter("ocr_text", OCRTextAdapter)
+        registry.register_adapter("screen_index", ScreenIndexAdapter)
+        registry.register_adapter("template", TemplateAdapter)
+        registry.register_adapter("a11y", ATSPIAdapter)
+        hedged_cfg = self.config.get("hedged", {}) or {}
+        registry.register_adapter("hedged", HedgedDetector(
+            backends=hedged_cfg.get("backends"),
+            hedge_delay=hedged_cfg.get("hedge_delay"),
+            timeout=hedged_cfg.get("timeout"),
+        ))
+        # single instance: keeps per-tier stats and tier instances across steps
+        registry.register_adapter(
+            "cascade", CascadeDetector(tiers=(self.config.get("cascade", {}) or {}).get("tiers"))
+        )
         registry.register_adapter("pyautogui", PyAutoGUIAdapter)
         registry.register_adapter("sikuli", SikuliAdapter)
+        # one screen shared by executor and detector; a caller's own (custom scene) is kept
+        if registry.get_adapter("virtual_screen") is None:
+            vs_cfg = self.config.get("virtual_screen", {}) or {}
+            scene = vs_cfg.get("scene")
+            registry.register_adapter("virtual_screen", VirtualScreenAdapter(
+                screen=VirtualScreen.from_file(scene) if scene else None,
+                latency=vs_cfg.get("latency") or 0.0,
+                miss_rate=vs_cfg.get("miss_rate") or 0.0,
+            ))
         registry.register_adapter("mcp_filesystem", MCPFileSystemAdapter)
         registry.register_adapter("mcp_chrome_devtools", ChromeDevToolsMCPAdapter)
         registry.register_adapter("gemini_mcp_chrome_devtools", GeminiChromeDevToolsMCPAdapter)
@@ -72,11 +111,30 @@ class Orchestrator:
             default_executor=self.executor_choice
         )
         self.validator_agent = ValidatorAgent()
+        # structured record of every run (steps, attempts, detections, spans, artifacts)
+        self.run_db = get_run_db(os.path.join(self.executor_agent.output_dir, "runs.sqlite"))
 
         # Cache adapter contracts
         self.executor_contract = registry.get_contract(self.executor_choice)
         self.detection_contract = registry.get_contract(self.detection_choice)
 
+    def _record_step(self, run_id, seq, step, op, report, trace):
+        if self.run_db is None:
+            return
+        execution = (report.get("execution") or {}).get("last") or {}
+        store = self.executor_agent.store
+        artifacts = []
+        for kind in ("before", "after"):
+            path = execution.get(kind)
+            if path:
+                # frames are recorded by the store's worker: waits for these two if still queued
+                artifacts.append((kind, path, store.digest_of(path) if store is not None else None))
+        try:
+            self.run_db.record_step(run_id, seq, step, report, trace,
+                                    action=getattr(op, "action", None), artifacts=artifacts)
+        except Exception as e:
+            logger.warning("run database write failed: %s", e)
+
     def _dispatch_mcp(self, parsed_plan: dict):
         mcp = parsed_plan.get("mcp")
         if not mcp:
@@ -216,53 +274,83 @@ class Orchestrator:
                     "mode": "partial"
                 }
 
-            final_step_reports = []
-
+            # Parse every step description once; agents consume the compiled ops
+            compiled_steps = compile_plan(planned_steps)
 
-            for step in planned_steps:
-                print(f"\n========== RUNNING STEP {step.step_id}: {step.description} ==========")
-
-                step_result = self.executor_agent.run_step(
-                    step_id=step.step_id,
-                    step_description=step.description,
-                    validator_agent=self.validator_agent,
-                    max_attempts=3
-                )
+            final_step_reports = []
+            # screenshots of this run are referenced from one manifest in the artifact store
+            run_id = self.executor_agent.begin_run(prompt=user_prompt) or uuid.uuid4().hex[:12]
+            if self.run_db is not None:
+                self.run_db.begin_run(run_id, prompt=user_prompt, mode="partial",
+                                      plan=[s.dict() for s in planned_steps])
+
+            # an exception mid-run still closes the runs row and the artifact manifest
+            status = "error"
+            try:
+                for i, (step, op) in enumerate(zip(planned_steps, compiled_steps)):
+                    print(f"\n========== RUNNING STEP {step.step_id}: {step.description} ==========")
+
+                    # lets a batching detector resolve the next targets on the same screenshot
+                    self.executor_agent.set_upcoming(compiled_steps[i + 1:])
+
+                    with trace_step() as trace:
+                        step_result = self.executor_agent.run_step(
+                            step_id=step.step_id,
+                            step_description=step.description,
+                            validator_agent=self.validator_agent,
+                            max_attempts=3,
+                            op=op,
+                        )
+                    self._record_step(run_id, len(final_step_reports), step.dict(), op, step_result, trace)
+
+                    # ---- Store into final report list ----
+                    step_report = {
+                        "step": step.dict(),
+                        "execution": step_result.get("execution"),
+                        "validation": step_result.get("validation")
+                    }
+                    final_step_reports.append(step_report)
+
+                    # ---- Feed observation into planner memory ----
+                    observation = step_result.get("validation", {}).get("observation")
+                    self.main_agent.receive_observation(step.step_id, step.description, observation)
+
+                    # ---- Ask main agent if next step should change ----
+                    next_steps = self.main_agent.decide_next_step()
+
+                    if next_steps is None:
+                        continue  # proceed normally
+
+                    # ---- Run replacement steps (dynamic replanning engine) ----
+                    self.executor_agent.set_upcoming([])
+                    for ns in next_steps:
+                        ns_desc = ns["description"]
+                        ns_op = compile_step(ns, step_id=9999)
+                        with trace_step() as trace:
+                            tmp = self.executor_agent.run_step(
+                                step_id=ns.get("step_id", 9999),
+                                step_description=ns_desc,
+                                validator_agent=self.validator_agent,
+                                max_attempts=1,
+                                op=ns_op,
+                            )
+                        self._record_step(run_id, len(final_step_reports),
+                                          {"step_id": ns.get("step_id", 9999), "description": ns_desc},
+                                          ns_op, tmp, trace)
+
+                        final_step_reports.append({
+                            "step": {"step_id": ns.get("step_id", 9999), "description": ns_desc},
+                            "execution": tmp.get("execution"),
+                            "validation": tmp.get("validation")
+                        })
+
+                status = "pass" if all((r.get("validation") or {}).get("validation_status") == "pass"
+                                       for r in final_step_reports) else "fail"
+            finally:
+                if self.run_db is not None:
+                    self.run_db.end_run(run_id, status=status)
+                self.executor_agent.end_run()
 
-                # ---- Store into final report list ----
-                step_report = {
-                    "step": step.dict(),
-                    "execution": step_result.get("execution"),
-                    "validation": step_result.get("validation")
-                }
-                final_step_reports.append(step_report)
-
-                # ---- Feed observation into planner memory ----
-                observation = step_result.get("validation", {}).get("observation")
-                self.main_agent.receive_observation(step.step_id, step.description, observation)
-
-                # ---- Ask main agent if next step should change ----
-                next_steps = self.main_agent.decide_next_step()
-
-                if next_steps is None:
-                    continue  # proceed normally
-
-                # ---- Run replacement steps (dynamic replanning engine) ----
-                for ns in next_steps:
-                    ns_desc = ns["description"]
-                    tmp = self.executor_agent.run_step(
-                        step_id=ns.get("step_id", 9999),
-                        step_description=ns_desc,
-                        validator_agent=self.validator_agent,
-                        max_attempts=1
-                    )
-
-                    final_step_reports.append({
-                        "step": {"step_id": ns.get("step_id", 9999), "description": ns_desc},
-                        "execution": tmp.get("execution"),
-                        "validation": tmp.get("validation")
-                    })
-        
         # HYBRID: a general example — tailor this to your adapter capabilities
         elif mode == IntegrationMode.HYBRID:
             detected = None
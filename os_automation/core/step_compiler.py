@@ -0,0 +1,267 @@
+# os_automation/core/step_compiler.py
+"""
+One-time compile pass: PlannedStep -> CompiledStep.
+
+Step descriptions used to be re-parsed by every component on every attempt
+(executor routing, event mapping, local query rewrite, validator step-type
+checks, MCP routing). All of that string analysis lives here now, so the
+executor and the validator make their decisions from the same typed op.
+
+Keyword decisions are expressed as a declarative intent table
+(core.intent_matcher), compiled once into a single automaton.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from os_automation.core.intent_matcher import (Capture, IntentMatch, IntentMatcher,
+                                               IntentRule, first_in_group)
+from os_automation.core.tal import CompiledStep, PlannedStep, ValidationHints
+
+# Browser / web / devtools signals used for MCP routing of a whole prompt
+MCP_CHROME_KEYWORDS = (
+    "browser",
+    "website",
+    "web page",
+    "open url",
+    "inspect",
+    "devtools",
+    "dom",
+    "css",
+    "html",
+    "console",
+    "network tab",
+    "elements tab",
+    "run javascript",
+    "click button",
+    "fill form",
+    "web automation",
+    "browser automation",
+    "test website",
+)
+MCP_CHROME_ADAPTER = "gemini_mcp_chrome_devtools"
+
+# Browser tasks that must never reach the GUI executor when MCP is preferred
+BROWSER_STEP_KEYWORDS = (
+    "browser", "website", "click link", "fill form",
+    "submit", "login", "inspect", "devtools",
+)
+
+FIRST_RESULT_KEYWORDS = (
+    "first search result",
+    "first result",
+    "first link",
+    "open first result",
+)
+
+# Ordered: first match wins (same order the executor used to apply)
+UI_QUERY_MAPPING = (
+    ("search box", "search"),
+    ("search", "address bar"),
+    ("address bar", "address bar"),
+    ("searchbar", "search"),
+    ("search bar", "search"),
+    ("google search", "search"),
+    ("vscode explorer", "explorer"),
+    ("explorer icon", "explorer"),
+    ("new file", "new file"),
+    ("new file button", "new file"),
+    ("file name field", "file name"),
+    ("filename field", "file name"),
+    ("first result", "first result"),
+    ("first link", "first result"),
+    ("profile icon", "profile icon"),
+    ("menu", "menu"),
+    ("settings", "settings"),
+    ("three dots", "menu"),
+    ("submit", "submit"),
+    ("ok", "ok button"),
+    ("close", "close button"),
+    ("play", "play button"),
+    ("pause", "pause button"),
+)
+UI_QUERY_TOKENS = ("button", "icon", "link", "menu", "search", "address", "file", "run")
+
+DEFAULT_WAIT_SECONDS = 1.5
+
+_QUOTED_RE = re.compile(r"['\"]([^'\"]+)['\"]")
+_QUERY_QUOTED_RE = re.compile(r"['\"]([^'\"]{1,60})['\"]")
+_QUOTED_LAZY_RE = re.compile(r"['\"](.+?)['\"]")
+_WAIT_SECONDS_RE = re.compile(r"wait\s+(\d+(?:\.\d+)?)")
+_TOKEN_RE = re.compile(r"[a-zA-Z0-9_-]{2,50}")
+
+
+# ====================================================================
+# INTENT TABLE
+# ====================================================================
+# group "event": description → low-level event (first match wins)
+_EVENT_RULES = [
+    IntentRule("type_quoted", "event", any_of=("type",), regex_on_raw=True,
+               regex=re.compile(r"type\s+['\"]([^'\"]+)['\"]", re.IGNORECASE),
+               payload={"event": "type", "text": Capture(1)}),
+    IntentRule("type_any_quote", "event", any_of=("type",), regex_on_raw=True,
+               regex=_QUOTED_RE, payload={"event": "type", "text": Capture(1)}),
+    IntentRule("enter", "event", any_of=("press enter",), equals=("enter",),
+               payload={"event": "keypress", "key": "enter"}),
+    IntentRule("backspace", "event", any_of=("backspace",),
+               payload={"event": "keypress", "key": "backspace"}),
+    IntentRule("delete", "event", any_of=("delete",),
+               payload={"event": "keypress", "key": "delete"}),
+    IntentRule("ctrl_hotkey", "event", any_of=("ctrl+",),
+               regex=re.compile(r"press\s+ctrl\+([a-z])"),
+               payload={"event": "hotkey", "keys": ["ctrl", Capture(1)]}),
+    IntentRule("select_all", "event", any_of=("select all", "ctrl+a"),
+               payload={"event": "hotkey", "keys": ["ctrl", "a"]}),
+    IntentRule("paste", "event", any_of=("paste", "ctrl+v"),
+               payload={"event": "hotkey", "keys": ["ctrl", "v"]}),
+    IntentRule("arrow_left", "event", any_of=("arrow left",), payload={"event": "keypress", "key": "left"}),
+    IntentRule("arrow_right", "event", any_of=("arrow right",), payload={"event": "keypress", "key": "right"}),
+    IntentRule("arrow_up", "event", any_of=("arrow up",), payload={"event": "keypress", "key": "up"}),
+    IntentRule("arrow_down", "event", any_of=("arrow down",), payload={"event": "keypress", "key": "down"}),
+    IntentRule("scroll_down", "event", any_of=("scroll down",), payload={"event": "scroll", "direction": "down"}),
+    IntentRule("scroll_up", "event", any_of=("scroll up",), payload={"event": "scroll", "direction": "up"}),
+    IntentRule("double_click", "event", any_of=("double click",), payload={"event": "double_click"}),
+    IntentRule("right_click", "event", any_of=("right click", "context menu"), payload={"event": "right_click"}),
+    # Calculator / operator buttons
+    IntentRule("press_symbol", "event", any_of=("press",),
+               regex=re.compile(r"press\s+'([^']+)'"),
+               payload={"event": "keypress", "key": Capture(1)}),
+    IntentRule("click", "event", any_of=("click", "open ", "select "), payload={"event": "click"}),
+    IntentRule("noop", "event", any_of=("wait", "pause"), equals=("noop", "no-op"), payload={"event": "noop"}),
+    IntentRule("super_key", "event", any_of=("press super key", "press windows key"),
+               payload={"event": "hotkey", "keys": ["win"]}),
+    IntentRule("spotlight", "event", any_of=("press command+space",),
+               payload={"event": "hotkey", "keys": ["command", "space"]}),
+]
+
+# group "route": how ExecutorAgent handles the step (first match wins)
+_ROUTE_RULES = [
+    IntentRule("os_launcher", "route", any_of=("press super key", "press windows key")),
+    IntentRule("spotlight", "route", any_of=("press command+space",)),
+    IntentRule("gui_type", "route", startswith=("type ",)),
+    IntentRule("gui_enter", "route", equals=("press enter", "enter")),
+    IntentRule("wait", "route", any_of=("wait", "pause")),
+    IntentRule("open_terminal", "route", startswith=("open terminal",)),
+    IntentRule("open_browser", "route", equals=("open browser", "open the browser"), any_of=("open chrome",)),
+    IntentRule("open_file_explorer", "route", startswith=("open file explorer",)),
+]
+
+# group "hint": every match is a validation hint flag
+_HINT_RULES = [
+    IntentRule("is_type_step", "hint", startswith=("type ",), any_of=("type '",)),
+    IntentRule("is_run_cmd_step", "hint", any_of=("run command",)),
+    IntentRule("looks_like_terminal", "hint", any_of=("run command", "terminal", "shell")),
+    IntentRule("is_enter", "hint", any_of=("press enter",), equals=("enter",)),
+    IntentRule("is_click", "hint", any_of=("click",)),
+    IntentRule("first_result", "hint", any_of=FIRST_RESULT_KEYWORDS),
+]
+
+INTENT_RULES = (
+    _EVENT_RULES
+    + _ROUTE_RULES
+    + _HINT_RULES
+    + [IntentRule("browser_task", "browser", any_of=BROWSER_STEP_KEYWORDS)]
+    + [IntentRule(MCP_CHROME_ADAPTER, "mcp", any_of=MCP_CHROME_KEYWORDS)]
+    + [
+        IntentRule(f"query_{i}", "query", any_of=(k,), payload={"query": v})
+        for i, (k, v) in enumerate(UI_QUERY_MAPPING)
+    ]
+)
+# Table order is the rule priority inside each group
+INTENT_RULES = [r._replace(priority=i) for i, r in enumerate(INTENT_RULES)]
+
+INTENT_MATCHER = IntentMatcher(INTENT_RULES)
+
+_UNKNOWN_EVENT = {"event": "unknown", "error": "ambiguous_step_no_action"}
+
+
+def match_mcp_adapter(text: str) -> Optional[str]:
+    """Return the MCP adapter a prompt should be routed to, if any."""
+    m = INTENT_MATCHER.first(text, "mcp")
+    return m.name if m else None
+
+
+def local_ui_query(description: str, matches: Optional[Sequence[IntentMatch]] = None) -> str:
+    """
+    Lightweight heuristic to convert vague step descriptions into short
+    queries that detectors handle better.
+    """
+    if matches is None:
+        matches = INTENT_MATCHER.match(description)
+    m = first_in_group(matches, "query")
+    if m:
+        return m.fields()["query"]
+
+    # extract quoted text
+    m = _QUERY_QUOTED_RE.search(description or "")
+    if m:
+        return m.group(1)
+
+    # last-resort: pick last noun-like token
+    tokens = _TOKEN_RE.findall((description or "").lower())
+    if tokens:
+        # prefer short tokens near start that indicate UI
+        for t in tokens:
+            if t in UI_QUERY_TOKENS:
+                return t
+        return tokens[-1]
+
+    return (description or "").strip()
+
+
+def map_event(description: str, matches: Optional[Sequence[IntentMatch]] = None) -> Dict[str, Any]:
+    """
+    Interpret a natural-language step description and convert it into a
+    low-level event structure for PyAutoGUIAdapter.
+    """
+    if matches is None:
+        matches = INTENT_MATCHER.match(description)
+    m = first_in_group(matches, "event")
+    return m.fields() if m else dict(_UNKNOWN_EVENT)
+
+
+def compile_step(step: Union[PlannedStep, Dict[str, Any], str], step_id: int = 0) -> CompiledStep:
+    """
+    Compile one step (PlannedStep, plain dict or bare description) into a
+    CompiledStep. The description is scanned once by INTENT_MATCHER.
+    """
+    if isinstance(step, CompiledStep):
+        return step
+    if isinstance(step, PlannedStep):
+        step_id, description = step.step_id, step.description
+    elif isinstance(step, dict):
+        step_id = step.get("step_id", step_id) or step_id
+        description = step.get("description") or ""
+    else:
+        description = step or ""
+
+    matches = INTENT_MATCHER.match(description)
+    route = first_in_group(matches, "route")
+    action = route.name if route else "visual"
+
+    duration = None
+    if action == "wait":
+        m = _WAIT_SECONDS_RE.search(description.lower())
+        duration = float(m.group(1)) if m else DEFAULT_WAIT_SECONDS
+
+    hint_names = {m.name for m in matches if m.rule.group == "hint"}
+    expected = _QUOTED_LAZY_RE.search(description)
+    hints = ValidationHints(
+        expected_text=expected.group(1).strip() if expected else None,
+        **{name: True for name in hint_names},
+    )
+
+    return CompiledStep(
+        step_id=int(step_id),
+        description=description,
+        action=action,
+        duration=duration,
+        target_query=local_ui_query(description, matches),
+        browser_task=first_in_group(matches, "browser") is not None,
+        hints=hints,
+        **map_event(description, matches),
+    )
+
+
+def compile_plan(steps: Iterable[Union[PlannedStep, Dict[str, Any]]]) -> List[CompiledStep]:
+    """Compile every step of a plan once, up front."""
+    return [compile_step(s) for s in steps]
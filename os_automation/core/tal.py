@@ -1,7 +1,7 @@
 # os_automation/core/tal.py
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PlannedStep(BaseModel):
@@ -16,9 +16,144 @@ class ExecutionResult(BaseModel):
     status: str
     screenshot_before: Optional[str] = None
     screenshot_after: Optional[str] = None
+    bbox: Optional[List[int]] = None
+    error: Optional[str] = None
     raw: Optional[Dict[str, Any]] = None
 
+    def to_report(self) -> Dict[str, Any]:
+        """
+        Plain dict in the legacy execution layout
+        (status / before / after / event / bbox / error + raw extras).
+        Only used at the reporting edge.
+        """
+        out: Dict[str, Any] = {
+            "status": self.status,
+            "before": self.screenshot_before,
+            "after": self.screenshot_after,
+        }
+        if self.decided_event:
+            out["event"] = self.decided_event
+        if self.bbox is not None:
+            out["bbox"] = list(self.bbox)
+        if self.error is not None:
+            out["error"] = self.error
+        if self.raw:
+            out.update(self.raw)
+        return out
+
+    @classmethod
+    def from_report(cls, step_id: int, data: Dict[str, Any], repo_used: str = "") -> "ExecutionResult":
+        """Inverse of to_report(), for callers still handing over plain dicts."""
+        data = dict(data or {})
+        known = {"status", "before", "after", "event", "bbox", "error"}
+        return cls(
+            step_id=step_id,
+            repo_used=repo_used,
+            decided_event=data.get("event") or "",
+            status=data.get("status") or "",
+            screenshot_before=data.get("before"),
+            screenshot_after=data.get("after"),
+            bbox=data.get("bbox"),
+            error=data.get("error"),
+            raw={k: v for k, v in data.items() if k not in known} or None,
+        )
+
 class ValidationReport(BaseModel):
     task_id: str
     overall_status: str
     validated_steps: List[Dict[str, Any]]
+
+
+class ValidationHints(BaseModel):
+    """
+    Step-type facts the ValidatorAgent needs, decided once at compile time.
+    """
+    is_type_step: bool = False
+    is_run_cmd_step: bool = False
+    looks_like_terminal: bool = False
+    is_enter: bool = False
+    is_click: bool = False
+    first_result: bool = False
+    expected_text: Optional[str] = None
+
+
+class CompiledStep(BaseModel):
+    """
+    Typed op produced from a PlannedStep by core.step_compiler.
+
+    - action: how ExecutorAgent routes the step
+      (visual | os_launcher | spotlight | gui_type | gui_enter | wait |
+       open_terminal | open_browser | open_file_explorer)
+    - event/text/key/keys/direction: low-level event for the executor adapter
+    - target_query: local detector query (used when no LLM rewrite is available)
+    - hints: validation hints consumed by ValidatorAgent
+    """
+    step_id: int
+    description: str
+    action: str = "visual"
+    event: str = "unknown"
+    text: Optional[str] = None
+    key: Optional[str] = None
+    keys: Optional[List[str]] = None
+    direction: Optional[str] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+    target_query: Optional[str] = None
+    browser_task: bool = False
+    hints: ValidationHints = Field(default_factory=ValidationHints)
+
+    def event_spec(self) -> Dict[str, Any]:
+        """Event dict in the shape expected by the executor adapters."""
+        spec: Dict[str, Any] = {"event": self.event}
+        for name in ("text", "key", "keys", "direction", "error"):
+            value = getattr(self, name)
+            if value is not None:
+                spec[name] = list(value) if name == "keys" else value
+        return spec
+
+
+class ValidationResult(BaseModel):
+    """Verdict returned by ValidatorAgent.validate()."""
+    validation_status: str
+    details: Optional[Dict[str, Any]] = None
+    observation: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.validation_status == "pass"
+
+    @property
+    def llm_verdict(self) -> Optional[str]:
+        """"pass"/"fail" when an LLM tie-break decided, else None."""
+        details = self.details or {}
+        if details.get("llm_override"):
+            return "pass"
+        if details.get("llm_confirmation") == "fail":
+            return "fail"
+        return None
+
+    def to_report(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"validation_status": self.validation_status}
+        if self.details is not None:
+            out["details"] = self.details
+        if self.observation is not None:
+            out["observation"] = self.observation
+        return out
+
+
+class StepOutcome(BaseModel):
+    """Result of one ExecutorAgent step, passed in-process between agents."""
+    attempts: int = 0
+    last: Optional[ExecutionResult] = None
+    validation: Optional[ValidationResult] = None
+    escalate: bool = False
+
+    def to_report(self) -> Dict[str, Any]:
+        return {
+            "execution": {
+                "attempts": self.attempts,
+                "last": self.last.to_report() if self.last else None,
+            },
+            "validation": self.validation.to_report() if self.validation else None,
+            "escalate": self.escalate,
+        }
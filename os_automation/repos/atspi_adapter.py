@@ -0,0 +1,383 @@
+# os_automation/repos/atspi_adapter.py
+"""
+Accessibility-tree (AT-SPI) detection adapter for Linux.
+
+GTK/Qt applications expose their widgets through AT-SPI with exact
+screen extents, roles and names. This adapter snapshots the tree of the
+focused application, matches the step target against role + name and
+returns the exact bbox — no screenshot analysis involved.
+
+The snapshot is cached per application between steps. When the AT-SPI
+event loop can be started, tree events (children-changed, name/state
+changes, bounds changes) update the cached snapshot of the application
+they come from incrementally; otherwise the snapshot is refreshed after
+`ttl` seconds. Events are coalesced per source object between lookups
+(at most EVENT_BACKLOG sources; past that every snapshot is rebuilt).
+
+Requires pyatspi (python3-pyatspi / gir1.2-atspi-2.0) and an a11y bus.
+Without it detect() returns confidence 0.0 so the cascade moves on.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.integration_contract import IntegrationMode
+from os_automation.repos.ocr_text_adapter import label_candidates
+from os_automation.tools.ocr import normalize, text_similarity
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyatspi
+
+    ATSPI_AVAILABLE = True
+except Exception:
+    pyatspi = None
+    ATSPI_AVAILABLE = False
+
+Path = Tuple[int, ...]
+
+# distinct event sources held between two lookups before giving up on
+# incremental updates (every snapshot is then rebuilt)
+EVENT_BACKLOG = 512
+
+# query word → AT-SPI role names it refers to
+ROLE_WORDS = {
+    "button": ("push button", "toggle button", "button"),
+    "icon": ("icon", "push button", "image"),
+    "menu": ("menu", "menu item", "menu bar"),
+    "option": ("menu item", "radio menu item", "list item", "combo box"),
+    "item": ("menu item", "list item", "tree item", "table cell"),
+    "field": ("text", "entry", "password text", "spin button"),
+    "box": ("text", "entry", "combo box", "check box"),
+    "checkbox": ("check box",),
+    "toggle": ("toggle button", "check box", "switch"),
+    "tab": ("page tab",),
+    "link": ("link",),
+    "folder": ("icon", "table cell", "list item", "tree item"),
+}
+
+# roles a user can act on; preferred on equal name scores
+INTERACTIVE_ROLES = {
+    "push button", "toggle button", "button", "menu item", "radio menu item",
+    "check menu item", "check box", "radio button", "text", "entry", "combo box",
+    "page tab", "link", "list item", "tree item", "table cell", "icon", "spin button",
+    "switch", "menu",
+}
+
+
+class A11yNode(NamedTuple):
+    path: Path
+    name: str
+    role: str
+    bbox: Tuple[int, int, int, int]  # x, y, w, h, desktop coordinates
+
+
+class A11yIndex:
+    """Name/role lookup over one application snapshot (pure Python)."""
+
+    def __init__(self, nodes: Sequence[A11yNode] = ()):
+        self.nodes: Dict[Path, A11yNode] = {}
+        self._norm: Dict[Path, str] = {}
+        for n in nodes:
+            self.put(n)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def put(self, node: A11yNode) -> None:
+        self.nodes[node.path] = node
+        self._norm[node.path] = normalize(node.name)
+
+    def drop_subtree(self, prefix: Path) -> None:
+        k = len(prefix)
+        for path in [p for p in self.nodes if p[:k] == prefix]:
+            del self.nodes[path]
+            del self._norm[path]
+
+    # -------------------------------------------------------------
+    def find(self, labels: Sequence[str], role_words: Sequence[str] = ()) -> Optional[Tuple[A11yNode, float]]:
+        roles = set()
+        for w in role_words:
+            roles.update(ROLE_WORDS.get(w, ()))
+
+        best: Optional[Tuple[A11yNode, float]] = None
+        best_key = None
+        for label in labels:
+            if not label:
+                continue
+            for path, norm in self._norm.items():
+                if not norm:
+                    continue
+                if norm == label:
+                    score = 1.0
+                elif label in norm.split() or (len(label) > 3 and label in norm):
+                    score = 0.85
+                else:
+                    score = text_similarity(label, norm) * 0.95
+                    if score < 0.7:
+                        continue
+
+                node = self.nodes[path]
+                if roles:
+                    score += 0.05 if node.role in roles else -0.1
+                score = max(0.0, min(1.0, score))
+                # ties: interactive roles, then smaller (more specific) elements
+                key = (score, node.role in INTERACTIVE_ROLES, -(node.bbox[2] * node.bbox[3]))
+                if best_key is None or key > best_key:
+                    best, best_key = (node, score), key
+            if best is not None and best[1] >= 0.99:
+                break
+        return best
+
+
+# ---------------------------------------------------------------------------
+# AT-SPI snapshot + incremental updates
+# ---------------------------------------------------------------------------
+def _extents(acc) -> Optional[Tuple[int, int, int, int]]:
+    try:
+        e = acc.queryComponent().getExtents(pyatspi.DESKTOP_COORDS)
+    except Exception:
+        return None
+    if e.width <= 0 or e.height <= 0 or e.x < -10000 or e.y < -10000:
+        return None
+    return (int(e.x), int(e.y), int(e.width), int(e.height))
+
+
+def _showing(acc) -> bool:
+    try:
+        states = acc.getState()
+        return states.contains(pyatspi.STATE_SHOWING) and states.contains(pyatspi.STATE_VISIBLE)
+    except Exception:
+        return False
+
+
+def _node(acc, path: Path) -> Optional[A11yNode]:
+    if not _showing(acc):
+        return None
+    bbox = _extents(acc)
+    if bbox is None:
+        return None
+    try:
+        name = acc.name or ""
+        role = acc.getRoleName() or ""
+    except Exception:
+        return None
+    return A11yNode(path, name, role, bbox)
+
+
+def _walk(acc, path: Path, index: A11yIndex, budget: List[int], depth: int = 0) -> None:
+    if budget[0] <= 0 or depth > 40:
+        return
+    budget[0] -= 1
+    node = _node(acc, path)
+    if node is None and path:
+        return  # hidden subtree
+    if node is not None:
+        index.put(node)
+    try:
+        count = acc.childCount
+    except Exception:
+        return
+    for i in range(count):
+        try:
+            child = acc.getChildAtIndex(i)
+        except Exception:
+            continue
+        if child is not None:
+            _walk(child, path + (i,), index, budget, depth + 1)
+
+
+def _path_of(acc, app) -> Optional[Path]:
+    path: List[int] = []
+    cur = acc
+    for _ in range(64):
+        if cur is None:
+            return None
+        if cur == app:
+            return tuple(reversed(path))
+        try:
+            path.append(cur.getIndexInParent())
+            cur = cur.parent
+        except Exception:
+            return None
+    return None
+
+
+class _AppSnapshot:
+    def __init__(self, app):
+        self.app = app
+        self.index = A11yIndex()
+        self.built_at = 0.0
+        self.dirty = True
+
+    def rebuild(self, max_nodes: int) -> None:
+        index = A11yIndex()
+        _walk(self.app, (), index, [max_nodes])
+        self.index, self.built_at, self.dirty = index, time.monotonic(), False
+
+    def refresh_subtree(self, acc, max_nodes: int) -> bool:
+        path = _path_of(acc, self.app)
+        if path is None:
+            return False
+        self.index.drop_subtree(path)
+        _walk(acc, path, self.index, [max_nodes])
+        return True
+
+
+class ATSPIAdapter(BaseAdapter):
+    integration_mode = IntegrationMode.PARTIAL
+    capabilities = ["detect"]
+
+    EVENTS = (
+        "object:children-changed",
+        "object:property-change:accessible-name",
+        "object:state-changed:showing",
+        "object:bounds-changed",
+        "window:activate",
+    )
+
+    def __init__(self, ttl: Optional[float] = None, max_nodes: int = 5000, listen: bool = True):
+        self.ttl = float(ttl or os.getenv("A11Y_SNAPSHOT_TTL", 5.0))
+        self.max_nodes = max_nodes
+        self._snapshots: Dict[Any, _AppSnapshot] = {}
+        # source accessible → event types seen since the last lookup
+        self._pending: Dict[Any, set] = {}
+        self._overflow = False
+        self._events_lock = threading.Lock()
+        self._listening = False
+        if ATSPI_AVAILABLE and listen:
+            self._start_listener()
+
+    # -------------------------------------------------------------
+    def _start_listener(self) -> None:
+        try:
+            for ev in self.EVENTS:
+                pyatspi.Registry.registerEventListener(self._on_event, ev)
+            threading.Thread(target=pyatspi.Registry.start, name="atspi-events", daemon=True).start()
+            self._listening = True
+        except Exception as e:
+            logger.debug("AT-SPI event listener unavailable, using TTL refresh: %s", e)
+
+    def _on_event(self, event) -> None:
+        with self._events_lock:
+            if self._overflow:
+                return
+            try:
+                kinds = self._pending.get(event.source)
+                if kinds is None:
+                    if len(self._pending) >= EVENT_BACKLOG:
+                        self._pending.clear()
+                        self._overflow = True
+                        return
+                    kinds = self._pending[event.source] = set()
+            except TypeError:  # unhashable source: cannot be routed
+                self._pending.clear()
+                self._overflow = True
+                return
+            kinds.add(event.type)
+
+    def _apply_events(self) -> None:
+        """Route the coalesced events to the snapshot of each source's application."""
+        with self._events_lock:
+            pending, self._pending = self._pending, {}
+            overflow, self._overflow = self._overflow, False
+        if overflow:
+            for snap in self._snapshots.values():
+                snap.dirty = True
+            return
+        for source, kinds in pending.items():
+            try:
+                snap = self._snapshots.get(source.getApplication())
+            except Exception:
+                continue
+            if snap is None or snap.dirty:
+                continue
+            if any(k.startswith("window:") for k in kinds):
+                snap.dirty = True
+            elif all(k.startswith("object:property-change") for k in kinds):
+                path = _path_of(source, snap.app)
+                node = _node(source, path) if path is not None else None
+                if node is not None:
+                    snap.index.put(node)
+            # children / visibility / bounds: re-walk only the source subtree
+            elif not snap.refresh_subtree(source, self.max_nodes):
+                snap.dirty = True
+
+    def _focused_app(self):
+        desktop = pyatspi.Registry.getDesktop(0)
+        for app in desktop:
+            if app is None:
+                continue
+            try:
+                for win in app:
+                    if win is not None and win.getState().contains(pyatspi.STATE_ACTIVE):
+                        return app
+            except Exception:
+                continue
+        return None
+
+    def snapshot(self) -> Optional[A11yIndex]:
+        """Cached A11yIndex of the focused application."""
+        app = self._focused_app()
+        if app is None:
+            return None
+        snap = self._snapshots.get(app)
+        if snap is None:
+            snap = self._snapshots[app] = _AppSnapshot(app)
+
+        if self._listening:
+            self._apply_events()
+        elif time.monotonic() - snap.built_at > self.ttl:
+            snap.dirty = True
+
+        if snap.dirty:
+            snap.rebuild(self.max_nodes)
+        return snap.index
+
+    # -------------------------------------------------------------
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        if not ATSPI_AVAILABLE:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "a11y_unavailable"}
+
+        try:
+            index = self.snapshot()
+        except Exception as e:
+            logger.debug("AT-SPI snapshot failed: %s", e)
+            index = None
+        if not index:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_tree"}
+
+        query = step.get("text") or ""
+        description = step.get("description") or ""
+        labels = label_candidates(query, description)
+        role_words = [w for w in normalize(f"{query} {description}").split() if w in ROLE_WORDS]
+
+        found = index.find(labels, role_words)
+        if found is None:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_match",
+                    "raw": {"labels": labels, "nodes": len(index)}}
+
+        node, score = found
+        x, y, w, h = node.bbox
+        return {
+            "bbox": [x, y, w, h],
+            "point": [x + w // 2, y + h // 2],
+            "confidence": round(score, 3),
+            "type": "a11y",
+            "space": "screen",  # desktop coordinates, independent of the image
+            "raw": {"name": node.name, "role": node.role},
+        }
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+def create():
+    return ATSPIAdapter()
@@ -0,0 +1,266 @@
+# os_automation/repos/cascade_adapter.py
+"""
+Cost-ordered detector cascade.
+
+Tries cheap detectors first and stops at the first tier whose result
+clears that tier's confidence threshold:
+
+    template  → screen_index (OCR) → a11y → osatlas → omniparser
+
+Tiers are registry adapter names; tiers that are not registered are
+skipped. Per-tier calls, hits and latency are recorded (stats()).
+
+learn(step, result) is called by the executor once a detection passed
+validation; it is forwarded to every tier exposing learn() (e.g. the
+template store keeps the patch so the next lookup stays on the cheap tier).
+unlearn(step, result) is the opposite, after a failed validation: it goes to
+the tier that produced the result, so a stale template is not hit again.
+
+detect_batch(image, queries) walks the tiers once for several targets, so
+model-backed tiers see a single upload for everything the cheap tiers missed.
+Tiers without a native batch only see the first query: the others are
+never resolved one call at a time. The walk ends as soon as the first
+query is resolved: look-ahead never costs a model tier the current target
+did not need.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from os_automation.core.adapters import BaseAdapter, batch_step, has_native_batch
+from os_automation.core.integration_contract import IntegrationMode
+from os_automation.core.registry import registry
+
+logger = logging.getLogger(__name__)
+
+# (adapter name, min confidence to stop at this tier)
+DEFAULT_TIERS = [
+    ("template", 0.9),
+    ("screen_index", 0.8),
+    ("a11y", 0.8),
+    ("osatlas", 0.0),
+    ("omniparser", 0.0),
+]
+
+_MISS = {"bbox": None, "point": None, "confidence": 0.0, "type": "no_match"}
+
+
+def parse_tiers(tiers) -> List[tuple]:
+    """Accept [(name, thr)], [{"adapter": name, "min_confidence": thr}] or [name]."""
+    out = []
+    for t in tiers or []:
+        if isinstance(t, dict):
+            out.append((t["adapter"], float(t.get("min_confidence", 0.0))))
+        elif isinstance(t, (list, tuple)):
+            out.append((t[0], float(t[1]) if len(t) > 1 else 0.0))
+        else:
+            out.append((str(t), 0.0))
+    return out
+
+
+def has_target(res: Any) -> bool:
+    if not isinstance(res, dict):
+        return bool(res)
+    bbox, point = res.get("bbox"), res.get("point")
+    return bool((bbox and len(bbox) >= 4) or (point and len(point) >= 2))
+
+
+class CascadeDetector(BaseAdapter):
+    integration_mode = IntegrationMode.PARTIAL
+    capabilities = ["detect"]
+
+    def __init__(self, tiers: Optional[Sequence[Union[str, tuple, dict]]] = None):
+        self.tiers = parse_tiers(tiers) if tiers else list(DEFAULT_TIERS)
+        self._instances: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {"calls": 0, "hits": 0, "errors": 0, "total_ms": 0.0} for name, _ in self.tiers
+        }
+
+    # -------------------------------------------------------------
+    def _tier(self, name: str):
+        factory = registry.get_adapter(name)
+        if factory is None or factory is self:
+            return None
+        cached = self._instances.get(name)
+        if cached is not None and cached[0] is factory:
+            return cached[1]
+        try:
+            adapter = factory() if callable(factory) else factory
+        except Exception as e:
+            logger.warning("Cascade tier %s unavailable: %s", name, e)
+            adapter = None
+        self._instances[name] = (factory, adapter)
+        return adapter
+
+    def _record(self, name: str, elapsed_ms: float, hit: bool, error: bool = False) -> None:
+        with self._lock:
+            s = self._stats.setdefault(name, {"calls": 0, "hits": 0, "errors": 0, "total_ms": 0.0})
+            s["calls"] += 1
+            s["hits"] += int(hit)
+            s["errors"] += int(error)
+            s["total_ms"] += elapsed_ms
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-tier calls, hits, hit_rate and avg_ms."""
+        with self._lock:
+            out = {}
+            for name, s in self._stats.items():
+                calls = s["calls"] or 0
+                out[name] = dict(
+                    s,
+                    hit_rate=(s["hits"] / calls) if calls else 0.0,
+                    avg_ms=(s["total_ms"] / calls) if calls else 0.0,
+                )
+            return out
+
+    @property
+    def batch_supported(self) -> bool:
+        """True while some tier resolves several queries in one pass."""
+        return any(has_native_batch(a) for a in (self._tier(name) for name, _ in self.tiers) if a is not None)
+
+    # -------------------------------------------------------------
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        return self.detect_with(step)
+
+    def detect_with(self, step: Dict[str, Any],
+                    call: Optional[Callable[[Any, Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        detect(), with each tier queried through call(adapter, step)
+        instead of adapter.detect(step) (e.g. the executor's coarse-to-fine
+        pass for the model tiers on large frames).
+        """
+        tried: List[str] = []
+        fallback = None  # best below-threshold result, used if no tier clears
+
+        for name, threshold in self.tiers:
+            adapter = self._tier(name)
+            if adapter is None:
+                continue
+            tried.append(name)
+
+            start = time.perf_counter()
+            try:
+                res = call(adapter, dict(step)) if call is not None else adapter.detect(dict(step))
+            except Exception as e:
+                self._record(name, (time.perf_counter() - start) * 1000.0, hit=False, error=True)
+                logger.debug("Cascade tier %s failed: %s", name, e)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+            found = has_target(res)
+            conf = float((res or {}).get("confidence", 0.0) or 0.0) if isinstance(res, dict) else 0.0
+            hit = found and conf >= threshold
+            self._record(name, elapsed_ms, hit=hit)
+
+            if hit:
+                logger.debug("Cascade hit at tier %s (conf=%.2f, %.1f ms)", name, conf, elapsed_ms)
+                if isinstance(res, dict):
+                    res = dict(res)
+                    res["tier"] = name
+                return res
+
+            if found and (fallback is None or conf > fallback[1]):
+                fallback = (name, conf, res)
+
+        if fallback is not None:
+            name, conf, res = fallback
+            logger.debug("Cascade: no tier cleared its threshold, using %s (conf=%.2f)", name, conf)
+            res = dict(res) if isinstance(res, dict) else res
+            if isinstance(res, dict):
+                res["tier"] = name
+            return res
+
+        return dict(_MISS, raw={"tiers": tried})
+
+    def detect_batch(self, image_path: str, queries) -> List[Dict[str, Any]]:
+        """
+        Tier by tier over all queries: each natively batching tier gets the
+        queries no cheaper tier has resolved yet, in one detect_batch() call;
+        the other tiers only get the first query. Tiers past the one that
+        resolved the first query are not called.
+        """
+        steps = [batch_step(image_path, q) for q in queries]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(steps)
+        fallbacks: Dict[int, tuple] = {}
+        tried: List[str] = []
+
+        for name, threshold in self.tiers:
+            if results[0] is not None:
+                break  # the rest is look-ahead: not worth a more expensive tier
+            pending = [i for i, r in enumerate(results) if r is None]
+            adapter = self._tier(name)
+            if adapter is None:
+                continue
+            native = has_native_batch(adapter)
+            if not native:
+                pending = pending[:1] if pending[0] == 0 else []
+                if not pending:
+                    continue
+            tried.append(name)
+
+            start = time.perf_counter()
+            try:
+                if native:
+                    batch = adapter.detect_batch(image_path, [dict(steps[i]) for i in pending])
+                else:
+                    batch = [adapter.detect(dict(steps[0]))]
+            except Exception as e:
+                self._record(name, (time.perf_counter() - start) * 1000.0, hit=False, error=True)
+                logger.debug("Cascade tier %s batch failed: %s", name, e)
+                continue
+            per_query_ms = (time.perf_counter() - start) * 1000.0 / len(pending)
+
+            for i, res in zip(pending, batch):
+                found = has_target(res)
+                conf = float(res.get("confidence", 0.0) or 0.0) if isinstance(res, dict) else 0.0
+                hit = found and conf >= threshold
+                self._record(name, per_query_ms, hit=hit)
+                if hit:
+                    results[i] = dict(res, tier=name)
+                elif found and (i not in fallbacks or conf > fallbacks[i][1]):
+                    fallbacks[i] = (name, conf, res)
+
+        for i, res in enumerate(results):
+            if res is not None:
+                continue
+            if i in fallbacks:
+                name, _, fb = fallbacks[i]
+                results[i] = dict(fb, tier=name) if isinstance(fb, dict) else fb
+            else:
+                results[i] = dict(_MISS, raw={"tiers": tried})
+        return results
+
+    def learn(self, step: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Forward a validated detection to the tiers that can learn from it."""
+        for name, _ in self.tiers:
+            adapter = self._tier(name)
+            learn = getattr(adapter, "learn", None)
+            if learn is None:
+                continue
+            try:
+                learn(step, result)
+            except Exception as e:
+                logger.debug("Cascade tier %s learn() failed: %s", name, e)
+
+    def unlearn(self, step: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Forward a detection that failed validation to the tier that produced it."""
+        name = (result or {}).get("tier")
+        unlearn = getattr(self._tier(name), "unlearn", None) if name else None
+        if unlearn is None:
+            return
+        try:
+            unlearn(step, result)
+        except Exception as e:
+            logger.debug("Cascade tier %s unlearn() failed: %s", name, e)
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+def create():
+    return CascadeDetector()
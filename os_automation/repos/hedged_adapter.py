@@ -0,0 +1,232 @@
+# os_automation/repos/hedged_adapter.py
+"""
+Hedged / raced detection across several detector backends.
+
+The query goes to the primary backend first; every `hedge_delay` seconds
+without an acceptable answer the next backend is started as well (another
+OS-Atlas replica, OmniParser, OCR, ...). A backend that answers with a
+miss triggers the next one immediately. The first acceptable answer wins;
+backends that have not started are skipped and running ones are left to
+finish in the background with their result discarded. Every call runs on
+its own thread, so losers still running never queue up the next race.
+
+Backends are registry adapter names, optionally with constructor kwargs
+for replicas:
+
+    {"adapter": "osatlas", "kwargs": {"base_url": "http://replica:8000/predict"}}
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.integration_contract import IntegrationMode
+from os_automation.core.registry import registry
+from os_automation.repos.cascade_adapter import has_target
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = [
+    {"adapter": "osatlas"},
+    {"adapter": "ocr_text", "min_confidence": 0.75},
+]
+
+_MISS = {"bbox": None, "point": None, "confidence": 0.0, "type": "no_match"}
+
+
+def _parse_backends(backends) -> List[Dict[str, Any]]:
+    """Accept [{"adapter", "min_confidence", "kwargs"}], [(name, thr)] or [name]."""
+    out = []
+    for b in backends or []:
+        if isinstance(b, dict):
+            out.append({"adapter": b["adapter"], "min_confidence": float(b.get("min_confidence", 0.0)),
+                        "kwargs": dict(b.get("kwargs") or {})})
+        elif isinstance(b, (list, tuple)):
+            out.append({"adapter": b[0], "min_confidence": float(b[1]) if len(b) > 1 else 0.0, "kwargs": {}})
+        else:
+            out.append({"adapter": str(b), "min_confidence": 0.0, "kwargs": {}})
+    return out
+
+
+def _label(i: int, backend: Dict[str, Any]) -> str:
+    return backend["adapter"] if i == 0 or not backend["kwargs"] else f"{backend['adapter']}#{i}"
+
+
+class HedgedDetector(BaseAdapter):
+    integration_mode = IntegrationMode.PARTIAL
+    capabilities = ["detect"]
+
+    def __init__(
+        self,
+        backends: Optional[Sequence[Union[str, tuple, dict]]] = None,
+        hedge_delay: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.backends = _parse_backends(backends or DEFAULT_BACKENDS)
+        self.hedge_delay = float(hedge_delay if hedge_delay is not None else os.getenv("DETECT_HEDGE_DELAY", 2.0))
+        self.timeout = float(timeout if timeout is not None else os.getenv("DETECT_HEDGE_TIMEOUT", 60.0))
+        self._labels = [_label(i, b) for i, b in enumerate(self.backends)]
+        self._instances: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {
+            label: {"calls": 0, "wins": 0, "errors": 0, "total_ms": 0.0} for label in self._labels
+        }
+
+    # -------------------------------------------------------------
+    def _backend(self, i: int):
+        factory = registry.get_adapter(self.backends[i]["adapter"])
+        if factory is None or factory is self:
+            return None
+        cached = self._instances.get(i)
+        if cached is not None and cached[0] is factory:
+            return cached[1]
+        kwargs = self.backends[i]["kwargs"]
+        try:
+            if kwargs and isinstance(factory, type):
+                adapter = factory(**kwargs)
+            else:
+                adapter = factory() if callable(factory) else factory
+        except Exception as e:
+            logger.warning("Hedged backend %s unavailable: %s", self._labels[i], e)
+            adapter = None
+        self._instances[i] = (factory, adapter)
+        return adapter
+
+    def _call(self, i: int, adapter, step: Dict[str, Any]):
+        start = time.perf_counter()
+        error = False
+        try:
+            return adapter.detect(dict(step))
+        except Exception:
+            error = True
+            raise
+        finally:
+            with self._lock:
+                s = self._stats[self._labels[i]]
+                s["calls"] += 1
+                s["errors"] += int(error)
+                s["total_ms"] += (time.perf_counter() - start) * 1000.0
+
+    def _start(self, i: int, adapter, step: Dict[str, Any]) -> Future:
+        """
+        One backend call on its own daemon thread. A pool would fill with
+        losers (they run until their backend's timeout) and make the next
+        primary wait for a worker.
+        """
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run() -> None:
+            try:
+                future.set_result(self._call(i, adapter, step))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"hedge-{self._labels[i]}", daemon=True).start()
+        return future
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-backend calls, wins, errors and avg_ms."""
+        with self._lock:
+            return {
+                label: dict(s, avg_ms=(s["total_ms"] / s["calls"]) if s["calls"] else 0.0)
+                for label, s in self._stats.items()
+            }
+
+    # -------------------------------------------------------------
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        queue = []
+        for i in range(len(self.backends)):
+            adapter = self._backend(i)
+            if adapter is not None:
+                queue.append((i, adapter))
+        if not queue:
+            return dict(_MISS, raw={"backends": []})
+
+        start = time.monotonic()
+        running: Dict[Any, int] = {}
+        fallback = None  # best answer below its backend's threshold
+        next_launch = start
+
+        while queue or running:
+            now = time.monotonic()
+            # hedge: start the next backend when its turn has come (or nothing is running)
+            if queue and (now >= next_launch or not running):
+                i, adapter = queue.pop(0)
+                running[self._start(i, adapter, step)] = i
+                next_launch = time.monotonic() + self.hedge_delay
+                continue
+
+            remaining = self.timeout - (now - start)
+            if remaining <= 0:
+                logger.warning("Hedged detection timed out after %.1fs", self.timeout)
+                break
+            wait_for = min(remaining, next_launch - now) if queue else remaining
+            done, _ = wait(list(running), timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                i = running.pop(future)
+                try:
+                    res = future.result()
+                except Exception as e:
+                    logger.debug("Hedged backend %s failed: %s", self._labels[i], e)
+                    continue
+                if not has_target(res):
+                    continue
+                conf = float(res.get("confidence", 0.0) or 0.0) if isinstance(res, dict) else 0.0
+                if conf >= self.backends[i]["min_confidence"]:
+                    with self._lock:
+                        self._stats[self._labels[i]]["wins"] += 1
+                    return self._tagged(res, i)
+                if fallback is None or conf > fallback[1]:
+                    fallback = (i, conf, res)
+            if done:
+                next_launch = time.monotonic()  # a backend missed: hedge now
+
+        if fallback is not None:
+            return self._tagged(fallback[2], fallback[0])
+        return dict(_MISS, raw={"backends": self._labels})
+
+    def _tagged(self, res, i: int):
+        if isinstance(res, dict):
+            res = dict(res)
+            res["backend"] = self._labels[i]
+        return res
+
+    def learn(self, step: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Forward a validated detection to the backends that can learn from it."""
+        for i in range(len(self.backends)):
+            learn = getattr(self._backend(i), "learn", None)
+            if learn is None:
+                continue
+            try:
+                learn(step, result)
+            except Exception as e:
+                logger.debug("Hedged backend %s learn() failed: %s", self._labels[i], e)
+
+    def unlearn(self, step: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Forward a detection that failed validation to the backend that won with it."""
+        label = (result or {}).get("backend")
+        if label not in self._labels:
+            return
+        i = self._labels.index(label)
+        unlearn = getattr(self._backend(i), "unlearn", None)
+        if unlearn is None:
+            return
+        try:
+            unlearn(step, result)
+        except Exception as e:
+            logger.debug("Hedged backend %s unlearn() failed: %s", label, e)
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+def create():
+    return HedgedDetector()
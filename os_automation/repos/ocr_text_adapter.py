@@ -0,0 +1,126 @@
+# os_automation/repos/ocr_text_adapter.py
+"""
+Text-grounding detection adapter.
+
+Builds a WordBoxIndex from OCR of the frame (cached by frame hash) and
+answers "where is the label X" queries locally. Steps that target visible
+text ("Click 'Compose'", "Click Save As option") never need the remote
+grounding model; when nothing matches it returns a no_match result with
+confidence 0.0 so the next detector can take over.
+"""
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.integration_contract import IntegrationMode
+from os_automation.tools.ocr import WordBoxIndex, normalize
+from os_automation.tools.ocr_service import OCR_AVAILABLE, get_ocr_service
+from os_automation.utils.frame_diff import frame_hash
+
+logger = logging.getLogger(__name__)
+
+_QUOTED_RE = re.compile(r"['\"]([^'\"]{1,60})['\"]")
+
+# Words of a step description that name the action or the widget kind,
+# not the visible label
+_NON_LABEL_WORDS = {
+    "click", "double", "right", "left", "press", "select", "open", "tap", "choose",
+    "on", "the", "a", "an", "in", "at", "of", "to", "from", "within", "inside",
+    "button", "icon", "link", "field", "option", "menu", "item", "tab", "label",
+    "box", "checkbox", "toggle", "entry", "list", "folder", "text",
+}
+
+
+def label_candidates(query: str, description: str = "") -> List[str]:
+    """
+    Text labels worth looking for, most specific first:
+    quoted text, the description without action/widget words, the query.
+    """
+    out: List[str] = []
+
+    def add(text):
+        text = normalize(text)
+        if text and text not in out:
+            out.append(text)
+
+    for source in (description, query):
+        for m in _QUOTED_RE.finditer(source or ""):
+            add(m.group(1))
+
+    words = [w for w in normalize(description).split() if w not in _NON_LABEL_WORDS]
+    if words:
+        add(" ".join(words))
+
+    q = normalize(query)
+    if q and q not in _NON_LABEL_WORDS:
+        add(q)
+    return out
+
+
+class OCRTextAdapter(BaseAdapter):
+    integration_mode = IntegrationMode.PARTIAL
+    capabilities = ["detect"]
+
+    def __init__(self, min_score: Optional[float] = None, index_cache_size: int = 16):
+        self.min_score = float(min_score or os.getenv("OCR_TEXT_MIN_SCORE", 0.75))
+        self.index_cache_size = index_cache_size
+        self._indexes: "OrderedDict[str, WordBoxIndex]" = OrderedDict()
+        # one tier instance serves the cascade, the hedged adapter and speculation threads
+        self._indexes_lock = threading.Lock()
+
+    def index_for(self, image_path: str) -> WordBoxIndex:
+        """WordBoxIndex of a frame, built once per frame hash."""
+        key = frame_hash(image_path) or image_path
+        with self._indexes_lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        index = WordBoxIndex(get_ocr_service().ocr_words(image_path))
+        with self._indexes_lock:
+            self._indexes[key] = index
+            if len(self._indexes) > self.index_cache_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        image_path = step.get("image_path")
+        if not image_path or not os.path.exists(image_path):
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "none"}
+        if not OCR_AVAILABLE:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "ocr_unavailable"}
+
+        labels = label_candidates(step.get("text") or "", step.get("description") or "")
+        if not labels:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_label"}
+
+        index = self.index_for(image_path)
+        for label in labels:
+            match = index.best(label, min_score=self.min_score)
+            if match is None:
+                continue
+            x, y, w, h = match.bbox
+            return {
+                "bbox": [x, y, w, h],
+                "point": [x + w // 2, y + h // 2],
+                "confidence": round(match.score, 3),
+                "type": "ocr_text",
+                "raw": {"label": label, "text": match.text},
+            }
+
+        return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_match",
+                "raw": {"labels": labels, "words": len(index)}}
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+def create():
+    return OCRTextAdapter()
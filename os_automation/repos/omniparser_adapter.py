@@ -1,21 +1,58 @@
 # os_automation/repos/omniparser_adapter.py
 from os_automation.tools.omni_parser_tool import OmniParserTool
 
-from os_automation.core.adapters import BaseAdapter
+from os_automation.core.adapters import BaseAdapter, batch_step
+from os_automation.repos.ocr_text_adapter import label_candidates
+from os_automation.tools.ocr import normalize, text_similarity
+
+
+def _match_element(parsed, step, min_score=0.6):
+    """Best parsed element for one query, as a detect() result."""
+    labels = label_candidates(step.get("text") or "", step.get("description") or "")
+    best, best_score = None, 0.0
+    for key, el in (parsed or {}).items():
+        if not isinstance(el, dict) or not el.get("bbox"):
+            continue
+        content = normalize(str(el.get("content") or "").replace("_", " "))
+        if not content:
+            continue
+        for label in labels:
+            score = 1.0 if content == label else text_similarity(label, content)
+            if score > best_score:
+                best, best_score = (key, el), score
+    if best is None or best_score < min_score:
+        return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_match"}
+    key, el = best
+    x, y, w, h = el["bbox"][:4]
+    return {
+        "bbox": [x, y, w, h],
+        "point": [x + w // 2, y + h // 2],
+        "confidence": round(best_score, 3),
+        "type": "omniparser",
+        "raw": {"element": key, "content": el.get("content")},
+    }
+
 
 class OmniParserAdapter(BaseAdapter):
     def __init__(self):
         self.tool = OmniParserTool()
 
     def detect(self, step):
+        # same answer as detect_batch() for a single query
         image_path = step.get("image_path")
         if image_path is None:
             raise ValueError("image_path required")
-        return self.tool.process_image(image_path)
+        return _match_element(self.tool.process_image(image_path), step)
+
+    def detect_batch(self, image_path, queries):
+        # one parse of the screenshot, every query matched against its elements
+        if image_path is None:
+            raise ValueError("image_path required")
+        parsed = self.tool.process_image(image_path)
+        return [_match_element(parsed, batch_step(image_path, q)) for q in queries]
 
     def execute(self, step):
         return {"status": "noop"}
 
     def validate(self, step):
         return {"validation": "ok"}
-    
\ No newline at end of file
@@ -292,10 +292,12 @@ import json
 import requests
 import logging
 from typing import Any, Dict, Optional, List
+import numpy as np
 from PIL import Image
 
-from os_automation.core.adapters import BaseAdapter
+from os_automation.core.adapters import BaseAdapter, batch_step
 from os_automation.core.integration_contract import IntegrationMode
+from os_automation.utils.shm_frames import SHM_AVAILABLE, ShmFrameClient, ShmSpaceError
 
 logger = logging.getLogger(__name__)
 
@@ -404,18 +406,44 @@ class OSAtlasAdapter(BaseAdapter):
 
     integration_mode = IntegrationMode.PARTIAL
     capabilities = ["detect"]
+    # the model resizes its input anyway: large frames may be located on a downscale
+    downscale_ok = True
 
-    def __init__(self, base_url=None):
+    def __init__(self, base_url=None, batch_url=None, timeout=None, shm_socket=None):
         self.base_url = base_url or os.environ.get("OSATLAS_URL", "http://localhost:8000/predict")
+        self.timeout = float(timeout or os.environ.get("OSATLAS_TIMEOUT", 45))
+        # Multi-query endpoint (texts → responses): one upload, one model pass
+        # for several targets. Only used when the server is known to serve it.
+        self.batch_url = batch_url or os.environ.get("OSATLAS_BATCH_URL") or None
+        self.batch_supported = bool(self.batch_url)
+        # Same-host server: raw frames through shared memory instead of PNG over HTTP
+        shm_socket = shm_socket or os.environ.get("OSATLAS_SHM_SOCKET")
+        self._shm = ShmFrameClient(shm_socket, timeout=self.timeout) if shm_socket and SHM_AVAILABLE else None
+
+    @staticmethod
+    def _instruction(text: str) -> str:
+        return (
+            text.strip()
+            + "\nReturn the response as <|box_start|>[x1,y1,x2,y2]<|box_end|>"
+        )
 
     ####################################################################
     # STRICT CALL — EXACT SAME FORMAT AS os_computer_use.OSAtlasProvider
     ####################################################################
     def _call_predict(self, image_path: str, text: str):
-        instruction = (
-            text.strip()
-            + "\nReturn the response as <|box_start|>[x1,y1,x2,y2]<|box_end|>"
-        )
+        instruction = self._instruction(text)
+
+        if self._shm is not None:
+            try:
+                with Image.open(image_path) as img:
+                    frame = np.asarray(img.convert("RGB"))
+                return self._shm.predict(frame, instruction)
+            except ShmSpaceError as e:
+                logger.warning(f"OS-Atlas shared-memory transport disabled, using HTTP: {e}")
+                self._shm.close()
+                self._shm = None
+            except Exception as e:
+                logger.warning(f"OS-Atlas shared-memory transport failed, using HTTP: {e}")
 
         try:
             with open(image_path, "rb") as f:
@@ -423,7 +451,7 @@ class OSAtlasAdapter(BaseAdapter):
                     self.base_url,
                     files={"image": f},
                     data={"text": instruction},
-                    timeout=45
+                    timeout=self.timeout
                 )
             resp.raise_for_status()
             return resp.json()
@@ -503,15 +531,38 @@ class OSAtlasAdapter(BaseAdapter):
     #     }
     
     
-    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
-        image_path = step.get("image_path")
-        query = step.get("text") or step.get("description") or ""
-
-        if not image_path or not os.path.exists(image_path):
-            return {"bbox": None, "point": None, "confidence": 0.0, "type": "none"}
+    def _call_predict_batch(self, image_path: str, texts: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        POST one image with several instructions to the batch endpoint.
+        Returns one response per text, or None when batching is unavailable.
+        """
+        try:
+            with open(image_path, "rb") as f:
+                resp = requests.post(
+                    self.batch_url,
+                    files={"image": f},
+                    data={"texts": json.dumps([self._instruction(t) for t in texts])},
+                    timeout=self.timeout
+                )
+            if resp.status_code in (404, 405, 501):
+                logger.info("OS-Atlas batch endpoint not available; batching disabled.")
+                self.batch_supported = False
+                return None
+            resp.raise_for_status()
+            responses = resp.json().get("responses")
+            if not isinstance(responses, list) or len(responses) != len(texts):
+                logger.warning("OS-Atlas batch returned %s responses for %d queries",
+                               len(responses) if isinstance(responses, list) else "no", len(texts))
+                return None
+            return responses
+        except Exception as e:
+            logger.error(f"OS-Atlas batch error: {e}")
+            return None
 
-        # ---- Call OS-Atlas ----
-        resp = self._call_predict(image_path, query)
+    @staticmethod
+    def _result_from_response(resp: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(resp, dict):
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "error", "raw": resp}
         if "error" in resp:
             return {"bbox": None, "point": None, "confidence": 0.0, "type": "error", "raw": resp}
 
@@ -520,7 +571,7 @@ class OSAtlasAdapter(BaseAdapter):
         if not bbox or len(bbox) < 4:
             return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_bbox", "raw": resp}
 
-        x1, y1, x2, y2 = bbox
+        x1, y1, x2, y2 = bbox[:4]
         # Convert to (x,y,w,h)
         w = max(1, x2 - x1)
         h = max(1, y2 - y1)
@@ -536,6 +587,40 @@ class OSAtlasAdapter(BaseAdapter):
             "type": "osatlas_bbox",
         }
 
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        image_path = step.get("image_path")
+        query = step.get("text") or step.get("description") or ""
+
+        if not image_path or not os.path.exists(image_path):
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "none"}
+
+        # ---- Call OS-Atlas ----
+        resp = self._call_predict(image_path, query)
+        return self._result_from_response(resp)
+
+    def detect_batch(self, image_path: str, queries) -> List[Dict[str, Any]]:
+        """
+        One request for all queries through the batch endpoint. Without it
+        (or when the batch request fails) only the first query is sent, on
+        its own: the others come back as errors rather than costing one
+        model call each, and are resolved when they are asked for.
+        """
+        steps = [batch_step(image_path, q) for q in queries]
+        if not image_path or not os.path.exists(image_path):
+            return [{"bbox": None, "point": None, "confidence": 0.0, "type": "none"} for _ in steps]
+        if not steps:
+            return []
+
+        if len(steps) > 1 and self.batch_supported:
+            texts = [s.get("text") or s.get("description") or "" for s in steps]
+            responses = self._call_predict_batch(image_path, texts)
+            if responses is not None:
+                return [self._result_from_response(r) for r in responses]
+
+        unresolved = {"bbox": None, "point": None, "confidence": 0.0, "type": "error",
+                      "raw": {"error": "batch unavailable"}}
+        return [self.detect(steps[0])] + [dict(unresolved) for _ in steps[1:]]
+
 
     ####################################################################
     # Business logic unchanged
@@ -37,10 +37,14 @@ import time
 import logging
 from typing import Dict, Any, List
 
-import pyautogui
+try:
+    import pyautogui
+except Exception:  # no display: importable, every action fails with an error result
+    pyautogui = None
 
 from os_automation.tools.pyautogui.py_auto_tool import PyAutoTool
 from os_automation.core.adapters import BaseAdapter
+from os_automation.utils.artifacts import save_frame
 
 logger = logging.getLogger(__name__)
 
@@ -182,7 +186,7 @@ class PyAutoGUIAdapter(BaseAdapter):
         path = os.path.join(self.output_dir, f"{prefix}_{timestamp}.png")
         try:
             img = pyautogui.screenshot()
-            img.save(path)
+            save_frame(img, path)
             return path
         except Exception as e:
             logger.exception("Screenshot failed: %s", e)
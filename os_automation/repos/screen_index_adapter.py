@@ -0,0 +1,67 @@
+# os_automation/repos/screen_index_adapter.py
+"""
+Text-label detection over an incrementally maintained screen index.
+
+Same matching as OCRTextAdapter, but the word index is carried from frame
+to frame (tools.screen_index): between steps only the dirty rectangles are
+re-OCR'd, so full-frame OCR happens once per screen transition rather
+than once per new screenshot.
+"""
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.integration_contract import IntegrationMode
+from os_automation.repos.ocr_text_adapter import label_candidates
+from os_automation.tools.ocr_service import OCR_AVAILABLE
+from os_automation.tools.screen_index import ScreenIndex, ocr_extractor
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenIndexAdapter(BaseAdapter):
+    integration_mode = IntegrationMode.PARTIAL
+    capabilities = ["detect"]
+
+    def __init__(self, screen: Optional[ScreenIndex] = None, min_score: Optional[float] = None):
+        self.screen = screen if screen is not None else ScreenIndex()
+        self.min_score = float(min_score or os.getenv("OCR_TEXT_MIN_SCORE", 0.75))
+
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        image_path = step.get("image_path")
+        if not image_path or not os.path.exists(image_path):
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "none"}
+        if not OCR_AVAILABLE and self.screen.extractors == [ocr_extractor]:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "ocr_unavailable"}
+
+        labels = label_candidates(step.get("text") or "", step.get("description") or "")
+        if not labels:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_label"}
+
+        index = self.screen.update(image_path).index
+        for label in labels:
+            match = index.best(label, min_score=self.min_score)
+            if match is None:
+                continue
+            x, y, w, h = match.bbox
+            return {
+                "bbox": [x, y, w, h],
+                "point": [x + w // 2, y + h // 2],
+                "confidence": round(match.score, 3),
+                "type": "screen_index",
+                "raw": {"label": label, "text": match.text},
+            }
+
+        return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_match",
+                "raw": {"labels": labels, "words": len(index)}}
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+def create():
+    return ScreenIndexAdapter()
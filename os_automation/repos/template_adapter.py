@@ -0,0 +1,99 @@
+# os_automation/repos/template_adapter.py
+"""
+Template-matching detection adapter (native replacement for the Sikuli
+image search, no Java bridge).
+
+detect(): looks up validated patches for (active application, target) in
+the TemplateStore and locates them by normalized cross-correlation.
+learn(): stores the patch under a validated bbox.
+unlearn(): forgets the patches of a target whose hit failed validation.
+"""
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.integration_contract import IntegrationMode
+from os_automation.tools.ocr import normalize
+from os_automation.tools.template_store import TemplateStore
+from os_automation.utils.window_info import active_app
+
+logger = logging.getLogger(__name__)
+
+_store: Optional[TemplateStore] = None
+
+
+def get_template_store() -> TemplateStore:
+    global _store
+    if _store is None:
+        _store = TemplateStore()
+    return _store
+
+
+def target_key(step: Dict[str, Any]) -> str:
+    """(application, target) key of a detection step."""
+    app = step.get("app")
+    if app is None:
+        app = active_app()
+    target = normalize(step.get("description") or "") or normalize(step.get("text") or "")
+    return TemplateStore.make_key(app, target)
+
+
+class TemplateAdapter(BaseAdapter):
+    integration_mode = IntegrationMode.PARTIAL
+    capabilities = ["detect"]
+
+    def __init__(self, store: Optional[TemplateStore] = None, min_score: Optional[float] = None):
+        self.store = store if store is not None else get_template_store()
+        self.min_score = float(min_score or os.getenv("TEMPLATE_MIN_SCORE", 0.9))
+
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        image_path = step.get("image_path")
+        if not image_path or not os.path.exists(image_path):
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "none"}
+
+        key = target_key(step)
+        try:
+            with Image.open(image_path) as frame:
+                hit = self.store.locate(key, frame, min_score=self.min_score)
+        except Exception as e:
+            logger.debug("Template locate failed: %s", e)
+            hit = None
+
+        if hit is None:
+            return {"bbox": None, "point": None, "confidence": 0.0, "type": "no_match", "raw": {"key": key}}
+
+        x, y, w, h = hit.bbox
+        return {
+            "bbox": [x, y, w, h],
+            "point": [x + w // 2, y + h // 2],
+            "confidence": round(hit.score, 3),
+            "type": "template",
+            "raw": {"key": key},
+        }
+
+    def learn(self, step: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """Remember the patch of a validated detection."""
+        image_path = step.get("image_path")
+        bbox = (result or {}).get("bbox")
+        if not image_path or not bbox or len(bbox) < 4 or not os.path.exists(image_path):
+            return False
+        with Image.open(image_path) as frame:
+            return self.store.remember(target_key(step), frame, bbox)
+
+    def unlearn(self, step: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """A template hit failed validation: its patches would keep matching the wrong place."""
+        if (result or {}).get("type") == "template":
+            self.store.forget(((result or {}).get("raw") or {}).get("key") or target_key(step))
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+def create():
+    return TemplateAdapter()
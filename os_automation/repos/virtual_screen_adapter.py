@@ -0,0 +1,83 @@
+# os_automation/repos/virtual_screen_adapter.py
+"""
+Executor and detector over an in-memory VirtualScreen.
+
+Registered as "virtual_screen" and usable as both the executor and the
+detection adapter: detect() answers from the screen's widget table
+(exact bboxes, no model), execute() drives the screen like
+PyAutoGUIAdapter drives the display. The ExecutorAgent captures and types
+on `adapter.screen` instead of pyautogui when this adapter is its
+executor, so whole runs go through the orchestrator without X.
+
+`latency` (seconds per detect) and `miss_rate` (share of detections that
+come back empty, seeded) let the retry / escalation paths be exercised.
+"""
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+from os_automation.core.adapters import BaseAdapter
+from os_automation.tools.virtual_screen import VirtualScreen
+
+logger = logging.getLogger(__name__)
+
+
+class VirtualScreenAdapter(BaseAdapter):
+    SUPPORTED_EVENTS = {
+        "click",
+        "double_click",
+        "type",
+        "keypress",
+        "hotkey",
+        "scroll",
+        "right_click",
+    }
+
+    def __init__(self, screen: Optional[VirtualScreen] = None, latency: float = 0.0,
+                 miss_rate: float = 0.0, seed: int = 0):
+        self.screen = screen if screen is not None else VirtualScreen.from_env()
+        self.latency = float(latency)
+        self.miss_rate = float(miss_rate)
+        self._rng = random.Random(seed)
+        self.detect_calls = 0
+
+    def detect(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        self.detect_calls += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if self.miss_rate > 0 and self._rng.random() < self.miss_rate:
+            return {"bbox": None, "type": "no_match", "confidence": 0.0}
+        widget = self.screen.find(step.get("description") or "") or self.screen.find(step.get("text") or "")
+        if widget is None:
+            return {"bbox": None, "type": "no_match", "confidence": 0.0}
+        return {"bbox": list(widget.bbox), "type": widget.type, "confidence": 1.0, "label": widget.label}
+
+    def execute(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        event = step.get("event")
+        bbox = step.get("bbox")
+        if not bbox:
+            raise ValueError("bbox required")
+        x, y, w, h = bbox
+        cx, cy = x + w // 2, y + h // 2
+        screen = self.screen
+        if event == "click":
+            screen.click(cx, cy)
+        elif event == "double_click":
+            screen.doubleClick(cx, cy)
+        elif event == "right_click":
+            screen.rightClick(cx, cy)
+        elif event == "type":
+            screen.write(step.get("text") or "")
+        elif event == "keypress":
+            screen.press(step.get("key"))
+        elif event == "hotkey":
+            screen.hotkey(*(step.get("keys") or ()))
+        elif event == "scroll":
+            screen.scroll(300 if step.get("direction") == "up" else -300, cx, cy)
+        else:
+            return {"status": "failed", "error": f"Unknown event {event}"}
+        return {"status": "success"}
+
+    def validate(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        return {"validation": "ok"}
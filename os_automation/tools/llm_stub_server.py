@@ -0,0 +1,253 @@
+# os_automation/tools/llm_stub_server.py
+"""
+Deterministic local stand-in for the OpenAI chat-completions API.
+
+Answers POST /v1/chat/completions (and GET /v1/models) on 127.0.0.1 from
+a script of rules, so the planner, rewrite, replanner and validator calls
+can be benchmarked and tested without network access. Point the agents
+at it with OPENAI_BASE_URL=<server.base_url> (or their base_url
+argument).
+
+Script (YAML / JSON, or the same structure in Python):
+
+  latency: lognormal:-2.3,0.4     # seconds before the first token
+  chunk_chars: 8                  # streaming: characters per chunk
+  chunk_interval: 0.005           # streaming: seconds between chunks
+  default: "{}"
+  rules:
+    - system: automation planner  # regex on the system message (optional)
+      user: '(?i)^compute (\\d+)\\+(\\d+)'   # regex on the last user message (optional)
+      response: "steps: [...] \\1 ..."      # may use the user-pattern groups
+      latency: fixed:0.5          # per-rule override
+
+The first rule whose patterns all match answers; a rule without patterns
+matches everything. In Python, `response` may also be a callable
+(system, user) → str. Latency specs: fixed:S, uniform:A,B, normal:MU,SD,
+lognormal:MU,SIGMA, exp:MEAN (seeded, never negative). "stream": true
+requests get server-sent events, one chunk per `chunk_chars`.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+Response = Union[str, Callable[[str, str], str]]
+
+
+class Latency:
+    """Seeded latency distribution parsed from "kind:a,b"."""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exp")
+
+    def __init__(self, spec: Union[str, float, None] = 0.0, seed: int = 0):
+        self.spec = str(spec if spec is not None else 0.0)
+        kind, _, args = self.spec.partition(":")
+        if not args:
+            kind, args = "fixed", kind
+        if kind not in self.KINDS:
+            raise ValueError(f"unknown latency distribution {kind!r} (one of {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a.strip()]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        a = self.args
+        with self._lock:
+            if self.kind == "fixed":
+                value = a[0] if a else 0.0
+            elif self.kind == "uniform":
+                value = self._rng.uniform(a[0], a[1])
+            elif self.kind == "normal":
+                value = self._rng.gauss(a[0], a[1])
+            elif self.kind == "lognormal":
+                value = self._rng.lognormvariate(a[0], a[1])
+            else:
+                value = self._rng.expovariate(1.0 / a[0]) if a[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+class Rule:
+    def __init__(self, response: Response, user: Optional[str] = None, system: Optional[str] = None,
+                 latency: Union[str, float, None] = None, name: Optional[str] = None, seed: int = 0):
+        self.response = response
+        self.user = re.compile(user, re.S) if user else None
+        self.system = re.compile(system, re.S) if system else None
+        self.latency = Latency(latency, seed) if latency is not None else None
+        self.name = name or (user or system or "any")
+
+    def match(self, system: str, user: str) -> Optional[str]:
+        if self.system is not None and not self.system.search(system):
+            return None
+        m = None
+        if self.user is not None:
+            m = self.user.search(user)
+            if m is None:
+                return None
+        if callable(self.response):
+            return self.response(system, user)
+        return m.expand(self.response) if m is not None else self.response
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):  # multimodal content parts
+        return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return content or ""
+
+
+def _tokens(text: str) -> int:
+    return len(text.split())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        out = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            return self._send_json(200, {"object": "list", "data": [
+                {"id": self.server.stub.model, "object": "model", "owned_by": "local"}]})
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "not found"}})
+        try:
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": {"message": "invalid JSON"}})
+        stub: LLMStubServer = self.server.stub
+        content, delay, _rule = stub.answer(req.get("messages") or [])
+        time.sleep(delay)
+        model = req.get("model") or stub.model
+        if req.get("stream"):
+            return self._stream(stub, model, content)
+        prompt_tokens = sum(_tokens(_text(m.get("content"))) for m in req.get("messages") or [])
+        self._send_json(200, {
+            "id": stub.next_id(),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": _tokens(content),
+                      "total_tokens": prompt_tokens + _tokens(content)},
+        })
+
+    def _stream(self, stub: "LLMStubServer", model: str, content: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        cid, created = stub.next_id(), int(time.time())
+
+        def event(delta: Dict[str, Any], finish: Optional[str] = None) -> None:
+            chunk = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        step = max(1, stub.chunk_chars)
+        for i in range(0, len(content), step):
+            if i and stub.chunk_interval > 0:
+                time.sleep(stub.chunk_interval)
+            event({"content": content[i:i + step]})
+        event({}, finish="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class LLMStubServer:
+    def __init__(
+        self,
+        rules: Sequence[Union[Rule, Dict[str, Any]]] = (),
+        default: Response = "{}",
+        latency: Union[str, float, None] = 0.0,
+        chunk_chars: int = 8,
+        chunk_interval: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        model: str = "stub",
+        seed: int = 0,
+    ):
+        self.rules: List[Rule] = [r if isinstance(r, Rule) else Rule(seed=seed, **r) for r in rules]
+        self.default = Rule(default, name="default")
+        self.latency = Latency(latency, seed)
+        self.chunk_chars = int(chunk_chars)
+        self.chunk_interval = float(chunk_interval)
+        self.model = model
+        self.calls = 0
+        self.log: List[Dict[str, Any]] = []  # rule name, latency and message lengths per request
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_file(cls, path: str, **overrides) -> "LLMStubServer":
+        with open(path, "r", encoding="utf-8") as f:
+            script = yaml.safe_load(f) or {}
+        script.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**script)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def next_id(self) -> str:
+        with self._lock:
+            return f"chatcmpl-stub-{self.calls}"
+
+    def answer(self, messages: List[Dict[str, Any]]) -> Tuple[str, float, str]:
+        """(content, delay in seconds, rule name) for a request's messages."""
+        system = "\n".join(_text(m.get("content")) for m in messages if m.get("role") == "system")
+        user = next((_text(m.get("content")) for m in reversed(messages) if m.get("role") == "user"), "")
+        for rule in self.rules + [self.default]:
+            content = rule.match(system, user)
+            if content is not None:
+                break
+        delay = (rule.latency or self.latency).sample()
+        with self._lock:
+            self.calls += 1
+            self.log.append({"rule": rule.name, "latency": delay, "system": len(system), "user": len(user)})
+        return str(content), delay, rule.name
+
+    def start(self) -> "LLMStubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="llm-stub")
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "LLMStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
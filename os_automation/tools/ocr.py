@@ -0,0 +1,159 @@
+# os_automation/tools/ocr.py
+"""
+OCR word-box index for text grounding.
+
+WordBoxIndex is built once per frame from OCR word boxes and answers text
+queries ("Compose", "Save As", "Setings") with exact, phrase and fuzzy
+(trigram) matching, without touching the image again.
+
+simple_ocr(image_path) -> (text, [(word, (x, y, w, h)), ...]) is kept for
+callers that only want raw words (see the legacy OSAtlas fallback).
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from os_automation.tools.ocr_service import OCRWord, get_ocr_service
+
+_NORM_RE = re.compile(r"[^\w+#@.-]+")
+
+
+def normalize(text: str) -> str:
+    return _NORM_RE.sub(" ", (text or "").lower()).strip(" .-")
+
+
+def _trigrams(word: str) -> Set[str]:
+    w = f"  {word} "
+    return {w[i:i + 3] for i in range(len(w) - 2)}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+def text_similarity(a: str, b: str) -> float:
+    """Trigram (Dice) similarity of two normalized strings, 0..1."""
+    if a == b:
+        return 1.0
+    return _similarity(_trigrams(a), _trigrams(b))
+
+
+class TextMatch(NamedTuple):
+    text: str
+    bbox: Tuple[int, int, int, int]  # x, y, w, h
+    score: float  # 0..1
+
+
+class WordBoxIndex:
+    """
+    Lookup structure over the OCR words of one frame.
+
+    - exact word → word ids (dict)
+    - trigram → word ids, for typo-tolerant candidates
+    - words grouped by line, for multi-word phrases
+    """
+
+    def __init__(self, words: Sequence[OCRWord], min_conf: float = 30.0):
+        self.words: List[OCRWord] = []
+        self._norm: List[str] = []
+        self._grams: List[Set[str]] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._by_gram: Dict[str, List[int]] = {}
+        self._lines: Dict[int, List[int]] = {}
+
+        for w in words:
+            norm = normalize(w.text)
+            if not norm or (w.conf >= 0 and w.conf < min_conf):
+                continue
+            i = len(self.words)
+            self.words.append(w)
+            self._norm.append(norm)
+            grams = _trigrams(norm)
+            self._grams.append(grams)
+            self._exact.setdefault(norm, []).append(i)
+            for g in grams:
+                self._by_gram.setdefault(g, []).append(i)
+            self._lines.setdefault(w.line, []).append(i)
+
+        # word ids in reading order within each line
+        for ids in self._lines.values():
+            ids.sort(key=lambda i: self.words[i].bbox[0])
+        self._pos_in_line = {i: (line, k) for line, ids in self._lines.items() for k, i in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @classmethod
+    def from_image(cls, image_path: str, region=None) -> "WordBoxIndex":
+        return cls(get_ocr_service().ocr_words(image_path, region))
+
+    # -------------------------------------------------------------
+    def _word_scores(self, token: str, min_score: float) -> Dict[int, float]:
+        scores = {i: 1.0 for i in self._exact.get(token, ())}
+        if scores:
+            return scores
+        grams = _trigrams(token)
+        seen: Set[int] = set()
+        for g in grams:
+            seen.update(self._by_gram.get(g, ()))
+        for i in seen:
+            s = _similarity(grams, self._grams[i])
+            if s >= min_score:
+                scores[i] = s
+        return scores
+
+    def _bbox(self, ids: Sequence[int]) -> Tuple[int, int, int, int]:
+        boxes = [self.words[i].bbox for i in ids]
+        x1 = min(b[0] for b in boxes)
+        y1 = min(b[1] for b in boxes)
+        x2 = max(b[0] + b[2] for b in boxes)
+        y2 = max(b[1] + b[3] for b in boxes)
+        return (x1, y1, x2 - x1, y2 - y1)
+
+    def find(self, query: str, min_score: float = 0.7, limit: int = 5) -> List[TextMatch]:
+        """
+        Best matches for a query, highest score first (ties: top-left first).
+        Multi-word queries must match consecutive words of one line.
+        """
+        tokens = normalize(query).split()
+        if not tokens or not self.words:
+            return []
+
+        first = self._word_scores(tokens[0], min_score)
+        results: List[TextMatch] = []
+
+        for start, s0 in first.items():
+            line, pos = self._pos_in_line[start]
+            line_ids = self._lines[line]
+            ids, total = [start], s0
+            for k, token in enumerate(tokens[1:], start=1):
+                if pos + k >= len(line_ids):
+                    break
+                nxt = line_ids[pos + k]
+                s = 1.0 if self._norm[nxt] == token else _similarity(_trigrams(token), self._grams[nxt])
+                if s < min_score:
+                    break
+                ids.append(nxt)
+                total += s
+            if len(ids) != len(tokens):
+                continue
+            text = " ".join(self.words[i].text for i in ids)
+            results.append(TextMatch(text, self._bbox(ids), total / len(tokens)))
+
+        results.sort(key=lambda m: (-m.score, m.bbox[1], m.bbox[0]))
+        return results[:limit]
+
+    def best(self, query: str, min_score: float = 0.7) -> Optional[TextMatch]:
+        found = self.find(query, min_score=min_score, limit=1)
+        return found[0] if found else None
+
+
+def simple_ocr(image_path: str, region=None) -> Tuple[str, List[Tuple[str, Tuple[int, int, int, int]]]]:
+    """Full text + (word, bbox) pairs of a screenshot."""
+    words = get_ocr_service().ocr_words(image_path, region)
+    lines: Dict[int, List[str]] = {}
+    for w in words:
+        lines.setdefault(w.line, []).append(w.text)
+    text = "\n".join(" ".join(parts) for _, parts in sorted(lines.items()))
+    return text, [(w.text, tuple(w.bbox)) for w in words]
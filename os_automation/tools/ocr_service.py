@@ -0,0 +1,239 @@
+# os_automation/tools/ocr_service.py
+"""
+Shared OCR service.
+
+- Keeps a pool of warm tesseract engines (tesserocr API handles) instead of
+  spawning a tesseract process per call. Falls back to pytesseract when
+  tesserocr is not installed.
+- OCRs only a region of the frame when one is given.
+- Caches results by (frame hash, region), so the several validator branches
+  that look at the same after-screenshot share one OCR run.
+- ocr_words() returns word boxes (text + bbox + line) for text grounding.
+
+Config:
+    OCR_POOL_SIZE  number of tesserocr engines (default 2)
+    OCR_LANG       tesseract language (default "eng")
+"""
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from os_automation.utils.frame_diff import frame_hash
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tesserocr
+
+    TESSEROCR_AVAILABLE = True
+except Exception:
+    tesserocr = None
+    TESSEROCR_AVAILABLE = False
+
+try:
+    import pytesseract
+
+    PYTESSERACT_AVAILABLE = True
+except Exception:
+    pytesseract = None
+    PYTESSERACT_AVAILABLE = False
+
+OCR_AVAILABLE = TESSEROCR_AVAILABLE or PYTESSERACT_AVAILABLE
+
+Region = Tuple[int, int, int, int]  # x, y, w, h
+
+
+class OCRWord(NamedTuple):
+    text: str
+    bbox: Region  # x, y, w, h in frame coordinates
+    conf: float  # 0-100, tesseract scale
+    line: int  # words with the same line id belong to one text line
+
+
+class OCRService:
+    def __init__(self, pool_size: Optional[int] = None, cache_size: int = 128,
+                 lang: Optional[str] = None):
+        self.pool_size = max(1, int(pool_size or os.getenv("OCR_POOL_SIZE", 2)))
+        self.lang = lang or os.getenv("OCR_LANG", "eng")
+        self.cache_size = cache_size
+
+        self._pool: "queue.Queue" = queue.Queue()
+        self._created = 0
+        self._pool_lock = threading.Lock()
+
+        self._cache: "OrderedDict[tuple, object]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        return OCR_AVAILABLE
+
+    # -------------------------------------------------------------
+    # Engine pool (tesserocr)
+    # -------------------------------------------------------------
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                try:
+                    return tesserocr.PyTessBaseAPI(lang=self.lang)
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._pool.get()
+
+    def _release(self, api) -> None:
+        self._pool.put(api)
+
+    def close(self) -> None:
+        while True:
+            try:
+                api = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                api.End()
+            except Exception:
+                pass
+        self._created = 0
+
+    # -------------------------------------------------------------
+    def _run(self, img: Image.Image) -> str:
+        if TESSEROCR_AVAILABLE:
+            api = self._acquire()
+            try:
+                api.SetImage(img)
+                return api.GetUTF8Text() or ""
+            finally:
+                self._release(api)
+        if PYTESSERACT_AVAILABLE:
+            return pytesseract.image_to_string(img, lang=self.lang) or ""
+        return ""
+
+    def ocr_image(self, img: Image.Image, region: Optional[Region] = None) -> str:
+        """OCR an in-memory image (uncached)."""
+        if region is not None:
+            x, y, w, h = [int(v) for v in region]
+            if w <= 0 or h <= 0:
+                return ""
+            img = img.crop((x, y, x + w, y + h))
+        return self._run(img)
+
+    def _words(self, img: Image.Image) -> List[OCRWord]:
+        words: List[OCRWord] = []
+        if TESSEROCR_AVAILABLE:
+            api = self._acquire()
+            try:
+                api.SetImage(img)
+                api.Recognize()
+                level = tesserocr.RIL.WORD
+                line = -1
+                for r in tesserocr.iterate_level(api.GetIterator(), level):
+                    if r.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                        line += 1
+                    text = (r.GetUTF8Text(level) or "").strip()
+                    box = r.BoundingBox(level)
+                    if not text or not box:
+                        continue
+                    x1, y1, x2, y2 = box
+                    words.append(OCRWord(text, (x1, y1, x2 - x1, y2 - y1), r.Confidence(level), max(line, 0)))
+            finally:
+                self._release(api)
+            return words
+        if PYTESSERACT_AVAILABLE:
+            data = pytesseract.image_to_data(img, lang=self.lang, output_type=pytesseract.Output.DICT)
+            lines = {}
+            for i, text in enumerate(data.get("text", [])):
+                text = (text or "").strip()
+                if not text:
+                    continue
+                line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                line = lines.setdefault(line_key, len(lines))
+                bbox = (data["left"][i], data["top"][i], data["width"][i], data["height"][i])
+                words.append(OCRWord(text, bbox, float(data["conf"][i]), line))
+        return words
+
+    def _cached(self, kind: str, image_path: str, region: Optional[Region], compute):
+        key = None
+        digest = frame_hash(image_path)
+        if digest:
+            key = (kind, digest, tuple(int(v) for v in region) if region else None)
+            with self._cache_lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return self._cache[key]
+
+        self.misses += 1
+        try:
+            with Image.open(image_path) as img:
+                img = img.convert("RGB")
+                if region is not None:
+                    x, y, w, h = [int(v) for v in region]
+                    if w <= 0 or h <= 0:
+                        return compute(None)
+                    img = img.crop((x, y, x + w, y + h))
+                value = compute(img)
+        except Exception as e:
+            logger.debug("OCR failed: %s", e)
+            return compute(None)
+
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = value
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return value
+
+    def ocr(self, image_path: str, region: Optional[Region] = None) -> str:
+        """
+        OCR a screenshot file, optionally restricted to region (x, y, w, h).
+        Results are cached by frame hash + region.
+        """
+        if not self.available or not image_path:
+            return ""
+        return self._cached("text", image_path, region, lambda img: self._run(img) if img is not None else "")
+
+    def ocr_words(self, image_path: str, region: Optional[Region] = None) -> List[OCRWord]:
+        """
+        Word boxes of a screenshot file, in frame coordinates (cached like ocr()).
+        """
+        if not self.available or not image_path:
+            return []
+
+        def compute(img):
+            if img is None:
+                return []
+            words = self._words(img)
+            if region is not None:
+                ox, oy = int(region[0]), int(region[1])
+                words = [w._replace(bbox=(w.bbox[0] + ox, w.bbox[1] + oy, w.bbox[2], w.bbox[3])) for w in words]
+            return words
+
+        return list(self._cached("words", image_path, region, compute))
+
+
+_default_service: Optional[OCRService] = None
+_default_lock = threading.Lock()
+
+
+def get_ocr_service() -> OCRService:
+    """Process-wide OCRService (engines are expensive to start)."""
+    global _default_service
+    if _default_service is None:
+        with _default_lock:
+            if _default_service is None:
+                _default_service = OCRService()
+    return _default_service
@@ -59,15 +59,20 @@
 # os_automation/tools/pyautogui/py_auto_tool.py
 import sys
 import time
-import pyautogui
+
+try:
+    import pyautogui
+except Exception:  # no display
+    pyautogui = None
 
 
 class PyAutoTool:
     def __init__(self, delay=0.2):
         self.delay = delay
         print("[DEBUG] ✅ PyAutoGUI ToolWrapper initialized and active", flush=True, file=sys.stderr)
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0.05
+        if pyautogui is not None:
+            pyautogui.FAILSAFE = False
+            pyautogui.PAUSE = 0.05
 
     def _move_and_wait(self, x, y):
         try:
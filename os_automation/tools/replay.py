@@ -0,0 +1,297 @@
+# os_automation/tools/replay.py
+"""
+Offline replay of recorded runs through the decision pipeline.
+
+The run database (utils.run_db) keeps, per step, the raw detector
+responses with the frame they were computed on and, per attempt, the
+bbox, click point, event and before/after frames. Replay feeds these
+back through the same code the executor ran — no display, no detector
+or LLM calls — and compares every decision with the recorded one:
+
+  detect   : ExecutorAgent._normalize_detection(response) == recorded bbox
+  click    : ExecutorAgent._safe_click_point(bbox) within the click jitter
+             of the recorded point
+  validate : ValidatorAgent.validate(step, execution) status == recorded
+
+The validator's LLM tie-break answers with the verdict recorded for the
+attempt. Frames are read from their recorded paths, else rebuilt from the artifact
+store through the run manifest. Detections resolved without a detector
+call (held / atlas) have no response and are not replayed. Frames are
+resolved before the timed loop; stage rates count only the replayed
+calls, steps/s the whole loop.
+"""
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from PIL import Image
+
+from os_automation.agents.executor_agent import ExecutorAgent
+from os_automation.agents.validator_agent import ValidatorAgent
+from os_automation.core.step_compiler import compile_step
+from os_automation.core.tal import ExecutionResult
+from os_automation.utils.artifact_store import ArtifactStore, RunManifest
+from os_automation.utils.artifacts import save_frame
+from os_automation.utils.run_db import RunDatabase
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("detect", "click", "validate")
+# recorded and replayed points each carry up to ±3 / ±2 px of jitter
+CLICK_TOLERANCE = (6, 4)
+
+
+class Mismatch(NamedTuple):
+    stage: str
+    run_id: str
+    seq: int
+    description: str
+    recorded: Any
+    replayed: Any
+
+
+class StageStats:
+    def __init__(self):
+        self.replayed = 0
+        self.matched = 0
+        self.skipped = 0
+        self.calls = 0  # every pass, for the rate
+        self.seconds = 0.0
+
+    def timed(self, t0: float) -> None:
+        self.calls += 1
+        self.seconds += time.perf_counter() - t0
+
+    def row(self, stage: str) -> Dict[str, Any]:
+        return {
+            "stage": stage,
+            "replayed": self.replayed,
+            "matched": self.matched,
+            "mismatched": self.replayed - self.matched,
+            "skipped": self.skipped,
+            "per_s": round(self.calls / self.seconds, 1) if self.seconds > 0 else None,
+        }
+
+
+class ReplayReport:
+    def __init__(self, stages: Sequence[str]):
+        self.stages = {name: StageStats() for name in stages}
+        self.steps = 0
+        self.seconds = 0.0
+        self.mismatches: List[Mismatch] = []
+
+    @property
+    def steps_per_s(self) -> Optional[float]:
+        return self.steps / self.seconds if self.seconds > 0 else None
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return [stats.row(name) for name, stats in self.stages.items()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "steps": self.steps,
+            "seconds": round(self.seconds, 4),
+            "steps_per_s": round(self.steps_per_s, 1) if self.steps_per_s else None,
+            "stages": self.rows(),
+            "mismatches": [m._asdict() for m in self.mismatches],
+        }
+
+
+class FrameResolver:
+    """Recorded frame path → readable file (the path itself, else rebuilt from the store)."""
+
+    def __init__(self, store: Optional[ArtifactStore] = None, cache_dir: Optional[str] = None):
+        self.store = store
+        self.cache_dir = cache_dir
+        self._manifests: Dict[str, Optional[RunManifest]] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    def _manifest(self, run_id: str) -> Optional[RunManifest]:
+        if run_id not in self._manifests:
+            path = os.path.join(self.store.runs_dir, run_id + ".json")
+            try:
+                self._manifests[run_id] = RunManifest.load(path)
+            except (OSError, ValueError):
+                self._manifests[run_id] = None
+        return self._manifests[run_id]
+
+    def resolve(self, run_id: str, path: Optional[str]) -> Optional[str]:
+        if not path:
+            return None
+        if path in self._resolved:
+            return self._resolved[path]
+        found = path if os.path.exists(path) else None
+        if found is None and self.store is not None:
+            manifest = self._manifest(run_id)
+            digest = manifest.digest_of(path) if manifest is not None else None
+            if digest is not None:
+                if self.cache_dir is None:
+                    self.cache_dir = tempfile.mkdtemp(prefix="replay_")
+                found = os.path.join(self.cache_dir, digest + ".png")
+                if not os.path.exists(found):
+                    try:
+                        save_frame(self.store.load(digest), found)
+                    except (OSError, ValueError) as e:
+                        logger.debug("Frame %s not restorable: %s", path, e)
+                        found = None
+        self._resolved[path] = found
+        return found
+
+
+def _frame_size(path: Optional[str]) -> Optional[tuple]:
+    if not path:
+        return None
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except OSError:
+        return None
+
+
+class RecordedVerdictValidator(ValidatorAgent):
+    """Validator whose LLM tie-break returns the recorded verdict instead of calling out."""
+
+    def __init__(self):
+        super().__init__()
+        self.llm_client = None
+        self.recorded: Optional[str] = None  # "pass" / "fail" of the attempt being replayed
+
+    def _llm_validation_decision(self, *args, **kwargs) -> Optional[bool]:
+        return {"pass": True, "fail": False}.get(self.recorded)
+
+
+class ReplayHarness:
+    """
+    Replays recorded steps through an executor's detection parsing and
+    click policy and a validator. The default validator replays recorded
+    LLM verdicts, so replay never leaves the machine; a validator passed
+    in without an LLM client skips the attempts an LLM decided.
+    """
+
+    def __init__(
+        self,
+        db: RunDatabase,
+        store: Optional[ArtifactStore] = None,
+        executor: Optional[ExecutorAgent] = None,
+        validator: Optional[ValidatorAgent] = None,
+        stages: Sequence[str] = STAGES,
+    ):
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"unknown replay stages: {sorted(unknown)}")
+        self.db = db
+        self.frames = FrameResolver(store)
+        if executor is None:
+            executor = ExecutorAgent(output_dir=tempfile.mkdtemp(prefix="replay_exec_"),
+                                     speculative=False)
+        self.executor = executor
+        if validator is None:
+            validator = RecordedVerdictValidator()
+        self.validator = validator
+        self.stages = tuple(stages)
+
+    def load(self, run_ids: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Recorded steps with frame paths resolved (done once, outside the timed replay)."""
+        steps = self.db.replay_steps(run_ids)
+        for step in steps:
+            for d in step["detections"]:
+                d["shot"] = self.frames.resolve(step["run_id"], d.get("shot"))
+                d["screen"] = _frame_size(d["shot"])
+            for a in step["attempts"]:
+                a["before"] = self.frames.resolve(step["run_id"], a.get("before"))
+                a["after"] = self.frames.resolve(step["run_id"], a.get("after"))
+        return steps
+
+    def replay(self, steps: Iterable[Dict[str, Any]], repeat: int = 1) -> ReplayReport:
+        """
+        Replay `steps` (from load()) `repeat` times. Decisions are compared
+        on the first pass; later passes only add to the timing.
+        """
+        steps = list(steps)
+        report = ReplayReport(self.stages)
+        ops = {s["id"]: compile_step({"step_id": s["step_id"] or 0, "description": s["description"] or ""})
+               for s in steps}
+        for n in range(max(1, repeat)):
+            compare = n == 0
+            t0 = time.perf_counter()
+            for step in steps:
+                self._replay_step(step, ops[step["id"]], report, compare)
+                report.steps += 1
+            report.seconds += time.perf_counter() - t0
+        return report
+
+    def _decided(self, report: ReplayReport, stage: str, step: Dict[str, Any],
+                 recorded: Any, replayed: Any, matched: bool) -> None:
+        stats = report.stages[stage]
+        stats.replayed += 1
+        if matched:
+            stats.matched += 1
+        else:
+            report.mismatches.append(Mismatch(stage, step["run_id"], step["seq"], step["description"],
+                                              recorded, replayed))
+
+    def _replay_step(self, step: Dict[str, Any], op, report: ReplayReport, compare: bool) -> None:
+        stats = report.stages
+        if "detect" in stats:
+            for d in step["detections"]:
+                if d.get("response") is None:
+                    stats["detect"].skipped += int(compare)
+                    continue
+                t0 = time.perf_counter()
+                bbox = self.executor._normalize_detection(d["response"], screen=d.get("screen"))
+                stats["detect"].timed(t0)
+                if compare:
+                    self._decided(report, "detect", step, d.get("bbox"), bbox, bbox == d.get("bbox"))
+
+        for a in step["attempts"]:
+            if "click" in stats and a.get("point") and a.get("bbox"):
+                t0 = time.perf_counter()
+                point = self.executor._safe_click_point(a["bbox"])
+                stats["click"].timed(t0)
+                if compare:
+                    near = all(abs(p - r) <= tol for p, r, tol in zip(point, a["point"], CLICK_TOLERANCE))
+                    self._decided(report, "click", step, a["point"], point, near)
+
+            if "validate" in stats:
+                if not a.get("validation_status") or not a.get("before") or not a.get("after"):
+                    stats["validate"].skipped += int(compare)
+                    continue
+                if isinstance(self.validator, RecordedVerdictValidator):
+                    self.validator.recorded = a.get("llm_verdict")
+                elif a.get("llm_verdict") and self.validator.llm_client is None:
+                    stats["validate"].skipped += int(compare)  # decided by an LLM we cannot ask
+                    continue
+                execution = ExecutionResult(
+                    step_id=op.step_id, repo_used="replay", decided_event=a.get("event") or "",
+                    status=a.get("status") or "success", screenshot_before=a["before"],
+                    screenshot_after=a["after"], bbox=a.get("bbox"),
+                )
+                t0 = time.perf_counter()
+                status = self.validator.validate(op, execution).validation_status
+                stats["validate"].timed(t0)
+                if compare:
+                    self._decided(report, "validate", step, a["validation_status"], status,
+                                  status == a["validation_status"])
+
+
+def replay_runs(
+    db_path: str,
+    store_root: Optional[str] = None,
+    run_ids: Optional[Sequence[str]] = None,
+    repeat: int = 1,
+    stages: Sequence[str] = STAGES,
+) -> ReplayReport:
+    """Open the database (and store), load the recorded steps and replay them."""
+    store = ArtifactStore(store_root) if store_root and os.path.isdir(store_root) else None
+    db = RunDatabase(db_path)
+    try:
+        harness = ReplayHarness(db, store=store, stages=stages)
+        return harness.replay(harness.load(run_ids), repeat=repeat)
+    finally:
+        db.close()
@@ -0,0 +1,151 @@
+# os_automation/tools/screen_index.py
+"""
+Incrementally maintained element index of the current screen.
+
+The index holds the elements (OCR words by default) of the last frame it
+saw. On a new frame only the dirty rectangles (clusters of changed tiles,
+see utils.frame_diff) are re-extracted; elements in untouched tiles are
+kept as they are. A full-frame parse only happens on a screen transition
+(no previous frame, a size change, or more than `full_refresh_ratio` of
+the frame changed).
+
+Extractors are callables (image_path, region or None) → List[OCRWord] in
+frame coordinates, so other element sources can be plugged in next to
+OCR.
+"""
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+from PIL import Image
+
+from os_automation.tools.ocr import WordBoxIndex
+from os_automation.tools.ocr_service import OCRWord, get_ocr_service
+from os_automation.utils.frame_diff import (
+    TILE_SIZE, Region, changed_tiles, dirty_rects, frame_hash, pad_region, union_region,
+)
+
+logger = logging.getLogger(__name__)
+
+Extractor = Callable[[str, Optional[Region]], List[OCRWord]]
+
+
+def ocr_extractor(image_path: str, region: Optional[Region] = None) -> List[OCRWord]:
+    return get_ocr_service().ocr_words(image_path, region)
+
+
+def _intersects(a: Sequence[int], b: Sequence[int]) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def _center_in(bbox: Sequence[int], region: Sequence[int]) -> bool:
+    cx, cy = bbox[0] + bbox[2] / 2.0, bbox[1] + bbox[3] / 2.0
+    return region[0] <= cx < region[0] + region[2] and region[1] <= cy < region[1] + region[3]
+
+
+def _merge_overlapping(regions: List[Region]) -> List[Region]:
+    merged: List[Region] = []
+    for r in regions:
+        while True:
+            hit = next((m for m in merged if _intersects(m, r)), None)
+            if hit is None:
+                break
+            merged.remove(hit)
+            r = union_region([hit, r])
+        merged.append(r)
+    return merged
+
+
+class ScreenIndex:
+    def __init__(
+        self,
+        extractors: Optional[Sequence[Extractor]] = None,
+        tile: int = TILE_SIZE,
+        pad: int = 16,
+        full_refresh_ratio: float = 0.5,
+        min_conf: float = 30.0,
+    ):
+        self.extractors = list(extractors) if extractors else [ocr_extractor]
+        self.tile = tile
+        self.pad = pad
+        self.full_refresh_ratio = full_refresh_ratio
+        self.min_conf = min_conf
+        self.elements: List[OCRWord] = []
+        self.frame: Optional[str] = None
+        self._frame_hash: Optional[str] = None
+        self._size = None
+        self._next_line = 0
+        self._index: Optional[WordBoxIndex] = None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"frames": 0, "full": 0, "partial": 0, "unchanged": 0, "regions": 0}
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    # -------------------------------------------------------------
+    def _extract(self, image_path: str, region: Optional[Region]) -> List[OCRWord]:
+        out: List[OCRWord] = []
+        for extractor in self.extractors:
+            lines: Dict[int, int] = {}
+            try:
+                found = extractor(image_path, region)
+            except Exception as e:
+                logger.debug("Screen index extractor failed: %s", e)
+                continue
+            for w in found or []:
+                # line ids must stay unique across regions / extractors
+                if w.line not in lines:
+                    lines[w.line] = self._next_line
+                    self._next_line += 1
+                out.append(w._replace(line=lines[w.line]))
+        return out
+
+    def _full(self, image_path: str) -> None:
+        self.elements = self._extract(image_path, None)
+        self.stats["full"] += 1
+
+    def update(self, image_path: str) -> "ScreenIndex":
+        """Bring the index up to date with a new frame."""
+        with self._lock:
+            h = frame_hash(image_path)
+            if h is not None and h == self._frame_hash:
+                return self
+            self.stats["frames"] += 1
+            with Image.open(image_path) as img:
+                size = img.size
+
+            prev = self.frame
+            if prev is None or size != self._size or not os.path.exists(prev) or frame_hash(prev) is None:
+                self._full(image_path)
+            else:
+                tiles = changed_tiles(prev, image_path, self.tile)
+                dirty = sum(t[2] * t[3] for t in tiles)
+                if not tiles:
+                    self.stats["unchanged"] += 1
+                elif dirty > self.full_refresh_ratio * size[0] * size[1]:
+                    self._full(image_path)  # screen transition
+                else:
+                    regions = [pad_region(r, self.pad, size[0], size[1]) for r in dirty_rects(tiles, self.tile)]
+                    # grow each region over the elements it cuts, so they are re-read whole
+                    regions = _merge_overlapping([
+                        union_region([r] + [e.bbox for e in self.elements if _intersects(e.bbox, r)])
+                        for r in regions
+                    ])
+                    kept = [e for e in self.elements if not any(_intersects(e.bbox, r) for r in regions)]
+                    for r in regions:
+                        kept.extend(e for e in self._extract(image_path, r) if _center_in(e.bbox, r))
+                    self.elements = kept
+                    self.stats["partial"] += 1
+                    self.stats["regions"] += len(regions)
+
+            self.frame, self._frame_hash, self._size = image_path, h, size
+            self._index = None
+            return self
+
+    @property
+    def index(self) -> WordBoxIndex:
+        """WordBoxIndex over the current elements (rebuilt lazily)."""
+        if self._index is None:
+            self._index = WordBoxIndex(self.elements, min_conf=self.min_conf)
+        return self._index
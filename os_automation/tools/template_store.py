@@ -0,0 +1,257 @@
+# os_automation/tools/template_store.py
+"""
+Template store for recurring UI targets.
+
+Pixel patches of validated detections are remembered per
+(application, target) and located again with normalized cross-correlation
+inside a search window around the last known position. Uses OpenCV's
+matchTemplate when installed, otherwise an FFT-based numpy implementation.
+
+Layout on disk (TEMPLATE_STORE_DIR, default ~/.parse_os/templates):
+    index.json          {key: [{"file", "bbox", "hits", "updated"}, ...]}
+    <sha1>.png          grayscale patch
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+
+    CV2_AVAILABLE = True
+except Exception:
+    cv2 = None
+    CV2_AVAILABLE = False
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".parse_os", "templates")
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+
+class TemplateHit(NamedTuple):
+    bbox: Box
+    score: float
+    key: str
+
+
+# ---------------------------------------------------------------------------
+# Normalized cross-correlation
+# ---------------------------------------------------------------------------
+def _box_sums(a: np.ndarray, h: int, w: int) -> np.ndarray:
+    """Sum of every h×w window of a (valid positions only)."""
+    ii = np.pad(a, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    return ii[h:, w:] - ii[:-h, w:] - ii[h:, :-w] + ii[:-h, :-w]
+
+
+def ncc_map(image: np.ndarray, templ: np.ndarray) -> np.ndarray:
+    """
+    Zero-mean normalized cross-correlation of templ over image (both 2-D
+    float arrays). Returns scores for every valid top-left position.
+    """
+    H, W = image.shape
+    h, w = templ.shape
+    if h > H or w > W:
+        return np.zeros((0, 0), dtype=np.float64)
+
+    if CV2_AVAILABLE:
+        return cv2.matchTemplate(
+            image.astype(np.float32), templ.astype(np.float32), cv2.TM_CCOEFF_NORMED
+        ).astype(np.float64)
+
+    image = image.astype(np.float64)
+    t = templ.astype(np.float64)
+    t = t - t.mean()
+    t_norm = np.sqrt((t * t).sum())
+    if t_norm == 0:
+        return np.zeros((H - h + 1, W - w + 1), dtype=np.float64)
+
+    shape = (H + h - 1, W + w - 1)
+    corr = np.fft.irfft2(np.fft.rfft2(image, shape) * np.conj(np.fft.rfft2(t, shape)), shape)
+    num = corr[: H - h + 1, : W - w + 1]
+
+    n = float(h * w)
+    s1 = _box_sums(image, h, w)
+    s2 = _box_sums(image * image, h, w)
+    var = np.maximum(s2 - s1 * s1 / n, 0.0)
+    denom = np.sqrt(var) * t_norm
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(denom > 1e-6, num / denom, 0.0)
+    return np.clip(scores, -1.0, 1.0)
+
+
+def _gray(img: Image.Image) -> np.ndarray:
+    return np.asarray(img.convert("L"), dtype=np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+class TemplateStore:
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_per_key: int = 3,
+        search_margin: int = 160,
+        min_patch: int = 6,
+        max_patch: Tuple[int, int] = (480, 240),
+    ):
+        self.root = root or os.getenv("TEMPLATE_STORE_DIR", DEFAULT_STORE_DIR)
+        self.max_per_key = max_per_key
+        self.search_margin = search_margin
+        self.min_patch = min_patch
+        self.max_patch = max_patch
+        self._lock = threading.Lock()
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._patches: Dict[str, np.ndarray] = {}
+        self._load()
+
+    @staticmethod
+    def make_key(app: str, target: str) -> str:
+        return f"{(app or '').strip().lower()}::{(target or '').strip().lower()}"
+
+    # -------------------------------------------------------------
+    def _index_path(self) -> str:
+        return os.path.join(self.root, "index.json")
+
+    def _load(self) -> None:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                self._index = json.load(f) or {}
+        except FileNotFoundError:
+            self._index = {}
+        except Exception as e:
+            logger.warning("Template index unreadable, starting empty: %s", e)
+            self._index = {}
+
+    def _save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp, self._index_path())
+
+    def _patch(self, fname: str) -> Optional[np.ndarray]:
+        arr = self._patches.get(fname)
+        if arr is None:
+            try:
+                with Image.open(os.path.join(self.root, fname)) as img:
+                    arr = _gray(img)
+            except Exception:
+                return None
+            self._patches[fname] = arr
+        return arr
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._index.values())
+
+    def keys(self) -> List[str]:
+        return list(self._index.keys())
+
+    # -------------------------------------------------------------
+    def remember(self, key: str, frame: Image.Image, bbox: Box) -> bool:
+        """Store the patch under bbox of a validated detection."""
+        x, y, w, h = [int(v) for v in bbox[:4]]
+        x, y = max(0, x), max(0, y)
+        w, h = min(w, frame.width - x), min(h, frame.height - y)
+        if w < self.min_patch or h < self.min_patch:
+            return False
+        if w > self.max_patch[0] or h > self.max_patch[1]:
+            return False
+
+        patch = frame.crop((x, y, x + w, y + h)).convert("L")
+        arr = _gray(patch)
+        if float(arr.std()) < 2.0:  # flat patch: would match anywhere
+            return False
+
+        fname = hashlib.sha1(arr.tobytes() + f"{w}x{h}".encode()).hexdigest()[:20] + ".png"
+        with self._lock:
+            entries = self._index.setdefault(key, [])
+            for e in entries:
+                if e["file"] == fname:
+                    e["bbox"], e["updated"] = [x, y, w, h], time.time()
+                    self._save()
+                    return True
+
+            os.makedirs(self.root, exist_ok=True)
+            patch.save(os.path.join(self.root, fname))
+            self._patches[fname] = arr
+            entries.insert(0, {"file": fname, "bbox": [x, y, w, h], "hits": 0, "updated": time.time()})
+            # keep the most useful few
+            entries.sort(key=lambda e: (e.get("hits", 0), e.get("updated", 0)), reverse=True)
+            del entries[self.max_per_key:]
+            self._save()
+        return True
+
+    def forget(self, key: str) -> None:
+        """Drop every patch of key (e.g. its last hit failed validation)."""
+        with self._lock:
+            if self._index.pop(key, None) is not None:
+                self._save()
+
+    def locate(
+        self,
+        key: str,
+        frame: Image.Image,
+        min_score: float = 0.9,
+        full_frame: bool = False,
+    ) -> Optional[TemplateHit]:
+        """
+        Find a remembered patch in frame. Searches a window around the last
+        known position; the whole frame only when full_frame is set.
+        """
+        entries = self._index.get(key)
+        if not entries:
+            return None
+
+        gray = None
+        best: Optional[TemplateHit] = None
+        for entry in entries:
+            templ = self._patch(entry["file"])
+            if templ is None:
+                continue
+            th, tw = templ.shape
+            lx, ly = entry["bbox"][:2]
+
+            m = self.search_margin
+            wx1, wy1 = max(0, lx - m), max(0, ly - m)
+            wx2, wy2 = min(frame.width, lx + tw + m), min(frame.height, ly + th + m)
+            windows = [(wx1, wy1, wx2, wy2)]
+            if full_frame:
+                windows.append((0, 0, frame.width, frame.height))
+
+            for (x1, y1, x2, y2) in windows:
+                if x2 - x1 < tw or y2 - y1 < th:
+                    continue
+                if gray is None:
+                    gray = _gray(frame)
+                scores = ncc_map(gray[y1:y2, x1:x2], templ)
+                if scores.size == 0:
+                    continue
+                iy, ix = np.unravel_index(int(np.argmax(scores)), scores.shape)
+                score = float(scores[iy, ix])
+                if best is None or score > best.score:
+                    best = TemplateHit((x1 + int(ix), y1 + int(iy), tw, th), score, entry["file"])
+                if score >= min_score:
+                    break
+            if best is not None and best.score >= min_score:
+                break
+
+        if best is None or best.score < min_score:
+            return None
+
+        with self._lock:
+            for e in entries:
+                if e["file"] == best.key:
+                    e["hits"] = e.get("hits", 0) + 1
+                    e["bbox"] = list(best.bbox)
+            self._save()  # hits rank the patches kept by remember(), across runs too
+        return best._replace(key=key)
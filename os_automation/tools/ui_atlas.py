@@ -0,0 +1,167 @@
+# os_automation/tools/ui_atlas.py
+"""
+Persistent per-application UI element atlas.
+
+For every window fingerprint (application class + title suffix, see
+utils.window_info) the atlas holds the known elements of that window:
+
+    target → {"rel": [fx, fy, fw, fh], "ahash": "<64-bit dHash hex>",
+              "hits": n, "misses": n, "updated": ts}
+
+Coordinates are relative to the window geometry when it is known, else to
+the full frame, so entries survive window moves and resolution changes.
+A lookup is only trusted when the pixels at the predicted position still
+hash close to the stored appearance.
+
+Stored as JSON at `path`; the ExecutorAgent keeps it in its output_dir
+unless UI_ATLAS_PATH names a shared one (default here:
+~/.parse_os/ui_atlas.json).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ATLAS_PATH = os.path.join(os.path.expanduser("~"), ".parse_os", "ui_atlas.json")
+
+
+def dhash(img: Image.Image, size: int = 8) -> str:
+    """Difference hash of an image patch (size*size bits, hex)."""
+    g = np.asarray(img.convert("L").resize((size + 1, size), Image.BILINEAR), dtype=np.int16)
+    bits = (g[:, 1:] > g[:, :-1]).flatten()
+    value = 0
+    for b in bits:
+        value = (value << 1) | int(b)
+    return f"{value:0{size * size // 4}x}"
+
+
+def hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _frame_of(frame_size: Sequence[int], window: Optional[Sequence[int]]) -> List[int]:
+    if window and len(window) >= 4 and window[2] > 0 and window[3] > 0:
+        return [int(v) for v in window[:4]]
+    return [0, 0, int(frame_size[0]), int(frame_size[1])]
+
+
+class UIAtlas:
+    def __init__(self, path: Optional[str] = None, max_distance: int = 10, max_misses: int = 1):
+        self.path = path or os.getenv("UI_ATLAS_PATH", DEFAULT_ATLAS_PATH)
+        self.max_distance = max_distance
+        self.max_misses = max_misses
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._dirty = False
+        self._load()
+
+    # -------------------------------------------------------------
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f) or {}
+        except FileNotFoundError:
+            self._data = {}
+        except Exception as e:
+            logger.warning("UI atlas unreadable, starting empty: %s", e)
+            self._data = {}
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._data.values())
+
+    def windows(self) -> List[str]:
+        return list(self._data.keys())
+
+    def elements(self, fingerprint: str) -> Dict[str, Dict[str, Any]]:
+        return dict(self._data.get(fingerprint, {}))
+
+    # -------------------------------------------------------------
+    def lookup(
+        self,
+        fingerprint: str,
+        target: str,
+        frame: Image.Image,
+        window: Optional[Sequence[int]] = None,
+    ) -> Optional[List[int]]:
+        """
+        Screen bbox [x, y, w, h] of a known element, or None when unknown or
+        when the pixels there no longer look like the stored element.
+        """
+        entry = self._data.get(fingerprint, {}).get(target)
+        if not entry:
+            return None
+
+        wx, wy, ww, wh = _frame_of(frame.size, window)
+        fx, fy, fw, fh = entry["rel"]
+        x, y = int(round(wx + fx * ww)), int(round(wy + fy * wh))
+        w, h = max(1, int(round(fw * ww))), max(1, int(round(fh * wh)))
+        if x < 0 or y < 0 or x + w > frame.width or y + h > frame.height:
+            return None
+
+        current = dhash(frame.crop((x, y, x + w, y + h)))
+        if hamming(current, entry["ahash"]) > self.max_distance:
+            logger.debug("Atlas entry %s/%s changed appearance", fingerprint, target)
+            return None
+        return [x, y, w, h]
+
+    def record(
+        self,
+        fingerprint: str,
+        target: str,
+        frame: Image.Image,
+        bbox: Sequence[int],
+        window: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Learn (or refresh) an element from a detection that passed validation."""
+        x, y, w, h = [int(v) for v in bbox[:4]]
+        if w <= 0 or h <= 0:
+            return
+        wx, wy, ww, wh = _frame_of(frame.size, window)
+        rel = [(x - wx) / ww, (y - wy) / wh, w / ww, h / wh]
+        ahash = dhash(frame.crop((x, y, x + w, y + h)))
+
+        with self._lock:
+            elements = self._data.setdefault(fingerprint, {})
+            entry = elements.get(target) or {"hits": 0, "misses": 0}
+            entry.update(rel=[round(v, 5) for v in rel], ahash=ahash, updated=time.time())
+            entry["hits"] = entry.get("hits", 0) + 1
+            entry["misses"] = 0
+            elements[target] = entry
+            self._dirty = True
+        self.save()
+
+    def invalidate(self, fingerprint: str, target: str) -> None:
+        """
+        An atlas-provided bbox failed validation. The entry is dropped after
+        max_misses consecutive failures (default: the first one).
+        """
+        with self._lock:
+            elements = self._data.get(fingerprint, {})
+            entry = elements.get(target)
+            if not entry:
+                return
+            entry["misses"] = entry.get("misses", 0) + 1
+            if entry["misses"] >= self.max_misses:
+                del elements[target]
+                if not elements:
+                    self._data.pop(fingerprint, None)
+            self._dirty = True
+        self.save()
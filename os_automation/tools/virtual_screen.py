@@ -0,0 +1,266 @@
+# os_automation/tools/virtual_screen.py
+"""
+In-memory screen for running the executor without a display.
+
+A VirtualScreen is a canvas with scripted widgets. It answers the
+pyautogui calls the executor makes (screenshot, size, click, write, press,
+hotkey, scroll), so it can stand in for the real screen: clicks change
+widget state, typing renders into the focused field and screenshot()
+renders the current state. Nothing waits, so a step costs only the
+orchestration around it.
+
+A scene is a list of widgets (YAML / JSON, VIRTUAL_SCREEN_SCENE):
+
+  - {type: field, label: Name field, bbox: [x, y, w, h]}
+  - {type: checkbox, label: Agree checkbox, bbox: [...]}
+  - {type: label, label: Status, bbox: [...], text: ready}
+  - {type: button, label: Send, bbox: [...], submit: true,
+     set: {Status: sent}, show: [Done], hide: [Send]}
+
+Buttons count their clicks; `set` rewrites other widgets' text, `show` /
+`hide` toggle widgets (multi-page flows), `submit` copies the field texts
+into `screen.state["submitted"]`. Hidden widgets are neither drawn nor
+found.
+"""
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import yaml
+from PIL import Image, ImageDraw
+
+logger = logging.getLogger(__name__)
+
+WIDGET_TYPES = ("button", "field", "checkbox", "label")
+
+BACKGROUND = (236, 236, 236)
+INK = (20, 20, 20)
+FOCUS = (40, 110, 220)
+
+DEFAULT_SCENE: List[Dict[str, Any]] = [
+    {"type": "label", "label": "Title", "bbox": [40, 30, 400, 30], "text": "Registration"},
+    {"type": "field", "label": "Name field", "bbox": [40, 90, 420, 36]},
+    {"type": "field", "label": "Email field", "bbox": [40, 150, 420, 36]},
+    {"type": "checkbox", "label": "Agree checkbox", "bbox": [40, 210, 200, 30]},
+    {"type": "button", "label": "Register", "bbox": [40, 270, 120, 40], "submit": True,
+     "set": {"Status": "registered"}},
+    {"type": "button", "label": "Cancel", "bbox": [180, 270, 120, 40], "set": {"Status": "cancelled"}},
+    {"type": "label", "label": "Status", "bbox": [40, 340, 400, 30], "text": "ready"},
+]
+
+
+class Size(NamedTuple):
+    width: int
+    height: int
+
+
+def _norm(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").lower()).strip()
+
+
+class Widget:
+    def __init__(self, spec: Dict[str, Any]):
+        self.type = spec.get("type", "button")
+        if self.type not in WIDGET_TYPES:
+            raise ValueError(f"unknown widget type {self.type!r}")
+        self.label = spec["label"]
+        self.bbox = [int(v) for v in spec["bbox"]]
+        self.text = spec.get("text", "")
+        self.checked = bool(spec.get("checked", False))
+        self.visible = not spec.get("hidden", False)
+        self.clicks = 0
+        self.spec = spec
+
+    def contains(self, x: int, y: int) -> bool:
+        bx, by, bw, bh = self.bbox
+        return bx <= x < bx + bw and by <= y < by + bh
+
+
+class VirtualScreen:
+    instant = True  # inputs take effect at once: the executor skips its settle delays
+
+    def __init__(self, widgets: Optional[Iterable[Dict[str, Any]]] = None,
+                 width: int = 1280, height: int = 800):
+        self.width, self.height = int(width), int(height)
+        self.widgets = [Widget(w) for w in (DEFAULT_SCENE if widgets is None else widgets)]
+        self.focused: Optional[Widget] = None
+        self.state: Dict[str, Any] = {"submitted": None}
+        self.log: List[tuple] = []  # every input event, in order
+        self._lock = threading.Lock()
+        self._version = 0
+        self._frame: Optional[Image.Image] = None
+        self._frame_version = -1
+
+    @classmethod
+    def from_file(cls, path: str) -> "VirtualScreen":
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        if isinstance(data, list):
+            data = {"widgets": data}
+        return cls(data.get("widgets") or [], width=data.get("width", 1280), height=data.get("height", 800))
+
+    @classmethod
+    def from_env(cls) -> "VirtualScreen":
+        path = os.getenv("VIRTUAL_SCREEN_SCENE")
+        return cls.from_file(path) if path else cls()
+
+    # -------------------------------------------------------------
+    # scene
+    # -------------------------------------------------------------
+    def widget(self, label: str) -> Optional[Widget]:
+        key = _norm(label)
+        return next((w for w in self.widgets if _norm(w.label) == key), None)
+
+    def find(self, query: str) -> Optional[Widget]:
+        """Visible widget whose label equals the query, else the longest label it contains."""
+        q = _norm((query or "").split("\n")[0]).strip("'\"")
+        best = None
+        for w in self.widgets:
+            if not w.visible:
+                continue
+            label = _norm(w.label)
+            if label == q:
+                return w
+            if re.search(r"(^|\W)" + re.escape(label) + r"($|\W)", q) and (
+                    best is None or len(label) > len(_norm(best.label))):
+                best = w
+        return best
+
+    def at(self, x: int, y: int) -> Optional[Widget]:
+        for w in reversed(self.widgets):
+            if w.visible and w.contains(x, y):
+                return w
+        return None
+
+    def fields(self) -> Dict[str, str]:
+        return {w.label: w.text for w in self.widgets if w.type == "field"}
+
+    def _changed(self) -> None:
+        self._version += 1
+
+    def _activate(self, w: Widget) -> None:
+        w.clicks += 1
+        if w.type == "field":
+            self.focused = w
+        elif w.type == "checkbox":
+            w.checked = not w.checked
+        elif w.type == "button":
+            spec = w.spec
+            if spec.get("submit"):
+                self.state["submitted"] = self.fields()
+            for label, text in (spec.get("set") or {}).items():
+                target = self.widget(label)
+                if target is not None:
+                    target.text = str(text)
+            for label in spec.get("show") or ():
+                target = self.widget(label)
+                if target is not None:
+                    target.visible = True
+            for label in spec.get("hide") or ():
+                target = self.widget(label)
+                if target is not None:
+                    target.visible = False
+                    if self.focused is target:
+                        self.focused = None
+
+    # -------------------------------------------------------------
+    # pyautogui surface
+    # -------------------------------------------------------------
+    def size(self) -> Size:
+        return Size(self.width, self.height)
+
+    def screenshot(self) -> Image.Image:
+        with self._lock:
+            if self._frame is None or self._frame_version != self._version:
+                self._frame = self._render()
+                self._frame_version = self._version
+            return self._frame.copy()
+
+    def moveTo(self, x=None, y=None, duration=0.0, **_kwargs) -> None:
+        pass
+
+    def click(self, x=None, y=None, clicks=1, button="left", **_kwargs) -> None:
+        with self._lock:
+            self.log.append(("click", x, y, button))
+            w = self.at(int(x), int(y)) if x is not None and y is not None else None
+            if w is None:
+                self.focused = None
+            else:
+                for _ in range(max(1, int(clicks))):
+                    self._activate(w)
+            self._changed()
+
+    def doubleClick(self, x=None, y=None, **kwargs) -> None:
+        self.click(x, y, clicks=2, **kwargs)
+
+    def rightClick(self, x=None, y=None, **_kwargs) -> None:
+        with self._lock:
+            self.log.append(("click", x, y, "right"))
+
+    def write(self, text: str, interval: float = 0.0, **_kwargs) -> None:
+        with self._lock:
+            self.log.append(("write", text))
+            if self.focused is not None:
+                self.focused.text += text
+                self._changed()
+
+    typewrite = write
+
+    def press(self, key: str, **_kwargs) -> None:
+        with self._lock:
+            self.log.append(("press", key))
+            key = (key or "").lower()
+            if self.focused is None:
+                return
+            if key == "backspace":
+                self.focused.text = self.focused.text[:-1]
+            elif key == "tab":
+                fields = [w for w in self.widgets if w.type == "field" and w.visible]
+                i = fields.index(self.focused) if self.focused in fields else -1
+                self.focused = fields[(i + 1) % len(fields)]
+            elif key == "enter":
+                self.state.setdefault("entered", []).append(self.focused.text)
+            else:
+                return
+            self._changed()
+
+    def hotkey(self, *keys: str, **_kwargs) -> None:
+        with self._lock:
+            self.log.append(("hotkey",) + tuple(keys))
+            if [k.lower() for k in keys] in (["ctrl", "a"], ["command", "a"]) and self.focused is not None:
+                self.state["selected"] = self.focused.label
+
+    def scroll(self, clicks: int, x=None, y=None, **_kwargs) -> None:
+        with self._lock:
+            self.log.append(("scroll", clicks))
+
+    # -------------------------------------------------------------
+    # rendering
+    # -------------------------------------------------------------
+    def _render(self) -> Image.Image:
+        img = Image.new("RGB", (self.width, self.height), BACKGROUND)
+        draw = ImageDraw.Draw(img)
+        for w in self.widgets:
+            if not w.visible:
+                continue
+            x, y, bw, bh = w.bbox
+            box = [x, y, x + bw - 1, y + bh - 1]
+            ty = y + max(2, (bh - 11) // 2)
+            if w.type == "button":
+                shade = max(120, 215 - 12 * w.clicks)  # every click repaints the button
+                draw.rectangle(box, fill=(shade, shade, 225), outline=INK)
+                draw.text((x + 8, ty), w.label, fill=INK)
+            elif w.type == "field":
+                draw.rectangle(box, fill=(255, 255, 255), outline=FOCUS if w is self.focused else INK,
+                               width=2 if w is self.focused else 1)
+                draw.text((x + 6, ty), w.text or w.label, fill=INK if w.text else (150, 150, 150))
+            elif w.type == "checkbox":
+                draw.rectangle([x, y + 4, x + bh - 9, y + bh - 5], fill=(255, 255, 255), outline=INK)
+                if w.checked:
+                    draw.line([x + 3, y + bh // 2, x + bh // 3, y + bh - 8, x + bh - 11, y + 7], fill=INK, width=3)
+                draw.text((x + bh, ty), w.label, fill=INK)
+            else:
+                draw.text((x, ty), w.text or w.label, fill=INK)
+        return img
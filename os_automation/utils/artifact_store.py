@@ -0,0 +1,487 @@
+# os_automation/utils/artifact_store.py
+"""
+Content-addressed, deduplicated screenshot store with retention quotas.
+
+Layout under the store root:
+
+    objects/<2 hex>/<digest>.<codec ext>           one file per unique frame
+    objects/<2 hex>/<digest>.d<n>-<base>.npz       or: tiles changed vs. <base>
+    runs/<run_id>.json                             manifest: frame name → digest
+
+The digest is taken over the decoded pixels (mode, size, bytes), so the
+"shot" and "before" frames of a static screen, or the before/after pair of
+a failed detection, are stored once whatever their file names.
+
+Within a run, a frame that differs from the previous one in at most half
+of its tiles is stored as a tile delta: the exact changed-tile mask
+(frame_diff.changed_tile_mask, same grid as the validator's diff) selects
+the tiles kept, the rest is copied from the base on load(). Chains are cut
+every ARTIFACT_DELTA_CHAIN frames (0 disables deltas), like key frames.
+
+gc() drops manifests older than `max_age_days`, then the oldest manifests
+until the objects fit in `max_bytes`, and deletes every object no longer
+referenced by a manifest.
+
+Capture hands frames over with submit(): digest, delta mask and encoding
+all run on the store's worker thread (at most `max_pending` frames queued),
+so the step thread only pays for the working copy.
+
+Config: ARTIFACT_DIR (root; the store is off without it),
+ARTIFACT_STORE_MAX_GB, ARTIFACT_STORE_MAX_DAYS, ARTIFACT_DELTA_CHAIN.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from os_automation.utils.artifacts import CODECS, ArtifactWriter, get_artifact_writer, load_frame
+from os_automation.utils.frame_diff import TILE_SIZE, changed_tile_mask, mask_tiles
+
+logger = logging.getLogger(__name__)
+
+# unreferenced objects younger than this may belong to a run still in progress elsewhere
+ORPHAN_GRACE_S = 3600
+
+# a frame is stored as a delta only if at most this share of its tiles changed
+DELTA_MAX_CHANGED = 0.5
+DELTA_EXT = ".npz"
+
+
+def frame_digest(img: Image.Image) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def _parse_object(name: str) -> Tuple[str, Optional[str], int]:
+    """File name → (digest, base digest or None, delta depth)."""
+    digest, _, rest = name.partition(".")
+    if rest.startswith("d") and rest.endswith(DELTA_EXT) and "-" in rest:
+        depth, base = rest[1:-len(DELTA_EXT)].split("-", 1)
+        return digest, base, int(depth)
+    return digest, None, 0
+
+
+class RunManifest:
+    def __init__(self, path: str, run_id: str, meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.run_id = run_id
+        self.data: Dict[str, Any] = {
+            "run_id": run_id, "started": time.time(), "ended": None,
+            "meta": dict(meta or {}), "frames": [],
+        }
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "RunManifest":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        m = cls(path, data.get("run_id") or os.path.splitext(os.path.basename(path))[0])
+        m.data.update(data)
+        return m
+
+    @property
+    def digests(self) -> List[str]:
+        return [f["digest"] for f in self.data["frames"]]
+
+    def add(self, name: str, digest: str, **meta) -> None:
+        with self._lock:
+            self.data["frames"].append(dict(meta, name=name, digest=digest, t=round(time.time(), 3)))
+
+    def digest_of(self, name: str) -> Optional[str]:
+        base = os.path.basename(name)
+        for f in reversed(self.data["frames"]):
+            if f["name"] == base:
+                return f["digest"]
+        return None
+
+    def save(self) -> None:
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=1)
+            os.replace(tmp, self.path)
+
+
+class ArtifactStore:
+    def __init__(
+        self,
+        root: str,
+        max_bytes: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        writer: Optional[ArtifactWriter] = None,
+        delta_chain: int = 8,
+        delta_tile: int = TILE_SIZE,
+        max_pending: int = 8,
+    ):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.runs_dir = os.path.join(root, "runs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.writer = writer if writer is not None else get_artifact_writer()
+        self.delta_chain = int(delta_chain)
+        self.delta_tile = int(delta_tile)
+        self.current: Optional[RunManifest] = None
+        # digest → (path, delta depth) for objects seen by this process
+        self._paths: Dict[str, Tuple[str, int]] = {}
+        # previous frame of the current run: (digest, pixels, depth), delta base
+        self._prev: Optional[Tuple[str, np.ndarray, int]] = None
+        self._lock = threading.Lock()
+        self.stats = {"frames": 0, "stored": 0, "deltas": 0, "deduplicated": 0}
+        # submit(): one worker keeps the frames of a run in order (delta chain)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._last: Optional[Future] = None
+        self._queued: Dict[str, Future] = {}  # frame name → submit() not yet recorded
+
+    # -------------------------------------------------------------
+    def _object_base(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _lookup(self, digest: str) -> Optional[Tuple[str, int]]:
+        known = self._paths.get(digest)
+        if known is not None:
+            return known
+        base = self._object_base(digest)
+        for ext, _ in CODECS.values():
+            if os.path.exists(base + ext):
+                return base + ext, 0
+        shard = os.path.dirname(base)
+        try:
+            names = os.listdir(shard)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if name.startswith(digest + ".d") and name.endswith(DELTA_EXT):
+                return os.path.join(shard, name), _parse_object(name)[2]
+        return None
+
+    def path(self, digest: str) -> Optional[str]:
+        """File of a stored frame (any codec, or its delta), or None."""
+        found = self._lookup(digest)
+        return found[0] if found is not None and os.path.exists(found[0]) else None
+
+    def put(self, img: Image.Image, base: Optional[Tuple[str, np.ndarray, int]] = None) -> str:
+        """
+        Store a frame once; returns its digest. With `base` (digest, pixels,
+        depth) the frame may be written as a tile delta against it.
+        """
+        return self._put(img, np.asarray(img), base)[0]
+
+    def _put(self, img: Image.Image, pixels: np.ndarray,
+             base: Optional[Tuple[str, np.ndarray, int]]) -> Tuple[str, int]:
+        digest = frame_digest(img)
+        with self._lock:
+            self.stats["frames"] += 1
+            found = self._lookup(digest)
+            if found is not None:
+                self._paths[digest] = found
+                self.stats["deduplicated"] += 1
+                return digest, found[1]
+            delta = self._delta(pixels, base) if base is not None else None
+            if delta is None:
+                self.stats["stored"] += 1
+                path = self.writer.path_for(self._object_base(digest))
+                self._paths[digest] = (path, 0)
+            else:
+                self.stats["deltas"] += 1
+                depth = base[2] + 1
+                path = f"{self._object_base(digest)}.d{depth}-{base[0]}{DELTA_EXT}"
+                self._paths[digest] = (path, depth)
+        if delta is None:
+            self.writer.submit(img, self._object_base(digest))
+        else:
+            self.writer.submit(img, path, encode=delta)
+        return digest, self._paths[digest][1]
+
+    def _delta(self, pixels: np.ndarray, base: Tuple[str, np.ndarray, int]):
+        """Encoder for `pixels` as changed tiles over `base`, or None if not worth it."""
+        base_digest, base_pixels, depth = base
+        if (depth >= self.delta_chain or pixels.shape != base_pixels.shape
+                or pixels.dtype != base_pixels.dtype):
+            return None
+        mask = changed_tile_mask(base_pixels, pixels, self.delta_tile)
+        if mask.mean() > DELTA_MAX_CHANGED:
+            return None
+        h, w = pixels.shape[:2]
+        regions = np.array(mask_tiles(mask, self.delta_tile, w, h), dtype=np.int32).reshape(-1, 4)
+        tail = pixels.shape[2:]
+        if len(regions):
+            data = np.concatenate([pixels[y:y + rh, x:x + rw].reshape((-1,) + tail)
+                                   for x, y, rw, rh in regions])
+        else:
+            data = np.zeros((0,) + tail, dtype=pixels.dtype)
+
+        def encode(f) -> None:
+            np.savez_compressed(f, base=np.array(base_digest), regions=regions, pixels=data)
+
+        return encode
+
+    def load(self, digest: str) -> Image.Image:
+        """Full frame of `digest`; deltas are rebuilt from their base chain."""
+        found = self._lookup(digest)
+        if found is None:
+            raise FileNotFoundError(f"no stored frame {digest}")
+        return self.writer.open_frame(found[0], loader=self._load_path)
+
+    def _load_path(self, path: str) -> Image.Image:
+        if not path.endswith(DELTA_EXT):
+            return load_frame(path)
+        with np.load(path, allow_pickle=False) as z:
+            base, regions, data = str(z["base"]), z["regions"], z["pixels"]
+        base_img = self.load(base)
+        out = np.array(base_img)
+        offset = 0
+        for x, y, w, h in regions:
+            n = int(w) * int(h)
+            out[y:y + h, x:x + w] = data[offset:offset + n].reshape((h, w) + out.shape[2:])
+            offset += n
+        return Image.fromarray(out, base_img.mode)
+
+    # -------------------------------------------------------------
+    def begin_run(self, run_id: Optional[str] = None, **meta) -> RunManifest:
+        self.drain()
+        if self.current is not None:
+            self.end_run(collect=False)
+        return self._begin(run_id, meta)
+
+    def _begin(self, run_id: Optional[str], meta: Dict[str, Any]) -> RunManifest:
+        run_id = run_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.current = RunManifest(os.path.join(self.runs_dir, run_id + ".json"), run_id, meta)
+        self.current.save()
+        self._prev = None
+        return self.current
+
+    def record(self, img: Image.Image, name: str, **meta) -> str:
+        """
+        put() and reference the frame from the current run (one is started if
+        needed); the frame is delta-encoded against the run's previous frame.
+        """
+        if self.current is None:
+            self._begin(None, {})
+        pixels = np.asarray(img)
+        base = self._prev if self.delta_chain > 0 else None
+        digest, depth = self._put(img, pixels, base)
+        self._prev = (digest, pixels, depth)
+        self.current.add(os.path.basename(name), digest, **meta)
+        return digest
+
+    def submit(self, img: Image.Image, name: str, **meta) -> Future:
+        """
+        record() on the store's worker thread; returns a future of the
+        digest. Blocks only when `max_pending` frames are already queued.
+        """
+        self._slots.acquire()
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-store")
+            future = self._last = self._pool.submit(self._record_queued, img, name, meta)
+            self._queued[os.path.basename(name)] = future
+        return future
+
+    def _record_queued(self, img: Image.Image, name: str, meta: Dict[str, Any]) -> str:
+        try:
+            return self.record(img, name, **meta)
+        except Exception as e:
+            logger.warning("Artifact store record failed for %s: %s", name, e)
+            raise
+        finally:
+            with self._lock:
+                self._queued.pop(os.path.basename(name), None)
+            self._slots.release()
+
+    def digest_of(self, name: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Digest of a frame of the current run, waiting for it when it was
+        submit()ted and is still queued (no wait on the rest of the queue).
+        """
+        with self._lock:
+            future = self._queued.get(os.path.basename(name))
+        if future is not None:
+            try:
+                return future.result(timeout)
+            except Exception:
+                return None
+        run = self.current
+        return run.digest_of(name) if run is not None else None
+
+    def drain(self) -> None:
+        """Wait until every submitted frame is recorded."""
+        with self._lock:
+            last = self._last
+        if last is not None:
+            try:
+                last.result()
+            except Exception:
+                pass
+
+    def end_run(self, collect: bool = True) -> Optional[Dict[str, int]]:
+        self.drain()
+        run, self.current, self._prev = self.current, None, None
+        if run is not None:
+            run.data["ended"] = time.time()
+            run.save()
+        self.writer.flush()
+        return self.gc() if collect else None
+
+    # -------------------------------------------------------------
+    def _manifests(self) -> List[RunManifest]:
+        out = []
+        for name in os.listdir(self.runs_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                out.append(RunManifest.load(os.path.join(self.runs_dir, name)))
+            except Exception as e:
+                logger.warning("Unreadable run manifest %s: %s", name, e)
+        out.sort(key=lambda m: m.data.get("started") or 0)
+        return out
+
+    def _objects(self) -> Dict[str, tuple]:
+        """digest → (path, size, mtime, base digest or None)"""
+        out = {}
+        for dirpath, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                digest, base, _ = _parse_object(name)
+                out[digest] = (path, st.st_size, st.st_mtime, base)
+        return out
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _, _ in self._objects().values())
+
+    def gc(self, max_bytes: Optional[int] = None, max_age_days: Optional[float] = None) -> Dict[str, int]:
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        max_age_days = max_age_days if max_age_days is not None else self.max_age_days
+        now = time.time()
+        current = self.current.run_id if self.current is not None else None
+        result = {"runs_removed": 0, "objects_removed": 0, "bytes_freed": 0}
+
+        manifests = self._manifests()
+        refs: Dict[str, int] = {}
+        for m in manifests:
+            for d in set(m.digests):
+                refs[d] = refs.get(d, 0) + 1
+        if self.current is not None:
+            for d in set(self.current.digests):
+                refs[d] = refs.get(d, 0) + 1
+
+        def drop_run(m: RunManifest) -> None:
+            for d in set(m.digests):
+                refs[d] = refs.get(d, 1) - 1
+            try:
+                os.remove(m.path)
+            except FileNotFoundError:
+                pass
+            result["runs_removed"] += 1
+
+        # 1) age
+        kept = []
+        for m in manifests:
+            started = m.data.get("started") or 0
+            if m.run_id != current and max_age_days is not None and now - started > max_age_days * 86400:
+                drop_run(m)
+            else:
+                kept.append(m)
+
+        objects = self._objects()
+
+        def sweep() -> None:
+            # referenced objects (and young orphans) stay, with the bases of their deltas
+            live = [d for d, (_, _, mtime, _) in objects.items()
+                    if refs.get(d, 0) > 0 or (d not in refs and now - mtime < ORPHAN_GRACE_S)]
+            keep = set(live)
+            while live:
+                base = objects.get(live.pop(), (None, 0, 0, None))[3]
+                if base is not None and base not in keep:
+                    keep.add(base)
+                    live.append(base)
+            for d, (path, size, _, _) in list(objects.items()):
+                if d in keep:
+                    continue
+                try:
+                    os.remove(path)
+                    result["objects_removed"] += 1
+                    result["bytes_freed"] += size
+                except FileNotFoundError:
+                    pass
+                del objects[d]
+                self._paths.pop(d, None)
+
+        sweep()
+
+        # 2) size quota: oldest runs first, never the one in progress
+        if max_bytes is not None:
+            for m in kept:
+                if sum(size for _, size, _, _ in objects.values()) <= max_bytes:
+                    break
+                if m.run_id == current:
+                    continue
+                drop_run(m)
+                sweep()
+
+        result["bytes"] = sum(size for _, size, _, _ in objects.values())
+        if result["runs_removed"] or result["objects_removed"]:
+            logger.info("Artifact store gc: %s", result)
+        return result
+
+
+def prune_files(directory: str, max_age_s: float, suffixes=(".png",)) -> int:
+    """Delete files in `directory` (not recursive) older than max_age_s; returns the count."""
+    now, removed = time.time(), 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not entry.is_file() or not entry.name.endswith(tuple(suffixes)):
+            continue
+        try:
+            if now - entry.stat().st_mtime > max_age_s:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """Process-wide store rooted at ARTIFACT_DIR; None (no audit copies) when it is unset."""
+    global _store
+    if _store is None:
+        root = os.getenv("ARTIFACT_DIR")
+        if not root:
+            return None
+        with _store_lock:
+            if _store is None:
+                max_gb = float(os.getenv("ARTIFACT_STORE_MAX_GB", 5))
+                _store = ArtifactStore(
+                    root,
+                    max_bytes=int(max_gb * 1024 ** 3) if max_gb > 0 else None,
+                    max_age_days=float(os.getenv("ARTIFACT_STORE_MAX_DAYS", 14)) or None,
+                    delta_chain=int(os.getenv("ARTIFACT_DELTA_CHAIN", 8)),
+                    max_pending=int(os.getenv("ARTIFACT_MAX_PENDING", 8)),
+                )
+    return _store
@@ -0,0 +1,225 @@
+# os_automation/utils/artifacts.py
+"""
+Screenshot persistence with a pluggable codec.
+
+Working frames (the files detectors / validator / OCR read right after
+capture) are written synchronously with fast PNG (zlib level 1) via
+save_frame(). Copies kept for audit go through ArtifactWriter, which
+encodes on a background thread pool behind a bounded queue, so capture
+never waits on the archive codec or the disk.
+
+Codecs (ARTIFACT_CODEC):
+  png  : PNG, zlib level ARTIFACT_PNG_LEVEL (default 1)
+  webp : lossless WebP (fastest method)
+  qoi  : QOI, needs the `qoi` package (falls back to png)
+  npy  : raw numpy array, no compression at capture time;
+         compress_npy() re-encodes them later (e.g. off-peak)
+"""
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+try:
+    import qoi
+
+    QOI_AVAILABLE = True
+except Exception:
+    qoi = None
+    QOI_AVAILABLE = False
+
+PNG_LEVEL = int(os.getenv("ARTIFACT_PNG_LEVEL", 1))
+
+
+def _rgb(img: Image.Image) -> Image.Image:
+    return img if img.mode in ("RGB", "RGBA", "L") else img.convert("RGB")
+
+
+def _save_png(img: Image.Image, path: str) -> None:
+    _rgb(img).save(path, format="PNG", compress_level=PNG_LEVEL)
+
+
+def _save_webp(img: Image.Image, path: str) -> None:
+    _rgb(img).save(path, format="WEBP", lossless=True, quality=0, method=0)
+
+
+def _save_qoi(img: Image.Image, path: str) -> None:
+    qoi.write(path, np.ascontiguousarray(np.asarray(img.convert("RGB"))))
+
+
+def _save_npy(img: Image.Image, path: str) -> None:
+    with open(path, "wb") as f:
+        np.save(f, np.asarray(_rgb(img)), allow_pickle=False)
+
+
+# name → (file extension, encoder)
+CODECS: Dict[str, Tuple[str, Callable[[Image.Image, str], None]]] = {
+    "png": (".png", _save_png),
+    "webp": (".webp", _save_webp),
+    "qoi": (".qoi", _save_qoi),
+    "npy": (".npy", _save_npy),
+}
+
+
+def resolve_codec(name: Optional[str]) -> str:
+    name = (name or "png").lower()
+    if name not in CODECS:
+        logger.warning("Unknown artifact codec %r, using png", name)
+        return "png"
+    if name == "qoi" and not QOI_AVAILABLE:
+        logger.info("qoi package not installed, using png")
+        return "png"
+    return name
+
+
+def save_frame(img: Image.Image, path: str, codec: str = "png") -> str:
+    """Encode synchronously; `path` gets the codec's extension. Returns the path written."""
+    ext, encode = CODECS[resolve_codec(codec)]
+    path = os.path.splitext(path)[0] + ext
+    tmp = path + ".part"
+    encode(img, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def load_frame(path: str) -> Image.Image:
+    """Open an artifact written by any codec."""
+    if path.endswith(".npy"):
+        return Image.fromarray(np.load(path, allow_pickle=False))
+    if path.endswith(".qoi"):
+        if not QOI_AVAILABLE:
+            raise RuntimeError("qoi package required to read " + path)
+        return Image.fromarray(qoi.read(path))
+    img = Image.open(path)
+    img.load()
+    return img
+
+
+def compress_npy(root: str, codec: str = "png", remove: bool = True) -> List[str]:
+    """Re-encode the raw .npy artifacts under `root` with `codec` (deferred compression)."""
+    written = []
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith(".npy"):
+                continue
+            src = os.path.join(dirpath, name)
+            try:
+                written.append(save_frame(load_frame(src), src, codec))
+                if remove:
+                    os.remove(src)
+            except Exception as e:
+                logger.warning("Could not compress %s: %s", src, e)
+    return written
+
+
+class ArtifactWriter:
+    """
+    Background encoder for archived frames.
+
+    submit() returns at once with the final path; encoding runs on a small
+    thread pool. At most `max_pending` frames are queued; a further
+    submit() blocks until one is written (backpressure, bounded memory).
+    Frames not yet on disk are served from memory by open_frame().
+    """
+
+    def __init__(self, root: Optional[str] = None, codec: Optional[str] = None,
+                 workers: int = 2, max_pending: int = 8):
+        self.root = root
+        self.codec = resolve_codec(codec)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[Image.Image, Future]] = {}
+        self.stats = {"submitted": 0, "written": 0, "failed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def path_for(self, name: str) -> str:
+        """Archive path of a frame name (relative names go under root)."""
+        ext = CODECS[self.codec][0]
+        return os.path.join(self.root or "", os.path.splitext(name)[0] + ext)
+
+    def submit(self, img: Image.Image, name: str,
+               encode: Optional[Callable[[BinaryIO], None]] = None) -> str:
+        """
+        Queue `img` for writing. A custom `encode(fileobj)` replaces the codec;
+        `name` is then used as is (no codec extension).
+        """
+        path = self.path_for(name) if encode is None else os.path.join(self.root or "", name)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._slots.acquire()
+        with self._lock:
+            self.stats["submitted"] += 1
+            future = self._pool.submit(self._write, img, path, encode)
+            self._pending[path] = (img, future)
+        return path
+
+    def _write(self, img: Image.Image, path: str,
+               encode: Optional[Callable[[BinaryIO], None]] = None) -> str:
+        try:
+            if encode is None:
+                save_frame(img, path, self.codec)
+            else:
+                with open(path + ".part", "wb") as f:
+                    encode(f)
+                os.replace(path + ".part", path)
+            with self._lock:
+                self.stats["written"] += 1
+            return path
+        except Exception as e:
+            with self._lock:
+                self.stats["failed"] += 1
+            logger.warning("Artifact write failed for %s: %s", path, e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(path, None)
+            self._slots.release()
+
+    def open_frame(self, path: str,
+                   loader: Callable[[str], Image.Image] = load_frame) -> Image.Image:
+        with self._lock:
+            pending = self._pending.get(path)
+        if pending is not None:
+            return pending[0].copy()
+        return loader(path)
+
+    def wait(self, path: Optional[str] = None, timeout: Optional[float] = None) -> None:
+        """Block until `path` (or every queued frame) is on disk."""
+        with self._lock:
+            futures = [f for p, (_, f) in self._pending.items() if path is None or p == path]
+        for f in futures:
+            try:
+                f.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def flush(self) -> None:
+        self.wait()
+
+
+_writer: Optional[ArtifactWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_artifact_writer() -> ArtifactWriter:
+    """Process-wide writer configured from ARTIFACT_DIR / ARTIFACT_CODEC (disabled without ARTIFACT_DIR)."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ArtifactWriter(
+                    root=os.getenv("ARTIFACT_DIR") or None,
+                    codec=os.getenv("ARTIFACT_CODEC", "png"),
+                    workers=int(os.getenv("ARTIFACT_WORKERS", 2)),
+                    max_pending=int(os.getenv("ARTIFACT_MAX_PENDING", 8)),
+                )
+    return _writer
@@ -0,0 +1,167 @@
+# os_automation/utils/frame_diff.py
+"""
+Frame hashing and tile-level change detection between two screenshots.
+
+Screenshots are written once and read many times (pixel diff, OCR, LLM
+preview), so both the content hash and the changed-tile grid are cached.
+"""
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 32
+# mean abs difference (0-255, grayscale) above which a tile counts as changed
+TILE_THRESHOLD = 2.0
+
+Region = Tuple[int, int, int, int]  # x, y, w, h
+
+
+def _file_key(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=256)
+def _hash_file(key: Tuple[str, int, int]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(key[0], "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def frame_hash(path: str) -> Optional[str]:
+    """Content hash of a screenshot file (cached per path/mtime/size)."""
+    try:
+        return _hash_file(_file_key(path))
+    except Exception as e:
+        logger.debug("frame_hash failed for %s: %s", path, e)
+        return None
+
+
+def _gray(path: str) -> np.ndarray:
+    return np.asarray(Image.open(path).convert("L"), dtype=np.int16)
+
+
+@lru_cache(maxsize=64)
+def _changed_tiles(before_hash: str, after_hash: str, before: str, after: str,
+                   tile: int, threshold: float) -> Tuple[Region, ...]:
+    a, b = _gray(before), _gray(after)
+    if a.shape != b.shape:
+        h, w = b.shape
+        return ((0, 0, w, h),)
+
+    h, w = a.shape
+    means = _per_tile(np.abs(a - b), tile).mean(axis=(1, 3))
+    return tuple(mask_tiles(means > threshold, tile, w, h))
+
+
+def _per_tile(values: np.ndarray, tile: int) -> np.ndarray:
+    """(h, w, ...) zero-padded to whole tiles and viewed as (th, tile, tw, tile, ...)."""
+    h, w = values.shape[:2]
+    th, tw = -(-h // tile), -(-w // tile)
+    padded = np.zeros((th * tile, tw * tile) + values.shape[2:], dtype=values.dtype)
+    padded[:h, :w] = values
+    return padded.reshape((th, tile, tw, tile) + values.shape[2:])
+
+
+def changed_tile_mask(a: np.ndarray, b: np.ndarray, tile: int = TILE_SIZE) -> np.ndarray:
+    """
+    Exact per-tile change mask (th, tw) of two same-shape frames: a tile is
+    set if any pixel/channel differs. Unlike changed_tiles() there is no
+    noise threshold, so unset tiles can be copied from `a` losslessly.
+    """
+    ne = a != b
+    if ne.ndim == 3:
+        ne = ne.any(axis=2)
+    return _per_tile(ne, tile).any(axis=(1, 3))
+
+
+def mask_tiles(mask: np.ndarray, tile: int, width: int, height: int) -> List[Region]:
+    """Regions (x, y, w, h) of the set cells of a tile mask, clipped to the frame."""
+    tiles = []
+    for ty, tx in zip(*np.nonzero(mask)):
+        x, y = int(tx) * tile, int(ty) * tile
+        tiles.append((x, y, min(tile, width - x), min(tile, height - y)))
+    return tiles
+
+
+def changed_tiles(before: str, after: str, tile: int = TILE_SIZE,
+                  threshold: float = TILE_THRESHOLD) -> List[Region]:
+    """Tiles (x, y, w, h) whose content differs between two screenshots."""
+    hb, ha = frame_hash(before), frame_hash(after)
+    if not hb or not ha:
+        return []
+    if hb == ha:
+        return []
+    try:
+        return list(_changed_tiles(hb, ha, before, after, tile, threshold))
+    except Exception as e:
+        logger.debug("changed_tiles failed: %s", e)
+        return []
+
+
+def union_region(regions: List[Region]) -> Optional[Region]:
+    if not regions:
+        return None
+    x1 = min(r[0] for r in regions)
+    y1 = min(r[1] for r in regions)
+    x2 = max(r[0] + r[2] for r in regions)
+    y2 = max(r[1] + r[3] for r in regions)
+    return (x1, y1, x2 - x1, y2 - y1)
+
+
+def dirty_rects(tiles: List[Region], tile: int = TILE_SIZE) -> List[Region]:
+    """
+    Group changed tiles into rectangles: one bounding box per 8-connected
+    cluster of tiles (grid BFS, linear in the number of tiles).
+    """
+    cells = {(x // tile, y // tile): (x, y, w, h) for x, y, w, h in tiles}
+    seen = set()
+    rects: List[Region] = []
+    for start in cells:
+        if start in seen:
+            continue
+        seen.add(start)
+        stack, members = [start], []
+        while stack:
+            cx, cy = stack.pop()
+            members.append(cells[(cx, cy)])
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    n = (cx + dx, cy + dy)
+                    if n in cells and n not in seen:
+                        seen.add(n)
+                        stack.append(n)
+        rects.append(union_region(members))
+    return rects
+
+
+def pad_region(region: Region, pad: int, width: int, height: int) -> Region:
+    """Grow a region by `pad` pixels on every side, clamped to the frame."""
+    x, y, w, h = region
+    x1, y1 = max(0, x - pad), max(0, y - pad)
+    x2, y2 = min(width, x + w + pad), min(height, y + h + pad)
+    return (x1, y1, max(0, x2 - x1), max(0, y2 - y1))
+
+
+def changed_region(before: str, after: str, pad: int = 8,
+                   tile: int = TILE_SIZE, threshold: float = TILE_THRESHOLD) -> Optional[Region]:
+    """Bounding box of all changed tiles (padded), or None if nothing changed."""
+    tiles = changed_tiles(before, after, tile, threshold)
+    region = union_region(tiles)
+    if region is None:
+        return None
+    try:
+        with Image.open(after) as img:
+            width, height = img.size
+    except Exception:
+        return region
+    return pad_region(region, pad, width, height)
@@ -0,0 +1,30 @@
+# os_automation/utils/llm.py
+"""
+OpenAI client construction shared by the agents.
+
+The endpoint is the `base_url` argument, else OPENAI_BASE_URL, else the
+OpenAI API. A local endpoint (e.g. the bundled stand-in,
+tools.llm_stub_server) does not need a real key.
+"""
+import os
+from typing import Optional
+
+from openai import OpenAI
+
+# sent when a base URL is set but OPENAI_API_KEY is not
+LOCAL_API_KEY = "local"
+
+
+def llm_base_url(base_url: Optional[str] = None) -> Optional[str]:
+    return base_url or os.getenv("OPENAI_BASE_URL") or None
+
+
+def llm_configured(base_url: Optional[str] = None) -> bool:
+    """True when there is an endpoint to talk to (a key, or a base URL)."""
+    return bool(os.getenv("OPENAI_API_KEY") or llm_base_url(base_url))
+
+
+def openai_client(base_url: Optional[str] = None) -> OpenAI:
+    base_url = llm_base_url(base_url)
+    api_key = os.getenv("OPENAI_API_KEY") or (LOCAL_API_KEY if base_url else None)
+    return OpenAI(api_key=api_key, base_url=base_url)
@@ -0,0 +1,308 @@
+# os_automation/utils/run_db.py
+"""
+Local SQLite database of orchestration runs.
+
+Every run writes one `runs` row (prompt, plan, status) and one `steps` row
+per executed step, with its attempts, detections, timing spans and
+artifact references in child tables. Queries across thousands of runs
+(slowest steps, detector hit rates, retries) are plain indexed SQL.
+
+Path: RUN_DB (default <output_dir>/runs.sqlite); RUN_DB=0 disables.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from os_automation.utils.tracing import StepTrace
+
+logger = logging.getLogger(__name__)
+
+# same place as the executor's DEFAULT_OUTPUT_DIR (next to the repo), without importing it
+DEFAULT_RUN_DB = os.path.join(
+    os.path.dirname(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))),
+    "os_automation_output", "runs.sqlite",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id     TEXT PRIMARY KEY,
+    prompt     TEXT,
+    mode       TEXT,
+    plan       TEXT,
+    started    REAL,
+    ended      REAL,
+    status     TEXT,
+    step_count INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id                INTEGER PRIMARY KEY,
+    run_id            TEXT REFERENCES runs(run_id) ON DELETE CASCADE,
+    seq               INTEGER,
+    step_id           INTEGER,
+    description       TEXT,
+    action            TEXT,
+    event             TEXT,
+    status            TEXT,
+    validation_status TEXT,
+    attempts          INTEGER,
+    escalated         INTEGER,
+    started           REAL,
+    duration_ms       REAL,
+    validation        TEXT
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    step              INTEGER REFERENCES steps(id) ON DELETE CASCADE,
+    attempt           INTEGER,
+    status            TEXT,
+    validation_status TEXT,
+    bbox              TEXT,
+    event             TEXT,
+    point             TEXT,
+    before            TEXT,
+    after             TEXT,
+    llm_verdict       TEXT
+);
+CREATE TABLE IF NOT EXISTS detections (
+    step        INTEGER REFERENCES steps(id) ON DELETE CASCADE,
+    detector    TEXT,
+    source      TEXT,
+    target      TEXT,
+    found       INTEGER,
+    duration_ms REAL,
+    shot        TEXT,
+    response    TEXT,
+    bbox        TEXT
+);
+CREATE TABLE IF NOT EXISTS spans (
+    step        INTEGER REFERENCES steps(id) ON DELETE CASCADE,
+    name        TEXT,
+    started     REAL,
+    duration_ms REAL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    step   INTEGER REFERENCES steps(id) ON DELETE CASCADE,
+    kind   TEXT,
+    path   TEXT,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS idx_steps_run ON steps(run_id, seq);
+CREATE INDEX IF NOT EXISTS idx_steps_duration ON steps(duration_ms);
+CREATE INDEX IF NOT EXISTS idx_steps_description ON steps(description);
+CREATE INDEX IF NOT EXISTS idx_attempts_step ON attempts(step);
+CREATE INDEX IF NOT EXISTS idx_detections_step ON detections(step);
+CREATE INDEX IF NOT EXISTS idx_detections_detector ON detections(detector, source);
+CREATE INDEX IF NOT EXISTS idx_spans_step ON spans(step);
+CREATE INDEX IF NOT EXISTS idx_spans_name ON spans(name);
+CREATE INDEX IF NOT EXISTS idx_artifacts_digest ON artifacts(digest);
+"""
+
+# columns added after the first schema: ALTERed into older databases on open
+MIGRATIONS = {
+    "attempts": (("event", "TEXT"), ("point", "TEXT"), ("before", "TEXT"), ("after", "TEXT"),
+                 ("llm_verdict", "TEXT")),
+    "detections": (("shot", "TEXT"), ("response", "TEXT"), ("bbox", "TEXT")),
+}
+
+
+def _json(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, default=str)
+
+
+def _decode(text: Optional[str]) -> Any:
+    return None if text is None else json.loads(text)
+
+
+class RunDatabase:
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # one connection shared by the run's threads, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+
+    def _migrate(self) -> None:
+        for table, columns in MIGRATIONS.items():
+            have = {r["name"] for r in self._conn.execute(f"PRAGMA table_info({table})")}
+            for name, kind in columns:
+                if name not in have:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, tuple(params))]
+
+    # -------------------------------------------------------------
+    # writing
+    # -------------------------------------------------------------
+    def begin_run(self, run_id: str, prompt: Optional[str] = None, mode: Optional[str] = None,
+                  plan: Optional[List[Dict[str, Any]]] = None) -> str:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, prompt, mode, plan, started) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(run_id) DO UPDATE SET prompt = excluded.prompt, mode = excluded.mode,"
+                " plan = excluded.plan",
+                (run_id, prompt, mode, json.dumps(plan or []), time.time()),
+            )
+        return run_id
+
+    def record_step(
+        self,
+        run_id: str,
+        seq: int,
+        step: Dict[str, Any],
+        report: Dict[str, Any],
+        trace: Optional[StepTrace] = None,
+        action: Optional[str] = None,
+        artifacts: Iterable[Tuple[str, str, Optional[str]]] = (),
+    ) -> int:
+        """
+        One executed step: `report` is the StepOutcome report
+        ({"execution": {"attempts", "last"}, "validation", "escalate"}),
+        `artifacts` are (kind, path, digest) triples. Returns the step row id.
+        """
+        execution = report.get("execution") or {}
+        last = execution.get("last") or {}
+        validation = report.get("validation") or {}
+        started = trace.started if trace is not None else time.time()
+        duration = trace.duration_ms if trace is not None else None
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO steps (run_id, seq, step_id, description, action, event, status,"
+                " validation_status, attempts, escalated, started, duration_ms, validation)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, seq, step.get("step_id"), step.get("description"), action,
+                 last.get("event"), last.get("status"), validation.get("validation_status"),
+                 execution.get("attempts"), int(bool(report.get("escalate"))),
+                 started, duration, json.dumps(validation.get("details"), default=str)),
+            )
+            step_row = cur.lastrowid
+            if trace is not None:
+                self._conn.executemany(
+                    "INSERT INTO attempts (step, attempt, status, validation_status, bbox, event, point,"
+                    " before, after, llm_verdict) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(step_row, a.get("attempt"), a.get("status"), a.get("validation_status"),
+                      json.dumps(a.get("bbox")), a.get("event"), _json(a.get("point")),
+                      a.get("before"), a.get("after"), a.get("llm_verdict")) for a in trace.attempts],
+                )
+                self._conn.executemany(
+                    "INSERT INTO detections (step, detector, source, target, found, duration_ms, shot,"
+                    " response, bbox) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(step_row, d.get("detector"), d.get("source"), d.get("target"),
+                      int(bool(d.get("found"))), d.get("duration_ms"), d.get("shot"),
+                      _json(d.get("response")), _json(d.get("bbox"))) for d in trace.detections],
+                )
+                self._conn.executemany(
+                    "INSERT INTO spans (step, name, started, duration_ms) VALUES (?, ?, ?, ?)",
+                    [(step_row, s["name"], s["started"], s["duration_ms"]) for s in trace.spans],
+                )
+            self._conn.executemany(
+                "INSERT INTO artifacts (step, kind, path, digest) VALUES (?, ?, ?, ?)",
+                [(step_row, kind, path, digest) for kind, path, digest in artifacts if path],
+            )
+            self._conn.execute("UPDATE runs SET step_count = step_count + 1 WHERE run_id = ?", (run_id,))
+        return step_row
+
+    def end_run(self, run_id: str, status: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET ended = ?, status = ? WHERE run_id = ?",
+                               (time.time(), status, run_id))
+
+    # -------------------------------------------------------------
+    # queries
+    # -------------------------------------------------------------
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT run_id, prompt, status, step_count,"
+            " ROUND((ended - started) * 1000.0, 1) AS duration_ms, started"
+            " FROM runs ORDER BY started DESC LIMIT ?", (limit,))
+
+    def slowest_steps(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Step descriptions by mean duration."""
+        return self._query(
+            "SELECT description, COUNT(*) AS runs, ROUND(AVG(duration_ms), 1) AS avg_ms,"
+            " ROUND(MAX(duration_ms), 1) AS max_ms"
+            " FROM steps WHERE duration_ms IS NOT NULL"
+            " GROUP BY description ORDER BY avg_ms DESC LIMIT ?", (limit,))
+
+    def detector_hit_rates(self) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT detector, source, COUNT(*) AS calls, SUM(found) AS hits,"
+            " ROUND(AVG(found), 3) AS hit_rate, ROUND(AVG(duration_ms), 1) AS avg_ms"
+            " FROM detections GROUP BY detector, source ORDER BY calls DESC")
+
+    def retry_counts(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Step descriptions by retries (attempts beyond the first) and escalations."""
+        return self._query(
+            "SELECT description, COUNT(*) AS runs, SUM(attempts - 1) AS retries,"
+            " MAX(attempts) AS max_attempts, SUM(escalated) AS escalations"
+            " FROM steps WHERE attempts IS NOT NULL"
+            " GROUP BY description HAVING retries > 0 OR escalations > 0"
+            " ORDER BY retries DESC, escalations DESC LIMIT ?", (limit,))
+
+    def durations(self, span: Optional[str] = None) -> List[float]:
+        """Durations (ms) of every step, or of every span with that name."""
+        if span is None:
+            rows = self._query("SELECT duration_ms FROM steps WHERE duration_ms IS NOT NULL")
+        else:
+            rows = self._query("SELECT duration_ms FROM spans WHERE name = ?", (span,))
+        return [r["duration_ms"] for r in rows]
+
+    def replay_steps(self, run_ids: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Recorded steps (oldest run first) with their `attempts` and
+        `detections` rows, JSON columns decoded; input of tools.replay.
+        """
+        where, params = "", tuple(run_ids or ())
+        if params:
+            where = f" WHERE s.run_id IN ({', '.join('?' * len(params))})"
+        steps = self._query(
+            "SELECT s.id, s.run_id, s.seq, s.step_id, s.description, s.action FROM steps s"
+            " JOIN runs r ON r.run_id = s.run_id" + where + " ORDER BY r.started, s.seq", params)
+        by_id = {s["id"]: dict(s, attempts=[], detections=[]) for s in steps}
+        in_steps = f"SELECT s.id FROM steps s{where}"
+        for a in self._query(f"SELECT * FROM attempts WHERE step IN ({in_steps}) ORDER BY step, attempt", params):
+            a["bbox"], a["point"] = _decode(a["bbox"]), _decode(a["point"])
+            by_id[a["step"]]["attempts"].append(a)
+        for d in self._query(f"SELECT * FROM detections WHERE step IN ({in_steps}) ORDER BY step, rowid", params):
+            d["response"], d["bbox"] = _decode(d["response"]), _decode(d["bbox"])
+            by_id[d["step"]]["detections"].append(d)
+        return list(by_id.values())
+
+    def span_summary(self) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT name, COUNT(*) AS count, ROUND(AVG(duration_ms), 1) AS avg_ms,"
+            " ROUND(SUM(duration_ms), 1) AS total_ms"
+            " FROM spans GROUP BY name ORDER BY total_ms DESC")
+
+
+_db: Optional[RunDatabase] = None
+_db_lock = threading.Lock()
+
+
+def get_run_db(default_path: Optional[str] = None) -> Optional[RunDatabase]:
+    """Process-wide database (RUN_DB, else `default_path`); None when disabled."""
+    global _db
+    if _db is None:
+        path = os.getenv("RUN_DB") or default_path
+        if not path or path.lower() in ("0", "false", "no"):
+            return None
+        with _db_lock:
+            if _db is None:
+                _db = RunDatabase(path)
+    return _db
@@ -0,0 +1,255 @@
+# os_automation/utils/shm_frames.py
+"""
+Shared-memory frame transport to detector servers on the same host.
+
+Instead of PNG-encoding a frame, POSTing it as multipart and decoding it
+again on the server, the client copies the raw RGB pixels into a slot of
+a shared-memory ring and sends only a small JSON header over a Unix
+socket:
+
+    → {"ring": name, "slot_bytes": n, "slot": i, "shape": [h, w, 3], "text": "..."}
+    ← {"response": [x1, y1, x2, y2]}          (same body as the HTTP API)
+
+One request/response per line; connections are kept open. The server
+maps the ring once and reads the slot in place (numpy view, no copy).
+
+Slots are sized from the first frame sent. The ring is only created if
+/dev/shm has room for it: a segment larger than the tmpfs can still be
+created (the file is sparse) but the first write into it dies with
+SIGBUS, so ShmSpaceError is raised up front instead and callers use HTTP.
+
+Reference server (stub handler, no model):
+
+    python -m os_automation.utils.shm_frames --socket /tmp/osatlas.sock
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SHM_AVAILABLE = hasattr(socket, "AF_UNIX")
+
+# one request is in flight per client, so two slots are plenty
+DEFAULT_SLOTS = 2
+SHM_DIR = "/dev/shm"
+# free space left in SHM_DIR for everyone else
+SHM_HEADROOM = 16 * 1024 * 1024
+
+Handler = Callable[[np.ndarray, str], Dict[str, Any]]
+
+# segments created by this process (their owner unlinks them)
+_owned = set()
+
+
+class ShmSpaceError(OSError):
+    """Not enough free shared memory for a ring."""
+
+
+def shm_free_bytes() -> Optional[int]:
+    """Free bytes in SHM_DIR, or None where it does not exist (not Linux)."""
+    try:
+        st = os.statvfs(SHM_DIR)
+    except (OSError, AttributeError):
+        return None
+    return st.f_bavail * st.f_frsize
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Map an existing segment without letting this process' tracker unlink it at exit."""
+    shm = shared_memory.SharedMemory(name=name)
+    if name not in _owned:
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+
+class FrameRing:
+    """Fixed-size slots of raw frames in one shared-memory segment."""
+
+    def __init__(self, slots: int, slot_bytes: int):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        free = shm_free_bytes()
+        if free is not None and slots * slot_bytes + SHM_HEADROOM > free:
+            raise ShmSpaceError(f"{slots} x {slot_bytes}-byte frame ring does not fit in "
+                                f"{SHM_DIR} ({free} bytes free)")
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self.name = self.shm.name
+        _owned.add(self.name)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def write(self, frame: np.ndarray) -> int:
+        """Copy a frame into the next slot; returns the slot id."""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"frame of {frame.nbytes} bytes does not fit a {self.slot_bytes}-byte slot")
+        with self._lock:
+            slot = self._next
+            self._next = (self._next + 1) % self.slots
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        view[...] = frame
+        return slot
+
+    def close(self) -> None:
+        _owned.discard(self.name)
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def read_slot(shm: shared_memory.SharedMemory, slot: int, slot_bytes: int, shape) -> np.ndarray:
+    """Zero-copy view of one slot."""
+    return np.ndarray(tuple(shape), dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+class ShmFrameClient:
+    def __init__(self, socket_path: str, slots: int = DEFAULT_SLOTS,
+                 slot_bytes: Optional[int] = None, timeout: float = 45.0):
+        self.socket_path = socket_path
+        self.slots = slots
+        # None: slots sized from the first frame (and re-sized for a larger one)
+        self.slot_bytes = slot_bytes
+        self.timeout = timeout
+        self._ring: Optional[FrameRing] = None
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        # one request in flight: the slot is reused after `slots` calls
+        self._lock = threading.Lock()
+
+    def _ring_for(self, frame: np.ndarray) -> FrameRing:
+        ring = self._ring
+        if ring is not None and (self.slot_bytes or frame.nbytes <= ring.slot_bytes):
+            return ring  # fixed slot size: write() rejects frames that do not fit
+        if ring is not None:
+            ring.close()
+            self._ring = None
+        self._ring = FrameRing(self.slots, self.slot_bytes or frame.nbytes)
+        return self._ring
+
+    def _connect(self) -> None:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._sock, self._reader = sock, sock.makefile("rb")
+
+    def _drop_connection(self) -> None:
+        for c in (self._reader, self._sock):
+            try:
+                if c is not None:
+                    c.close()
+            except Exception:
+                pass
+        self._sock = self._reader = None
+
+    def predict(self, frame: np.ndarray, text: str) -> Dict[str, Any]:
+        with self._lock:
+            ring = self._ring_for(frame)
+            self._connect()
+            slot = ring.write(frame)
+            header = {"ring": ring.name, "slot_bytes": ring.slot_bytes, "slot": slot,
+                      "shape": list(frame.shape), "text": text}
+            try:
+                self._sock.sendall(json.dumps(header).encode("utf-8") + b"\n")
+                line = self._reader.readline()
+            except Exception:
+                self._drop_connection()
+                raise
+            if not line:
+                self._drop_connection()
+                raise ConnectionError("detector server closed the connection")
+            return json.loads(line)
+
+    def close(self) -> None:
+        with self._lock:
+            self._drop_connection()
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+def stub_handler(frame: np.ndarray, text: str) -> Dict[str, Any]:
+    """Model-free reference handler: a box around the frame center."""
+    h, w = frame.shape[:2]
+    return {"response": [w // 2 - 20, h // 2 - 10, w // 2 + 20, h // 2 + 10]}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+                shm = server.segment(req["ring"])
+                frame = read_slot(shm, int(req["slot"]), int(req["slot_bytes"]), req["shape"])
+                resp = server.handler(frame, req.get("text") or "")
+            except Exception as e:
+                logger.debug("shm request failed: %s", e)
+                resp = {"error": str(e)}
+            self.wfile.write(json.dumps(resp).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ShmFrameServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, handler: Handler = stub_handler):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.handler = handler
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._segments_lock = threading.Lock()
+        super().__init__(socket_path, _RequestHandler)
+
+    def segment(self, name: str) -> shared_memory.SharedMemory:
+        with self._segments_lock:
+            shm = self._segments.get(name)
+            if shm is None:
+                shm = self._segments[name] = _attach(name)
+            return shm
+
+    def server_close(self) -> None:
+        super().server_close()
+        for shm in self._segments.values():
+            try:
+                shm.close()
+            except Exception:
+                pass
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reference shared-memory detector server (stub model).")
+    parser.add_argument("--socket", default=os.getenv("OSATLAS_SHM_SOCKET", "/tmp/osatlas.sock"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    with ShmFrameServer(args.socket) as server:
+        logger.info("Serving stub detector on %s", args.socket)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# os_automation/utils/tracing.py
+"""
+Per-step timing spans and detection/attempt records.
+
+The orchestrator opens a trace around each step (trace_step); code on the
+step's thread adds to it with span(), record_detection() and
+record_attempt(). Outside a trace these are no-ops, so the executor can
+be instrumented unconditionally. Work on other threads (speculative
+prefetch, background writers) is not attributed to the step.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_local = threading.local()
+
+
+class StepTrace:
+    def __init__(self):
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.detections: List[Dict[str, Any]] = []
+        self.attempts: List[Dict[str, Any]] = []
+
+    def close(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000.0
+
+
+def current_trace() -> Optional[StepTrace]:
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def trace_step() -> Iterator[StepTrace]:
+    trace, previous = StepTrace(), current_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        trace.close()
+        _local.trace = previous
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    started, t0 = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append({"name": name, "started": started,
+                            "duration_ms": (time.perf_counter() - t0) * 1000.0})
+
+
+def record_detection(**fields) -> None:
+    """detector, source, target, found, duration_ms; shot, response (raw), bbox for replay"""
+    trace = current_trace()
+    if trace is not None:
+        trace.detections.append(fields)
+
+
+def record_attempt(**fields) -> None:
+    """attempt, status, validation_status, bbox; event, point, before, after, llm_verdict for replay"""
+    trace = current_trace()
+    if trace is not None:
+        trace.attempts.append(fields)
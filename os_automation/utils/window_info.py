@@ -0,0 +1,124 @@
+# os_automation/utils/window_info.py
+"""
+Best-effort lookup of the focused application/window.
+
+Used to key per-application caches (templates, UI atlas). Never raises;
+returns empty strings when the platform tools are missing.
+"""
+import logging
+import platform
+import re
+import subprocess
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+_CACHE_TTL = 0.5
+_cache: Dict[str, object] = {"at": 0.0, "info": None}
+
+
+def _run(cmd, timeout: float = 0.5) -> str:
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        return out.stdout.strip() if out.returncode == 0 else ""
+    except Exception:
+        return ""
+
+
+def _linux() -> Dict[str, Any]:
+    active = _run(["xprop", "-root", "_NET_ACTIVE_WINDOW"])
+    m = re.search(r"window id # (0x[0-9a-fA-F]+)", active)
+    if not m:
+        return {"app": "", "title": "", "geometry": None}
+    wid = m.group(1)
+    props = _run(["xprop", "-id", wid, "WM_CLASS", "_NET_WM_NAME"])
+    geometry = None
+    info = _run(["xwininfo", "-id", wid])
+    vals = dict(re.findall(r"(Absolute upper-left [XY]|Width|Height):\s+(-?\d+)", info))
+    if len(vals) == 4:
+        geometry = [int(vals["Absolute upper-left X"]), int(vals["Absolute upper-left Y"]),
+                    int(vals["Width"]), int(vals["Height"])]
+    app = title = ""
+    for line in props.splitlines():
+        if line.startswith("WM_CLASS"):
+            # WM_CLASS(STRING) = "code", "Code"
+            parts = re.findall(r'"([^"]*)"', line)
+            app = parts[-1] if parts else ""
+        elif line.startswith("_NET_WM_NAME"):
+            parts = re.findall(r'"(.*)"', line)
+            title = parts[0] if parts else ""
+    return {"app": app, "title": title, "geometry": geometry}
+
+
+def _darwin() -> Dict[str, Any]:
+    app = _run([
+        "osascript", "-e",
+        'tell application "System Events" to get name of first application process whose frontmost is true',
+    ])
+    return {"app": app, "title": "", "geometry": None}
+
+
+def _windows() -> Dict[str, Any]:
+    try:
+        import ctypes
+        import ctypes.wintypes
+
+        user32 = ctypes.windll.user32
+        hwnd = user32.GetForegroundWindow()
+        length = user32.GetWindowTextLengthW(hwnd)
+        buf = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buf, length + 1)
+        title = buf.value or ""
+        # "file.py - Visual Studio Code" → "Visual Studio Code"
+        app = title.rsplit(" - ", 1)[-1] if title else ""
+
+        rect = ctypes.wintypes.RECT()
+        geometry = None
+        if user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            geometry = [rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top]
+        return {"app": app, "title": title, "geometry": geometry}
+    except Exception:
+        return {"app": "", "title": "", "geometry": None}
+
+
+def active_window_info() -> Dict[str, Any]:
+    """
+    {"app", "title", "geometry": [x, y, w, h] or None} of the focused
+    window (cached briefly).
+    """
+    now = time.monotonic()
+    if _cache["info"] is not None and now - float(_cache["at"]) < _CACHE_TTL:
+        return dict(_cache["info"])
+
+    system = platform.system()
+    try:
+        if system == "Linux":
+            info = _linux()
+        elif system == "Darwin":
+            info = _darwin()
+        elif system.startswith("Win"):
+            info = _windows()
+        else:
+            info = {"app": "", "title": "", "geometry": None}
+    except Exception as e:
+        logger.debug("active_window_info failed: %s", e)
+        info = {"app": "", "title": "", "geometry": None}
+
+    _cache["at"], _cache["info"] = now, info
+    return dict(info)
+
+
+def active_app() -> str:
+    return (active_window_info().get("app") or "").lower()
+
+
+def window_fingerprint(info: Dict[str, object]) -> str:
+    """
+    Stable identity of a window across runs: application class plus the
+    application part of the title ("notes.txt - gedit" → "gedit").
+    """
+    app = str(info.get("app") or "").strip().lower()
+    title = str(info.get("title") or "").strip()
+    suffix = title.rsplit(" - ", 1)[-1].strip().lower() if " - " in title else ""
+    return f"{app}|{suffix}" if suffix and suffix != app else app
@@ -0,0 +1,136 @@
+import json
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from os_automation.utils import artifact_store
+from os_automation.utils.artifact_store import ArtifactStore, prune_files
+from os_automation.utils.artifacts import ArtifactWriter
+
+
+def _img(value, size=(60, 40)):
+    a = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    a[5:15, 5:25] = value
+    return Image.fromarray(a)
+
+
+def _store(tmp_path, **kw):
+    return ArtifactStore(str(tmp_path / "store"), writer=ArtifactWriter(codec="png"), **kw)
+
+
+def _objects(store):
+    return sorted(n for _, _, files in os.walk(store.objects_dir) for n in files)
+
+
+def test_identical_frames_are_stored_once(tmp_path):
+    store = _store(tmp_path)
+    run = store.begin_run(prompt="p")
+    d1 = store.record(_img(100), "before_1.png")
+    d2 = store.record(_img(100), "after_1.png")
+    d3 = store.record(_img(200), "after_2.png")
+    store.end_run(collect=False)
+
+    assert d1 == d2 != d3
+    assert len(_objects(store)) == 2
+    assert store.stats == {"frames": 3, "stored": 1, "deltas": 1, "deduplicated": 1}
+    assert np.array_equal(np.asarray(store.load(d3)), np.asarray(_img(200)))
+
+    manifest = json.loads(open(run.path).read())
+    assert [f["name"] for f in manifest["frames"]] == ["before_1.png", "after_1.png", "after_2.png"]
+    assert manifest["meta"] == {"prompt": "p"} and manifest["ended"] is not None
+
+
+def test_gc_by_age_and_size_keeps_shared_frames(tmp_path):
+    store = _store(tmp_path)
+    old = store.begin_run("old")
+    shared = store.record(_img(1), "a.png")
+    store.record(_img(2), "b.png")
+    old.data["started"] = time.time() - 30 * 86400
+    store.end_run(collect=False)
+
+    store.begin_run("new")
+    store.record(_img(1), "a.png")
+    store.end_run(collect=False)
+
+    res = store.gc(max_age_days=14)
+    assert res["runs_removed"] == 1 and res["objects_removed"] == 1
+    assert store.path(shared) is not None
+    assert os.listdir(store.runs_dir) == ["new.json"]
+
+    # over quota: oldest runs go first, then their unreferenced objects
+    store.begin_run("newest")
+    newest = store.record(_img(3), "c.png")
+    store.end_run(collect=False)
+    store.gc(max_bytes=os.path.getsize(store.path(newest)))
+    assert os.listdir(store.runs_dir) == ["newest.json"]
+    assert store.path(shared) is None and len(_objects(store)) == 1
+
+
+def test_prune_files_removes_only_stale_frames(tmp_path):
+    fresh, stale = tmp_path / "fresh.png", tmp_path / "stale.png"
+    for p in (fresh, stale, tmp_path / "notes.txt"):
+        p.write_bytes(b"x")
+    past = time.time() - 7200
+    os.utime(stale, (past, past))
+    os.utime(tmp_path / "notes.txt", (past, past))
+    assert prune_files(str(tmp_path), 3600) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fresh.png", "notes.txt"]
+
+
+def test_after_frames_are_stored_as_tile_deltas(tmp_path, monkeypatch):
+    store = _store(tmp_path, delta_chain=2)
+    before = np.random.default_rng(0).integers(0, 255, (96, 128, 3), dtype=np.uint8)
+    frames = [before]
+    for i in range(1, 4):
+        f = frames[-1].copy()
+        f[40:50, 10 * i:10 * i + 20] = (255, 0, i)  # small change, crossing tile borders
+        frames.append(f)
+
+    store.begin_run("r")
+    digests = [store.record(Image.fromarray(f), f"f{i}.png") for i, f in enumerate(frames)]
+    # served from memory while queued, then rebuilt from disk
+    assert np.array_equal(np.asarray(store.load(digests[2])), frames[2])
+    store.end_run(collect=False)
+
+    names = _objects(store)
+    assert store.stats["deltas"] == 2 and store.stats["stored"] == 2  # chain cut after 2 deltas
+    assert sum(".d1-" in n for n in names) == 1 and sum(".d2-" in n for n in names) == 1
+
+    fresh = ArtifactStore(store.root, writer=ArtifactWriter(codec="png"))
+    for d, f in zip(digests, frames):
+        assert np.array_equal(np.asarray(fresh.load(d)), f)
+    delta = next(n for n in names if ".d1-" in n)
+    assert os.path.getsize(store.path(digests[1])) < os.path.getsize(store.path(digests[0])) / 10
+
+    # the base of a referenced delta survives gc even when no manifest lists it
+    monkeypatch.setattr(artifact_store, "ORPHAN_GRACE_S", 0)
+    path = os.path.join(store.runs_dir, "r.json")
+    run = json.loads(open(path).read())
+    run["frames"] = run["frames"][1:2]
+    open(path, "w").write(json.dumps(run))
+    res = fresh.gc()
+    assert res["objects_removed"] == 2 and delta.startswith(digests[1])
+    assert np.array_equal(np.asarray(fresh.load(digests[1])), frames[1])
+
+
+def test_submit_records_off_the_calling_thread_in_order(tmp_path):
+    store = _store(tmp_path, max_pending=2)
+    run = store.begin_run("r")
+    futures = [store.submit(_img(v), f"f{i}.png") for i, v in enumerate((10, 10, 20))]
+    run_path = run.path
+    store.end_run(collect=False)  # waits for the queued frames
+    digests = [f.result() for f in futures]
+    assert digests[0] == digests[1] != digests[2]
+    frames = json.loads(open(run_path).read())["frames"]
+    assert [f["name"] for f in frames] == ["f0.png", "f1.png", "f2.png"]
+    assert [f["digest"] for f in frames] == digests
+
+
+def test_store_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_store, "_store", None)
+    monkeypatch.delenv("ARTIFACT_DIR", raising=False)
+    assert artifact_store.get_artifact_store() is None
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path / "store"))
+    assert artifact_store.get_artifact_store().root == str(tmp_path / "store")
@@ -0,0 +1,59 @@
+import threading
+
+import numpy as np
+from PIL import Image
+
+from os_automation.utils import artifacts
+from os_automation.utils.artifacts import ArtifactWriter, compress_npy, load_frame, save_frame
+
+
+def _img():
+    a = np.zeros((40, 60, 3), dtype=np.uint8)
+    a[10:20, 5:50] = (200, 30, 90)
+    return Image.fromarray(a)
+
+
+def test_codecs_round_trip_losslessly(tmp_path):
+    img = _img()
+    for codec in ("png", "webp", "npy", "qoi"):
+        path = save_frame(img, str(tmp_path / f"f_{codec}.png"), codec)
+        assert np.array_equal(np.asarray(load_frame(path).convert("RGB")), np.asarray(img))
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == sorted(
+        [".png", ".webp", ".npy", ".qoi" if artifacts.QOI_AVAILABLE else ".png"])
+
+
+def test_deferred_compression_of_raw_frames(tmp_path):
+    save_frame(_img(), str(tmp_path / "a.png"), "npy")
+    written = compress_npy(str(tmp_path), codec="webp")
+    assert [p.name for p in tmp_path.iterdir()] == ["a.webp"] and len(written) == 1
+
+
+def test_writer_queue_is_bounded_and_serves_pending_frames(tmp_path, monkeypatch):
+    gate = threading.Event()
+    real = artifacts.save_frame
+
+    def slow_save(img, path, codec="png"):
+        gate.wait(5)
+        return real(img, path, codec)
+
+    monkeypatch.setattr(artifacts, "save_frame", slow_save)
+    writer = ArtifactWriter(root=str(tmp_path), codec="npy", workers=1, max_pending=2)
+    p1 = writer.submit(_img(), "shot_1.png")
+    writer.submit(_img(), "shot_2.png")
+    assert p1.endswith("shot_1.npy")
+
+    # not on disk yet, still readable
+    assert not (tmp_path / "shot_1.npy").exists()
+    assert writer.open_frame(p1).size == (60, 40)
+
+    # a third frame waits for a free slot
+    third = threading.Thread(target=writer.submit, args=(_img(), "shot_3.png"))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+
+    gate.set()
+    third.join(5)
+    writer.flush()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["shot_1.npy", "shot_2.npy", "shot_3.npy"]
+    assert writer.stats["written"] == 3
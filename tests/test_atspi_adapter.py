@@ -0,0 +1,82 @@
+from os_automation.repos import atspi_adapter
+from os_automation.repos.atspi_adapter import A11yIndex, A11yNode, ATSPIAdapter, _AppSnapshot
+
+NODES = [
+    A11yNode((0,), "Untitled Document 1 - gedit", "frame", (0, 0, 800, 600)),
+    A11yNode((0, 0), "Save", "push button", (700, 10, 60, 30)),
+    A11yNode((0, 1), "Save As…", "menu item", (600, 80, 120, 24)),
+    A11yNode((0, 2), "Open", "push button", (10, 10, 60, 30)),
+    A11yNode((0, 3), "Open", "label", (12, 12, 40, 20)),
+    A11yNode((0, 4), "", "filler", (0, 50, 800, 500)),
+]
+
+
+def test_index_matches_name_and_role():
+    index = A11yIndex(NODES)
+    node, score = index.find(["save"], ["button"])
+    assert node.path == (0, 0) and score == 1.0
+
+    node, _ = index.find(["save as"], ["option"])
+    assert node.role == "menu item"
+
+    # equal names: the interactive role wins over the label
+    node, _ = index.find(["open"])
+    assert node.role == "push button"
+
+    assert index.find(["preferences"]) is None
+
+
+def test_index_drop_subtree():
+    index = A11yIndex(NODES)
+    index.drop_subtree((0, 1))
+    assert len(index) == len(NODES) - 1
+    index.drop_subtree((0,))
+    assert len(index) == 0
+
+
+def test_adapter_without_atspi_defers():
+    res = ATSPIAdapter(listen=False).detect({"text": "save", "description": "Click Save button"})
+    assert res["bbox"] is None and res["confidence"] == 0.0
+
+
+class _Source:
+    def __init__(self, app):
+        self.app = app
+
+    def getApplication(self):
+        return self.app
+
+
+class _Event:
+    def __init__(self, type, source):
+        self.type, self.source = type, source
+
+
+def _adapter_with_snapshots(*apps):
+    adapter = ATSPIAdapter(listen=False)
+    for app in apps:
+        snap = adapter._snapshots[app] = _AppSnapshot(app)
+        snap.dirty = False
+    return adapter
+
+
+def test_events_reach_the_snapshot_of_their_own_application():
+    adapter = _adapter_with_snapshots("editor", "terminal")
+    adapter._on_event(_Event("window:activate", _Source("terminal")))
+    adapter._apply_events()  # e.g. while looking up in the editor
+    assert adapter._snapshots["terminal"].dirty and not adapter._snapshots["editor"].dirty
+
+
+def test_events_are_coalesced_per_source_and_bounded(monkeypatch):
+    adapter = _adapter_with_snapshots("editor", "terminal")
+    source = _Source("editor")
+    for _ in range(1000):
+        adapter._on_event(_Event("object:bounds-changed", source))
+    assert list(adapter._pending) == [source] and adapter._pending[source] == {"object:bounds-changed"}
+
+    monkeypatch.setattr(atspi_adapter, "EVENT_BACKLOG", 2)
+    for i in range(3):
+        adapter._on_event(_Event("object:bounds-changed", _Source("other%d" % i)))
+    assert adapter._overflow and not adapter._pending
+    adapter._apply_events()
+    assert all(snap.dirty for snap in adapter._snapshots.values())
@@ -0,0 +1,58 @@
+from os_automation.core.registry import registry
+from os_automation.repos.cascade_adapter import CascadeDetector
+
+
+class Tier:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+        self.learned = []
+
+    def detect(self, step):
+        self.calls += 1
+        return dict(self.result)
+
+    def learn(self, step, res):
+        self.learned.append((step["text"], res["bbox"]))
+
+
+def test_cascade_stops_at_first_confident_tier():
+    cheap = Tier({"bbox": None, "confidence": 0.0})
+    mid = Tier({"bbox": [1, 2, 3, 4], "confidence": 0.95})
+    expensive = Tier({"bbox": [9, 9, 9, 9], "confidence": 1.0})
+    registry.register_adapter("t_cheap", cheap)
+    registry.register_adapter("t_mid", mid)
+    registry.register_adapter("t_exp", expensive)
+
+    cascade = CascadeDetector(tiers=[
+        {"adapter": "t_cheap", "min_confidence": 0.9},
+        {"adapter": "t_missing", "min_confidence": 0.9},
+        {"adapter": "t_mid", "min_confidence": 0.9},
+        {"adapter": "t_exp", "min_confidence": 0.0},
+    ])
+    res = cascade.detect({"image_path": "x.png", "text": "ok"})
+
+    assert res["bbox"] == [1, 2, 3, 4] and res["tier"] == "t_mid"
+    assert expensive.calls == 0
+    assert cheap.learned == []
+
+    # validated detections are forwarded to learning tiers
+    cascade.learn({"image_path": "x.png", "text": "ok"}, res)
+    assert cheap.learned == [("ok", [1, 2, 3, 4])]
+
+    stats = cascade.stats()
+    assert stats["t_cheap"]["calls"] == 1 and stats["t_cheap"]["hits"] == 0
+    assert stats["t_mid"]["hit_rate"] == 1.0
+    assert stats["t_missing"]["calls"] == 0
+
+
+def test_cascade_falls_back_to_best_below_threshold():
+    registry.register_adapter("t_low", Tier({"bbox": [5, 5, 10, 10], "confidence": 0.6}))
+    registry.register_adapter("t_none", Tier({"bbox": None, "confidence": 0.0}))
+
+    cascade = CascadeDetector(tiers=[("t_low", 0.9), ("t_none", 0.5)])
+    res = cascade.detect({"image_path": "x.png", "text": "ok"})
+    assert res["bbox"] == [5, 5, 10, 10] and res["tier"] == "t_low"
+
+    empty = CascadeDetector(tiers=["t_none"])
+    assert empty.detect({"image_path": "x.png", "text": "ok"})["bbox"] is None
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from os_automation.agents.executor_agent import ExecutorAgent
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.registry import registry
+from os_automation.repos.cascade_adapter import CascadeDetector
+from os_automation.tools.ui_atlas import UIAtlas
+
+TARGET = [2000, 1000, 100, 40]  # on a 2560x1440 frame
+
+
+class RedFinder(BaseAdapter):
+    """Finds the red rectangle in whatever image it is given."""
+
+    downscale_ok = True
+
+    def __init__(self, on_crop=None):
+        self.widths = []
+        self.on_crop = on_crop
+
+    def detect(self, step):
+        with Image.open(step["image_path"]) as img:
+            self.widths.append(img.width)
+            if self.on_crop is not None and img.width != 1280:
+                return self.on_crop
+            arr = np.asarray(img.convert("RGB")).astype(int)
+        ys, xs = np.nonzero((arr[..., 0] > 200) & (arr[..., 1] < 60))
+        if not len(xs):
+            return {"bbox": None, "type": "no_match", "confidence": 0.0}
+        return {"bbox": [int(xs.min()), int(ys.min()), int(np.ptp(xs)) + 1, int(np.ptp(ys)) + 1], "confidence": 1.0}
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+class Recorder(RedFinder):
+    """Pixel-exact tier (template / OCR): must see the full-resolution frame."""
+
+    downscale_ok = False
+
+    def detect(self, step):
+        with Image.open(step["image_path"]) as img:
+            self.widths.append(img.width)
+        return {"bbox": None, "type": "no_match", "confidence": 0.0}
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.setattr(registry, "_adapters", dict(registry._adapters))  # registrations end with the test
+    monkeypatch.setattr(registry, "_contracts", dict(registry._contracts))
+    frame = Image.new("RGB", (2560, 1440), (235, 235, 235))
+    x, y, w, h = TARGET
+    frame.paste((230, 20, 20), (x, y, x + w, y + h))
+    shot = str(tmp_path / "shot_1.png")
+    frame.save(shot)
+    executor = ExecutorAgent(output_dir=str(tmp_path), coarse_min_width=2560,
+                             ui_atlas=UIAtlas(path=str(tmp_path / "atlas.json")))
+
+    def detect(adapter):
+        registry.register_adapter("c2f_detector", adapter)
+        executor.default_detection = "c2f_detector"
+        executor._detectors = {}
+        return executor._detect_bbox("Click the red button", image_path=shot)
+
+    return tmp_path, detect
+
+
+def test_refines_on_a_full_resolution_crop(setup):
+    tmp_path, detect = setup
+    finder = RedFinder()
+    assert detect(finder) == TARGET
+    assert finder.widths == [1280, 960]  # coarse pass, then the crop
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(("_coarse.png", "_fine.png"))]
+
+
+def test_cascade_downscales_the_model_tier_only(setup):
+    _, detect = setup
+    exact, model = Recorder(), RedFinder()
+    registry.register_adapter("c2f_exact", exact)
+    registry.register_adapter("c2f_model", model)
+    assert detect(CascadeDetector(tiers=[("c2f_exact", 0.9), ("c2f_model", 0.0)])) == TARGET
+    assert exact.widths == [2560] and model.widths == [1280, 960]
+
+
+def test_screen_space_results_are_not_mapped(setup):
+    _, detect = setup
+    screen_hit = {"bbox": [5, 6, 70, 20], "confidence": 1.0, "space": "screen"}
+
+    class ScreenSpace(RedFinder):
+        def detect(self, step):
+            self.widths.append(0)
+            return screen_hit
+
+    coarse_only = ScreenSpace()
+    assert detect(coarse_only) == [5, 6, 70, 20] and len(coarse_only.widths) == 1
+    # on the fine pass too: the crop offset is not added
+    assert detect(RedFinder(on_crop=screen_hit)) == [5, 6, 70, 20]
+
+
+def test_falls_back_to_the_scaled_coarse_bbox(setup):
+    _, detect = setup
+    bbox = detect(RedFinder(on_crop={"bbox": None, "type": "no_match", "confidence": 0.0}))
+    assert bbox == TARGET  # the 2x downscale maps back exactly here
+    assert detect(RedFinder(on_crop={"bbox": [900, 600, 200, 100], "confidence": 1.0})) == TARGET  # outside crop
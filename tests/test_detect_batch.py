@@ -0,0 +1,154 @@
+from PIL import Image
+
+from os_automation.core.adapters import BaseAdapter, has_native_batch
+from os_automation.core.registry import registry
+from os_automation.repos import osatlas_adapter
+from os_automation.repos.cascade_adapter import CascadeDetector
+from os_automation.repos.osatlas_adapter import OSAtlasAdapter
+
+
+class ByText(BaseAdapter):
+    """Per-query adapter: bbox for known texts, miss otherwise."""
+
+    def __init__(self, known, confidence=1.0):
+        self.known = known
+        self.confidence = confidence
+        self.calls = []
+
+    def detect(self, step):
+        self.calls.append(step["text"])
+        bbox = self.known.get(step["text"])
+        return {"bbox": bbox, "confidence": self.confidence if bbox else 0.0}
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+class Batching(ByText):
+    def __init__(self, known):
+        super().__init__(known)
+        self.batches = []
+
+    def detect_batch(self, image_path, queries):
+        self.batches.append([q["text"] for q in queries])
+        return [self.detect(dict(q, image_path=image_path)) for q in queries]
+
+
+def test_default_detect_batch_loops_detect():
+    adapter = ByText({"ok": [1, 2, 3, 4]})
+    res = adapter.detect_batch("x.png", ["ok", {"text": "cancel"}])
+    assert [r["bbox"] for r in res] == [[1, 2, 3, 4], None]
+    assert adapter.calls == ["ok", "cancel"]
+    assert not has_native_batch(adapter)
+    assert has_native_batch(Batching({}))
+    assert not has_native_batch(OSAtlasAdapter(base_url="http://atlas/predict"))  # no batch route configured
+
+
+def test_cascade_batches_only_unresolved_queries():
+    cheap = ByText({"ok": [1, 1, 10, 10]}, confidence=0.95)
+    model = Batching({"cancel": [20, 20, 10, 10], "ok": [9, 9, 9, 9]})
+    registry.register_adapter("b_cheap", cheap)
+    registry.register_adapter("b_model", model)
+
+    cascade = CascadeDetector(tiers=[("b_cheap", 0.9), ("b_model", 0.0)])
+    res = cascade.detect_batch("x.png", ["cancel", "ok", "help"])
+
+    assert res[0]["bbox"] == [20, 20, 10, 10] and res[0]["tier"] == "b_model"
+    assert res[1]["bbox"] == [9, 9, 9, 9] and res[2]["bbox"] is None
+    # one model pass for the current target and the look-ahead; the per-query tier saw only the first
+    assert model.batches == [["cancel", "ok", "help"]]
+    assert cheap.calls == ["cancel"]
+    assert cascade.stats()["b_model"]["calls"] == 3
+    assert cascade.batch_supported
+
+
+def test_cheap_tier_hit_makes_no_model_call_for_look_ahead():
+    cheap = ByText({"ok": [1, 1, 10, 10]}, confidence=0.95)
+    model = Batching({"cancel": [20, 20, 10, 10]})
+    registry.register_adapter("b_cheap", cheap)
+    registry.register_adapter("b_model", model)
+
+    cascade = CascadeDetector(tiers=[("b_cheap", 0.9), ("b_model", 0.0)])
+    res = cascade.detect_batch("x.png", ["ok", "cancel", "help"])
+    assert res[0]["bbox"] == [1, 1, 10, 10] and res[0]["tier"] == "b_cheap"
+    assert res[1]["bbox"] is None and res[2]["bbox"] is None  # resolved when they are asked for
+    assert model.batches == [] and model.calls == []
+
+
+def test_cascade_never_resolves_look_ahead_one_query_at_a_time():
+    registry.register_adapter("b_only_single", ByText({"next": [5, 5, 5, 5]}))
+    cascade = CascadeDetector(tiers=[("b_only_single", 0.0)])
+    res = cascade.detect_batch("x.png", ["missing", "next"])
+    assert res[0]["bbox"] is None and res[1]["bbox"] is None
+    assert not cascade.batch_supported and not has_native_batch(cascade)
+
+
+class _Resp:
+    def __init__(self, status, payload=None):
+        self.status_code = status
+        self.payload = payload or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return self.payload
+
+
+def test_osatlas_batch_endpoint_and_fallback(tmp_path, monkeypatch):
+    img = tmp_path / "s.png"
+    Image.new("RGB", (100, 100)).save(img)
+    posts = []
+
+    def post(url, files=None, data=None, timeout=None):
+        posts.append(url)
+        if url.endswith("_batch"):
+            return _Resp(200, {"responses": [{"response": [0, 0, 10, 10]}, {"response": None}]})
+        return _Resp(200, {"response": [5, 5, 15, 25]})
+
+    monkeypatch.setattr(osatlas_adapter.requests, "post", post)
+    adapter = OSAtlasAdapter(base_url="http://atlas/predict", batch_url="http://atlas/predict_batch")
+    assert has_native_batch(adapter)
+    res = adapter.detect_batch(str(img), ["ok", "cancel"])
+    assert posts == ["http://atlas/predict_batch"]
+    assert res[0]["bbox"] == [0, 0, 10, 10] and res[1]["bbox"] is None
+
+    # a server without the batch route: first query alone, batching switched off
+    posts.clear()
+
+    def post_no_batch(url, **kw):
+        if url.endswith("_batch"):
+            posts.append(url)
+            return _Resp(404)
+        return post(url, **kw)
+
+    monkeypatch.setattr(osatlas_adapter.requests, "post", post_no_batch)
+    adapter = OSAtlasAdapter(base_url="http://atlas/predict", batch_url="http://atlas/predict_batch")
+    res = adapter.detect_batch(str(img), ["ok", "cancel"])
+    assert [r["bbox"] for r in res] == [[5, 5, 10, 20], None]
+    assert not has_native_batch(adapter)
+    adapter.detect_batch(str(img), ["ok", "cancel"])
+    assert posts.count("http://atlas/predict_batch") == 1
+
+
+def test_held_bboxes_dropped_after_a_large_screen_change(tmp_path):
+    from os_automation.agents.executor_agent import ExecutorAgent
+    from os_automation.tools.ui_atlas import UIAtlas
+
+    executor = ExecutorAgent(output_dir=str(tmp_path), ui_atlas=UIAtlas(path=str(tmp_path / "atlas.json")))
+    held, small, large = (str(tmp_path / n) for n in ("held.png", "small.png", "large.png"))
+    Image.new("RGB", (320, 200), (240, 240, 240)).save(held)
+    frame = Image.new("RGB", (320, 200), (240, 240, 240))
+    frame.paste((0, 0, 0), (250, 150, 300, 190))  # away from the held boxes
+    frame.save(small)
+    Image.new("RGB", (320, 200), (20, 20, 90)).save(large)  # new page
+
+    executor._held = {"ok": (held, [10, 10, 40, 20]), "cancel": (held, [60, 10, 40, 20])}
+    assert executor._held_lookup("ok", small) == [10, 10, 40, 20]
+    assert executor._held_lookup("cancel", large) is None
+    executor._held = {"ok": (held, [10, 10, 40, 20]), "cancel": (held, [60, 10, 40, 20])}
+    assert executor._held_lookup("ok", large) is None and executor._held == {}
@@ -0,0 +1,32 @@
+from PIL import Image, ImageDraw
+
+from os_automation.utils.frame_diff import changed_region, changed_tiles, frame_hash
+
+
+def _frames(tmp_path):
+    before = Image.new("RGB", (200, 120), "white")
+    after = before.copy()
+    ImageDraw.Draw(after).rectangle([70, 40, 90, 50], fill="black")
+    bp, ap = tmp_path / "before.png", tmp_path / "after.png"
+    before.save(bp)
+    after.save(ap)
+    return str(bp), str(ap)
+
+
+def test_changed_tiles_cover_only_the_change(tmp_path):
+    before, after = _frames(tmp_path)
+    tiles = changed_tiles(before, after)
+    assert tiles
+    for x, y, w, h in tiles:
+        assert x <= 90 and x + w >= 70 and y <= 50 and y + h >= 40
+
+    x, y, w, h = changed_region(before, after, pad=0)
+    assert x <= 70 and y <= 40 and x + w >= 91 and y + h >= 51
+    assert w < 200 and h < 120
+
+
+def test_identical_frames_have_no_change(tmp_path):
+    before, _ = _frames(tmp_path)
+    assert frame_hash(before) is not None
+    assert changed_tiles(before, before) == []
+    assert changed_region(before, before) is None
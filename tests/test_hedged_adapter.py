@@ -0,0 +1,71 @@
+import time
+
+from os_automation.core.registry import registry
+from os_automation.repos.hedged_adapter import HedgedDetector
+
+
+class Backend:
+    def __init__(self, result, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    def detect(self, step):
+        self.calls += 1
+        time.sleep(self.delay)
+        return dict(self.result)
+
+
+def test_slow_primary_is_hedged_after_delay():
+    slow = Backend({"bbox": [1, 1, 1, 1], "confidence": 1.0}, delay=1.0)
+    fast = Backend({"bbox": [5, 5, 10, 10], "confidence": 0.9})
+    registry.register_adapter("h_slow", slow)
+    registry.register_adapter("h_fast", fast)
+
+    hedged = HedgedDetector(backends=["h_slow", ("h_fast", 0.8)], hedge_delay=0.1, timeout=5)
+    start = time.monotonic()
+    res = hedged.detect({"image_path": "x.png", "text": "ok"})
+
+    assert res["bbox"] == [5, 5, 10, 10] and res["backend"] == "h_fast"
+    assert time.monotonic() - start < 0.8
+    assert hedged.stats()["h_fast"]["wins"] == 1
+
+
+def test_fast_primary_never_starts_secondary():
+    primary = Backend({"bbox": [2, 2, 2, 2], "confidence": 1.0})
+    secondary = Backend({"bbox": [9, 9, 9, 9], "confidence": 1.0})
+    registry.register_adapter("h_primary", primary)
+    registry.register_adapter("h_secondary", secondary)
+
+    hedged = HedgedDetector(backends=["h_primary", "h_secondary"], hedge_delay=0.5)
+    assert hedged.detect({"text": "ok"})["backend"] == "h_primary"
+    assert secondary.calls == 0
+
+
+def test_miss_hedges_immediately_and_low_confidence_is_fallback():
+    miss = Backend({"bbox": None, "confidence": 0.0})
+    weak = Backend({"bbox": [3, 3, 3, 3], "confidence": 0.4})
+    registry.register_adapter("h_miss", miss)
+    registry.register_adapter("h_weak", weak)
+
+    hedged = HedgedDetector(backends=["h_miss", ("h_weak", 0.8)], hedge_delay=10, timeout=5)
+    start = time.monotonic()
+    res = hedged.detect({"text": "ok"})
+    assert res["bbox"] == [3, 3, 3, 3] and res["backend"] == "h_weak"
+    assert time.monotonic() - start < 1.0
+
+    empty = HedgedDetector(backends=["h_miss", "h_unregistered"], hedge_delay=0)
+    assert empty.detect({"text": "ok"})["bbox"] is None
+
+
+def test_losers_still_running_do_not_delay_the_next_race(monkeypatch):
+    monkeypatch.setattr(registry, "_adapters", dict(registry._adapters))
+    monkeypatch.setattr(registry, "_contracts", dict(registry._contracts))
+    registry.register_adapter("h_stuck", Backend({"bbox": [1, 1, 1, 1], "confidence": 1.0}, delay=1.5))
+    registry.register_adapter("h_quick", Backend({"bbox": [4, 4, 4, 4], "confidence": 1.0}))
+
+    hedged = HedgedDetector(backends=["h_stuck", "h_quick"], hedge_delay=0.05, timeout=5)
+    for _ in range(8):  # more losers in flight than a 2x-backends pool would hold
+        start = time.monotonic()
+        assert hedged.detect({"text": "ok"})["backend"] == "h_quick"
+        assert time.monotonic() - start < 0.5
@@ -0,0 +1,31 @@
+import re
+
+from os_automation.core.intent_matcher import Capture, IntentMatcher, IntentRule
+from os_automation.core.step_compiler import INTENT_MATCHER
+
+
+def test_rules_fire_in_priority_order():
+    matcher = IntentMatcher([
+        IntentRule("click", "event", priority=2, any_of=("click",)),
+        IntentRule("double", "event", priority=1, any_of=("double click",)),
+        IntentRule("type", "route", startswith=("type ",)),
+    ])
+    assert [m.name for m in matcher.match("Double click folder")] == ["double", "click"]
+    assert matcher.first("Double click folder", "event").name == "double"
+    assert matcher.first("type 'x'", "route").name == "type"
+    assert matcher.first("retype 'x'", "route") is None
+
+
+def test_regex_captures_fill_payload():
+    matcher = IntentMatcher([
+        IntentRule("ctrl", "event", any_of=("ctrl+",), regex=re.compile(r"press\s+ctrl\+([a-z])"),
+                   payload={"event": "hotkey", "keys": ["ctrl", Capture(1)]}),
+    ])
+    assert matcher.first("Press Ctrl+S", "event").fields() == {"event": "hotkey", "keys": ["ctrl", "s"]}
+
+
+def test_automaton_agrees_with_linear_scan():
+    for text in ("Press Super key", "Type 'hello'", "Click first search result",
+                 "Run command 'ls' in terminal", "Open the browser", "enter", ""):
+        assert [m.name for m in INTENT_MATCHER.scan(text)] == \
+            [m.name for m in INTENT_MATCHER.match_linear(text)]
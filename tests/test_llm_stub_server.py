@@ -0,0 +1,55 @@
+import pytest
+import yaml
+from openai import OpenAI
+
+from os_automation.agents.main_ai import MainAIAgent
+from os_automation.agents.validator_agent import ValidatorAgent
+from os_automation.tools.llm_stub_server import Latency, LLMStubServer, Rule
+
+PLAN = "steps:\n  - step_id: 1\n    description: \"Click the \\1 button\"\n"
+
+
+def test_rules_expand_groups_and_fall_back_to_default():
+    srv = LLMStubServer([
+        Rule(PLAN, user=r"press (\w+)", system="planner"),
+        {"response": lambda system, user: user.upper(), "user": "^shout"},
+    ], default="continue")
+    try:
+        assert srv.answer([{"role": "system", "content": "planner"},
+                           {"role": "user", "content": "press OK"}])[0].startswith("steps:")
+        assert srv.answer([{"role": "user", "content": "press OK"}])[2] == "default"  # system pattern unmet
+        assert srv.answer([{"role": "user", "content": "shout hi"}])[0] == "SHOUT HI"
+        assert srv.calls == 3 and [e["rule"] for e in srv.log] == ["press (\\w+)", "default", "^shout"]
+    finally:
+        srv.httpd.server_close()
+
+
+def test_latency_specs():
+    assert Latency("fixed:0.25").sample() == 0.25
+    assert Latency(0.1).sample() == 0.1
+    draws = [Latency("uniform:0.1,0.2", seed=3).sample() for _ in range(3)]
+    assert len(set(draws)) == 1 and 0.1 <= draws[0] <= 0.2  # same seed, same draw
+    assert Latency("normal:-5,0.1").sample() == 0.0
+    with pytest.raises(ValueError):
+        Latency("gamma:1,2")
+
+
+def test_openai_client_and_agents_talk_to_the_stub(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    rules = [{"system": "automation planner", "user": r"press the (\w+) button", "response": PLAN}]
+    with LLMStubServer(rules, default="Save", chunk_chars=2) as srv:
+        client = OpenAI(api_key="x", base_url=srv.base_url)
+        assert [m.id for m in client.models.list().data] == ["stub"]
+        stream = client.chat.completions.create(model="m", stream=True,
+                                                messages=[{"role": "user", "content": "anything"}])
+        assert "".join(c.choices[0].delta.content or "" for c in stream) == "Save"
+
+        agent = MainAIAgent(base_url=srv.base_url)
+        plan = yaml.safe_load(agent.plan("press the OK button"))
+        assert plan["steps"][0]["description"] == "Click the OK button"
+        assert agent.rewrite_ui_query("Click the save icon") == "Save"
+
+        assert ValidatorAgent().llm_client is None  # no key, no base URL
+        monkeypatch.setenv("OPENAI_BASE_URL", srv.base_url)
+        assert ValidatorAgent().llm_client is not None
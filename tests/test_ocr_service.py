@@ -0,0 +1,55 @@
+from PIL import Image
+
+from os_automation.tools.ocr_service import OCRService
+
+
+class CountingOCR(OCRService):
+    available = True
+
+    def __init__(self):
+        super().__init__(pool_size=1, cache_size=2)
+        self.calls = []
+
+    def _run(self, img):
+        self.calls.append(img.size)
+        return "text"
+
+
+def test_ocr_is_region_restricted_and_cached(tmp_path):
+    path = tmp_path / "after.png"
+    Image.new("RGB", (300, 200), "white").save(path)
+
+    svc = CountingOCR()
+    assert svc.ocr(str(path), (10, 20, 50, 40)) == "text"
+    assert svc.ocr(str(path), (10, 20, 50, 40)) == "text"
+    assert svc.calls == [(50, 40)]
+    assert (svc.hits, svc.misses) == (1, 1)
+
+    svc.ocr(str(path))
+    assert svc.calls[-1] == (300, 200)
+
+
+def test_validator_reads_the_whole_frame_when_nothing_changed(tmp_path, monkeypatch):
+    from os_automation.agents import validator_agent
+    from os_automation.core.step_compiler import compile_step
+    from os_automation.core.tal import ExecutionResult
+
+    before, after = str(tmp_path / "before.png"), str(tmp_path / "after.png")
+    Image.new("RGB", (300, 200), "white").save(before)
+    Image.new("RGB", (300, 200), "white").save(after)
+    regions = []
+    monkeypatch.setattr(validator_agent, "OCR_AVAILABLE", True)
+    monkeypatch.setattr(validator_agent, "_ocr", lambda path, region=None: regions.append(region) or "prompt $")
+    validator = validator_agent.ValidatorAgent()
+    validator.llm_client = None
+
+    def run(description, event):
+        op = compile_step({"step_id": 1, "description": description})
+        return validator.validate(op, ExecutionResult(
+            step_id=1, repo_used="x", decided_event=event, status="success",
+            screenshot_before=before, screenshot_after=after))
+
+    assert run("Press Enter", "keypress").validation_status == "pass"  # OCR text, no pixel change
+    assert regions == [None]
+    run("Click the first search result", "click")
+    assert regions == [None]  # branches that never read text do not OCR
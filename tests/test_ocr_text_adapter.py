@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+from os_automation.repos import ocr_text_adapter
+from os_automation.repos.ocr_text_adapter import OCRTextAdapter, label_candidates
+from os_automation.tools.ocr import WordBoxIndex
+from os_automation.tools.ocr_service import OCRWord
+
+WORDS = [
+    OCRWord("File", (10, 5, 30, 12), 95.0, 0),
+    OCRWord("Edit", (50, 5, 30, 12), 95.0, 0),
+    OCRWord("Save", (10, 40, 35, 12), 90.0, 1),
+    OCRWord("As...", (50, 40, 30, 12), 90.0, 1),
+    OCRWord("Compose", (200, 100, 70, 14), 88.0, 2),
+    OCRWord("Settings", (200, 140, 70, 14), 91.0, 3),
+]
+
+
+def test_word_box_index_exact_phrase_and_fuzzy():
+    index = WordBoxIndex(WORDS)
+
+    m = index.best("compose")
+    assert m.bbox == (200, 100, 70, 14) and m.score == 1.0
+
+    m = index.best("Save As")
+    assert m.text == "Save As..." and m.bbox == (10, 40, 70, 12)
+
+    m = index.best("Setings")
+    assert m is not None and m.text == "Settings" and m.score < 1.0
+
+    assert index.best("Inbox") is None
+
+
+def test_label_candidates_strip_action_words():
+    assert label_candidates("button", "Click Compose button") == ["compose"]
+    assert label_candidates("ok button", "Click 'OK'")[0] == "ok"
+
+
+def test_adapter_detects_text_label(tmp_path, monkeypatch):
+    shot = tmp_path / "shot.png"
+    Image.new("RGB", (320, 200), "white").save(shot)
+
+    class FakeService:
+        calls = 0
+
+        def ocr_words(self, image_path, region=None):
+            FakeService.calls += 1
+            return WORDS
+
+    monkeypatch.setattr(ocr_text_adapter, "OCR_AVAILABLE", True)
+    monkeypatch.setattr(ocr_text_adapter, "get_ocr_service", lambda: FakeService())
+
+    adapter = OCRTextAdapter()
+    res = adapter.detect({"image_path": str(shot), "text": "button", "description": "Click Compose button"})
+    assert res["type"] == "ocr_text"
+    assert res["bbox"] == [200, 100, 70, 14]
+    assert res["point"] == [235, 107]
+
+    res = adapter.detect({"image_path": str(shot), "text": "search", "description": "Click search box"})
+    assert res["bbox"] is None and res["confidence"] == 0.0
+    # one OCR pass per frame
+    assert FakeService.calls == 1
+
+
+
+def test_index_cache_is_safe_across_threads(monkeypatch):
+    class FakeService:
+        def ocr_words(self, image_path, region=None):
+            return WORDS
+
+    class SlowLookup(OrderedDict):
+        def get(self, key, default=None):
+            value = super().get(key, default)
+            time.sleep(0.0005)  # room for another thread to evict key before move_to_end
+            return value
+
+    monkeypatch.setattr(ocr_text_adapter, "get_ocr_service", lambda: FakeService())
+    monkeypatch.setattr(ocr_text_adapter, "frame_hash", lambda path: path)
+    adapter = OCRTextAdapter(index_cache_size=2)
+    adapter._indexes = SlowLookup()
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(100):
+                adapter.index_for(f"frame_{(i + n) % 3}.png")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and len(adapter._indexes) == 2
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import numpy as np
+from PIL import Image
+
+from os_automation.core.orchestrator import Orchestrator
+from os_automation.utils.artifact_store import ArtifactStore
+from os_automation.utils.artifacts import ArtifactWriter
+from os_automation.utils.run_db import RunDatabase
+
+
+def test_recorded_steps_link_their_frames_to_the_artifact_store(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"), writer=ArtifactWriter(codec="png"))
+    store.begin_run()
+    orch = Orchestrator.__new__(Orchestrator)  # only the run database bookkeeping is exercised
+    orch.executor_agent = SimpleNamespace(store=store)
+    orch.run_db = RunDatabase(str(tmp_path / "runs.sqlite"))
+    orch.run_db.begin_run("r1", prompt="p")
+
+    rng = np.random.default_rng(0)
+    for seq in range(10):
+        frames = {}
+        for kind in ("before", "after"):
+            name = f"{kind}_{seq}.png"
+            # what _screenshot does: the store records the frame later, on its worker
+            store.submit(Image.fromarray(rng.integers(0, 255, (300, 400, 3), dtype=np.uint8)), name)
+            frames[kind] = str(tmp_path / name)
+        report = {"execution": {"attempts": 1, "last": dict(frames, status="success")},
+                  "validation": {"validation_status": "pass"}}
+        orch._record_step("r1", seq, {"step_id": seq, "description": "Click OK"}, None, report, None)
+
+    rows = orch.run_db._query("SELECT kind, path, digest FROM artifacts")
+    assert len(rows) == 20 and all(r["digest"] for r in rows)
+    store.end_run(collect=False)
+    orch.run_db.close()
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from PIL import Image
+
+from os_automation.agents import executor_agent
+from os_automation.agents.executor_agent import ExecutorAgent
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.registry import registry
+from os_automation.core.step_compiler import compile_step
+from os_automation.tools.ui_atlas import UIAtlas
+
+
+class Detector(BaseAdapter):
+    def __init__(self):
+        self.texts = []
+
+    def detect(self, step):
+        self.texts.append(step["text"])
+        return {"bbox": [10, 10, 40, 20], "confidence": 1.0}
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+@pytest.fixture
+def executor(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.setattr(registry, "_adapters", dict(registry._adapters))
+    monkeypatch.setattr(registry, "_contracts", dict(registry._contracts))
+    registry.register_adapter("rewrite_detector", Detector())
+    return ExecutorAgent(default_detection="rewrite_detector", output_dir=str(tmp_path),
+                         ui_atlas=UIAtlas(path=str(tmp_path / "atlas.json")))
+
+
+def test_remote_rewrite_overlaps_capture(executor, tmp_path, monkeypatch):
+    rewriting, captured = threading.Event(), threading.Event()
+
+    def rewrite(description):
+        rewriting.set()
+        assert captured.wait(5), "capture did not run while the rewrite was in flight"
+        return "Save"
+
+    def screenshot(output_dir, prefix="shot", screen=None):
+        assert rewriting.wait(5), "rewrite did not start before capture"
+        path = str(tmp_path / "shot.png")
+        Image.new("RGB", (200, 100)).save(path)
+        captured.set()
+        return path
+
+    monkeypatch.setattr(executor_agent, "_screenshot", screenshot)
+    executor._rewrite_fn = rewrite
+    assert executor._detect_bbox("Click the save icon") == [10, 10, 40, 20]
+    assert registry.get_adapter("rewrite_detector").texts == ["Save"]
+
+
+def test_rewrites_are_memoized_and_bounded(executor, monkeypatch):
+    calls = []
+    executor._rewrite_fn = lambda d: calls.append(d) or d.upper()
+    assert executor._query_future("open file").result() == "OPEN FILE"
+    assert executor._cached_query("open file") == "OPEN FILE"
+    assert calls == ["open file"]
+
+    monkeypatch.setattr(executor_agent, "QUERY_CACHE_SIZE", 2)
+    for d in ("a", "open file", "b"):
+        executor._cached_query(d)
+    assert list(executor._queries) == ["open file", "b"]  # least recently used ("a") dropped
+    assert calls == ["open file", "a", "b"]
+
+
+def test_failed_rewrite_falls_back_to_the_compiled_query(executor):
+    def broken(description):
+        raise RuntimeError("endpoint down")
+
+    executor._rewrite_fn = broken
+    op = compile_step({"step_id": 1, "description": "Click the OK button"})
+    assert op.target_query
+    assert executor._query_future(op.description, op).result() == op.target_query
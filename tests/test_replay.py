@@ -0,0 +1,143 @@
+import os
+import sqlite3
+
+from PIL import Image, ImageDraw
+
+from os_automation.agents.validator_agent import ValidatorAgent
+from os_automation.core.step_compiler import compile_step
+from os_automation.core.tal import ExecutionResult
+from os_automation.tools.replay import ReplayHarness
+from os_automation.utils.artifact_store import ArtifactStore
+from os_automation.utils.run_db import RunDatabase
+from os_automation.utils.tracing import record_attempt, record_detection, trace_step
+
+BBOX = [100, 50, 80, 30]
+
+
+def _frames(tmp_path):
+    before = Image.new("RGB", (640, 400), (240, 240, 240))
+    after = before.copy()
+    ImageDraw.Draw(after).rectangle([100, 50, 180, 80], fill=(30, 90, 200))
+    paths = []
+    for name, img in (("before_1.png", before), ("after_1.png", after)):
+        path = str(tmp_path / name)
+        img.save(path)
+        paths.append(path)
+    return before, after, paths
+
+
+def _record(db, run_id, shot, before, after, bbox, validation_status):
+    db.begin_run(run_id, prompt="press the button")
+    with trace_step() as trace:
+        record_detection(detector="osatlas", source="detector", target="click the ok button", found=True,
+                         duration_ms=40.0, shot=shot, response={"bbox": BBOX}, bbox=bbox)
+        record_detection(detector="osatlas", source="atlas", target="click the ok button", found=True,
+                         duration_ms=0.1, shot=shot, response=None, bbox=bbox)
+        record_attempt(attempt=1, status="success", validation_status=validation_status, bbox=BBOX,
+                       event="click", point=[141, 65], before=before, after=after)
+    report = {"execution": {"attempts": 1, "last": {"status": "success", "event": "click"}},
+              "validation": {"validation_status": validation_status}}
+    db.record_step(run_id, 0, {"step_id": 1, "description": "Click the OK button"}, report, trace, action="visual")
+    db.end_run(run_id, status=validation_status)
+
+
+def test_replay_matches_recording_and_reports_drift(tmp_path):
+    _, _, (before, after) = _frames(tmp_path)
+    validator = ValidatorAgent()
+    validator.llm_client = None
+    op = compile_step({"step_id": 1, "description": "Click the OK button"})
+    status = validator.validate(op, ExecutionResult(
+        step_id=1, repo_used="x", decided_event="click", status="success",
+        screenshot_before=before, screenshot_after=after, bbox=BBOX)).validation_status
+
+    db = RunDatabase(str(tmp_path / "runs.sqlite"))
+    _record(db, "good", before, before, after, BBOX, status)
+    _record(db, "drift", before, before, after, [0, 0, 10, 10], "fail" if status == "pass" else "pass")
+
+    harness = ReplayHarness(db, validator=validator)
+    report = harness.replay(harness.load(["good"]), repeat=3)
+    assert report.ok and report.steps == 3
+    rows = {r["stage"]: r for r in report.rows()}
+    assert rows["detect"]["matched"] == 1 and rows["detect"]["skipped"] == 1  # atlas hit: no response
+    assert rows["click"]["matched"] == 1 and rows["validate"]["matched"] == 1
+    assert all(r["per_s"] for r in rows.values())
+
+    report = harness.replay(harness.load(["drift"]))
+    assert sorted(m.stage for m in report.mismatches) == ["detect", "validate"]
+    db.close()
+
+
+def test_llm_tie_breaks_replay_the_recorded_verdict(tmp_path):
+    before_img = Image.new("RGB", (640, 400), (240, 240, 240))
+    after_img = before_img.copy()
+    ImageDraw.Draw(after_img).rectangle([300, 200, 340, 240], fill=(30, 90, 200))  # below the pixel threshold
+    before, after = str(tmp_path / "before_1.png"), str(tmp_path / "after_1.png")
+    before_img.save(before)
+    after_img.save(after)
+
+    class TieBreak(ValidatorAgent):
+        def _llm_validation_decision(self, *args, **kwargs):
+            return True
+
+    live = TieBreak()
+    op = compile_step({"step_id": 1, "description": "Open the settings page"})
+    validation = live.validate(op, ExecutionResult(
+        step_id=1, repo_used="x", decided_event="open", status="success",
+        screenshot_before=before, screenshot_after=after))
+    assert validation.validation_status == "pass" and validation.llm_verdict == "pass"
+
+    db = RunDatabase(str(tmp_path / "runs.sqlite"))
+    db.begin_run("llm", prompt="open the settings")
+    with trace_step() as trace:
+        record_attempt(attempt=1, status="success", validation_status="pass", bbox=None, event="open",
+                       before=before, after=after, llm_verdict=validation.llm_verdict)
+    db.record_step("llm", 0, {"step_id": 1, "description": "Open the settings page"},
+                   {"validation": validation.to_report()}, trace)
+    db.end_run("llm", status="pass")
+
+    harness = ReplayHarness(db)
+    report = harness.replay(harness.load())
+    assert report.ok and report.stages["validate"].matched == 1
+
+    offline = ValidatorAgent()
+    offline.llm_client = None
+    harness = ReplayHarness(db, validator=offline)
+    report = harness.replay(harness.load())
+    assert report.ok and report.stages["validate"].skipped == 1
+    db.close()
+
+
+def test_frames_are_restored_from_the_artifact_store(tmp_path):
+    before_img, after_img, (before, after) = _frames(tmp_path)
+    store = ArtifactStore(str(tmp_path / "store"))
+    run_id = store.begin_run().run_id
+    store.record(before_img, os.path.basename(before))
+    store.record(after_img, os.path.basename(after))
+    store.end_run(collect=False)
+    os.remove(before)
+    os.remove(after)
+
+    db = RunDatabase(str(tmp_path / "runs.sqlite"))
+    _record(db, run_id, before, before, after, BBOX, "pass")
+    harness = ReplayHarness(db, store=store, stages=("detect",))
+    step = harness.load()[0]
+    restored = step["attempts"][0]["after"]
+    assert restored and restored != after
+    with Image.open(restored) as img:
+        assert img.convert("RGB").tobytes() == after_img.tobytes()
+    assert step["detections"][0]["screen"] == (640, 400)
+    db.close()
+
+
+def test_older_databases_gain_the_replay_columns(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE attempts (step INTEGER, attempt INTEGER, status TEXT, validation_status TEXT, bbox TEXT);"
+        "CREATE TABLE detections (step INTEGER, detector TEXT, source TEXT, target TEXT, found INTEGER,"
+        " duration_ms REAL);")
+    conn.close()
+    db = RunDatabase(path)
+    columns = {r["name"] for r in db._query("PRAGMA table_info(detections)")}
+    assert {"shot", "response", "bbox"} <= columns
+    db.close()
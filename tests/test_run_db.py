@@ -0,0 +1,65 @@
+import json
+import time
+
+from click.testing import CliRunner
+
+from os_automation.cli.cli import cli
+from os_automation.utils.run_db import RunDatabase
+from os_automation.utils.tracing import record_attempt, record_detection, span, trace_step
+
+
+def _report(attempts, status="pass", escalate=False):
+    return {
+        "execution": {"attempts": attempts, "last": {"status": "success", "event": "click",
+                                                     "before": "/o/before_1.png", "after": "/o/after_1.png"}},
+        "validation": {"validation_status": status, "details": {"local_diff": 4.5}},
+        "escalate": escalate,
+    }
+
+
+def _traced_step(detector_hits):
+    with trace_step() as trace:
+        for i, found in enumerate(detector_hits, 1):
+            with span("detect"):
+                time.sleep(0.001)
+            record_detection(detector="osatlas", source="detector", target="ok", found=found, duration_ms=1.0)
+            record_attempt(attempt=i, status="success", validation_status="pass" if found else "fail",
+                           bbox=[1, 2, 3, 4] if found else None)
+    return trace
+
+
+def test_trace_collects_spans_only_inside_a_step():
+    with span("outside"):
+        pass
+    trace = _traced_step([False, True])
+    assert [s["name"] for s in trace.spans] == ["detect", "detect"]
+    assert [a["attempt"] for a in trace.attempts] == [1, 2]
+    assert trace.duration_ms >= sum(s["duration_ms"] for s in trace.spans)
+
+
+def test_runs_are_indexed_and_queryable(tmp_path):
+    path = str(tmp_path / "runs.sqlite")
+    db = RunDatabase(path)
+    for n in range(3):
+        run_id = f"r{n}"
+        db.begin_run(run_id, prompt="open file", mode="partial", plan=[{"step_id": 1, "description": "Click OK"}])
+        db.record_step(run_id, 0, {"step_id": 1, "description": "Click OK"}, _report(2),
+                       _traced_step([False, True]), action="visual",
+                       artifacts=[("before", "/o/before_1.png", "abc"), ("after", "/o/after_1.png", None)])
+        db.record_step(run_id, 1, {"step_id": 2, "description": "Type 'x'"}, _report(1), _traced_step([True]))
+        db.end_run(run_id, status="pass")
+
+    assert [r["step_count"] for r in db.runs()] == [2, 2, 2]
+    retries = db.retry_counts()
+    assert retries == [{"description": "Click OK", "runs": 3, "retries": 3, "max_attempts": 2, "escalations": 0}]
+    rates = db.detector_hit_rates()
+    assert rates[0]["calls"] == 9 and rates[0]["hits"] == 6
+    assert db.slowest_steps()[0]["description"] == "Click OK"
+    assert db.span_summary()[0]["count"] == 9
+    db.close()
+
+    result = CliRunner().invoke(cli, ["query", "retries", "--db", path, "--json"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)[0]["retries"] == 3
+    result = CliRunner().invoke(cli, ["query", "detectors", "--db", path])
+    assert "hit_rate" in result.output and "osatlas" in result.output
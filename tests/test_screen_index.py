@@ -0,0 +1,72 @@
+from PIL import Image, ImageDraw
+
+from os_automation.repos.screen_index_adapter import ScreenIndexAdapter
+from os_automation.tools.ocr_service import OCRWord
+from os_automation.tools.screen_index import ScreenIndex
+from os_automation.utils.frame_diff import dirty_rects
+
+
+class Scene:
+    """Fake OCR: words drawn as black boxes; extraction reports those in the region."""
+
+    def __init__(self):
+        self.words = {}
+        self.calls = []
+
+    def draw(self, path):
+        img = Image.new("RGB", (640, 480), "white")
+        d = ImageDraw.Draw(img)
+        for x, y, w, h in self.words.values():
+            d.rectangle([x, y, x + w - 1, y + h - 1], fill="black")
+        img.save(path)
+        return str(path)
+
+    def __call__(self, image_path, region=None):
+        self.calls.append(region)
+        rx, ry, rw, rh = region or (0, 0, 640, 480)
+        return [
+            OCRWord(text, box, 95.0, i)
+            for i, (text, box) in enumerate(self.words.items())
+            if rx <= box[0] and ry <= box[1] and box[0] + box[2] <= rx + rw and box[1] + box[3] <= ry + rh
+        ]
+
+
+def test_dirty_rects_cluster_adjacent_tiles():
+    tiles = [(0, 0, 32, 32), (32, 32, 32, 32), (320, 320, 32, 32)]
+    assert sorted(dirty_rects(tiles)) == [(0, 0, 64, 64), (320, 320, 32, 32)]
+
+
+def test_only_changed_tiles_are_re_extracted(tmp_path):
+    scene = Scene()
+    scene.words = {"file": (20, 20, 40, 12), "edit": (80, 20, 40, 12), "save": (400, 300, 50, 14)}
+    screen = ScreenIndex(extractors=[scene])
+
+    screen.update(scene.draw(tmp_path / "0.png"))
+    assert scene.calls == [None] and len(screen) == 3
+
+    # "save" becomes "saved" (slightly wider); the menu row is untouched
+    del scene.words["save"]
+    scene.words["saved"] = (400, 300, 60, 14)
+    screen.update(scene.draw(tmp_path / "1.png"))
+
+    region = scene.calls[-1]
+    assert len(scene.calls) == 2 and region is not None
+    assert region[0] > 120 and region[2] * region[3] < 640 * 480 / 4
+    assert sorted(w.text for w in screen.elements) == ["edit", "file", "saved"]
+    assert screen.index.best("saved").bbox == (400, 300, 60, 14)
+
+    # same frame again: no extraction at all
+    screen.update(str(tmp_path / "1.png"))
+    assert len(scene.calls) == 2
+
+
+def test_screen_transition_reparses_full_frame(tmp_path):
+    scene = Scene()
+    scene.words = {"ok": (10, 10, 20, 10)}
+    adapter = ScreenIndexAdapter(screen=ScreenIndex(extractors=[scene]))
+    assert adapter.detect({"image_path": scene.draw(tmp_path / "0.png"), "text": "ok"})["bbox"] == [10, 10, 20, 10]
+
+    scene.words = {"big": (0, 0, 640, 400)}
+    res = adapter.detect({"image_path": scene.draw(tmp_path / "1.png"), "text": "ok"})
+    assert res["bbox"] is None
+    assert scene.calls == [None, None] and adapter.screen.stats["full"] == 2
@@ -0,0 +1,96 @@
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from os_automation.repos import osatlas_adapter
+from os_automation.repos.osatlas_adapter import OSAtlasAdapter
+from os_automation.utils import shm_frames
+from os_automation.utils.shm_frames import SHM_AVAILABLE, ShmFrameClient, ShmFrameServer, ShmSpaceError
+
+pytestmark = pytest.mark.skipif(not SHM_AVAILABLE, reason="needs Unix sockets")
+
+
+@pytest.fixture
+def server(tmp_path):
+    seen = []
+
+    def handler(frame, text):
+        seen.append((frame.shape, int(frame[5, 7, 0]), text))
+        return {"response": [1, 2, 11, 22]}
+
+    srv = ShmFrameServer(str(tmp_path / "det.sock"), handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv, seen
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_frames_reach_the_server_through_shared_memory(server):
+    srv, seen = server
+    client = ShmFrameClient(srv.server_address, slots=2, slot_bytes=64 * 48 * 3)
+    try:
+        for value in (10, 20, 30):  # more calls than slots: the ring wraps
+            frame = np.zeros((48, 64, 3), dtype=np.uint8)
+            frame[5, 7, 0] = value
+            assert client.predict(frame, "ok") == {"response": [1, 2, 11, 22]}
+        assert seen == [((48, 64, 3), v, "ok") for v in (10, 20, 30)]
+
+        with pytest.raises(ValueError):
+            client.predict(np.zeros((100, 100, 3), dtype=np.uint8), "too big")
+    finally:
+        client.close()
+
+
+def test_osatlas_uses_shm_socket_instead_of_http(server, tmp_path, monkeypatch):
+    srv, seen = server
+    img = tmp_path / "s.png"
+    Image.new("RGB", (64, 48)).save(img)
+
+    def no_http(*a, **kw):
+        raise AssertionError("HTTP must not be used")
+
+    monkeypatch.setattr(osatlas_adapter.requests, "post", no_http)
+    adapter = OSAtlasAdapter(shm_socket=srv.server_address)
+    try:
+        res = adapter.detect({"image_path": str(img), "text": "ok"})
+    finally:
+        adapter._shm.close()
+    assert res["bbox"] == [1, 2, 10, 20]
+    assert seen[0][0] == (48, 64, 3) and seen[0][2].startswith("ok")
+
+
+def test_slots_are_sized_from_the_frame(server):
+    srv, seen = server
+    client = ShmFrameClient(srv.server_address)
+    try:
+        client.predict(np.zeros((48, 64, 3), dtype=np.uint8), "small")
+        assert client._ring.slot_bytes == 48 * 64 * 3
+        client.predict(np.zeros((96, 64, 3), dtype=np.uint8), "larger")  # ring re-created
+        assert client._ring.slot_bytes == 96 * 64 * 3
+        assert [s[0] for s in seen] == [(48, 64, 3), (96, 64, 3)]
+    finally:
+        client.close()
+
+
+def test_full_dev_shm_falls_back_to_http(server, tmp_path, monkeypatch):
+    srv, seen = server
+    img = tmp_path / "s.png"
+    Image.new("RGB", (64, 48)).save(img)
+    monkeypatch.setattr(shm_frames, "shm_free_bytes", lambda: 1024)
+    with pytest.raises(ShmSpaceError):
+        ShmFrameClient(srv.server_address).predict(np.zeros((48, 64, 3), dtype=np.uint8), "x")
+
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"response": [0, 0, 4, 4]}
+
+    posts = []
+    monkeypatch.setattr(osatlas_adapter.requests, "post", lambda *a, **kw: posts.append(a) or Resp())
+    adapter = OSAtlasAdapter(shm_socket=srv.server_address)
+    assert adapter.detect({"image_path": str(img), "text": "ok"})["bbox"] == [0, 0, 4, 4]
+    assert adapter._shm is None and len(posts) == 1 and not seen  # transport switched off
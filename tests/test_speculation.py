@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from os_automation.agents.executor_agent import ExecutorAgent
+from os_automation.core.adapters import BaseAdapter
+from os_automation.core.registry import registry
+from os_automation.core.step_compiler import compile_step
+from os_automation.tools.ui_atlas import UIAtlas
+
+BOXES = {"OK": [40, 40, 60, 24], "Help": [120, 40, 60, 24]}
+
+
+class Detector(BaseAdapter):
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def detect(self, step):
+        self.calls.append((step["text"], step["image_path"]))
+        if threading.current_thread().name.startswith("speculate"):
+            self.gate.wait(10)
+        label = next((k for k in BOXES if k in step["description"]), None)
+        return {"bbox": BOXES.get(label), "confidence": 1.0 if label else 0.0}
+
+    def execute(self, step):
+        return {"status": "no-op"}
+
+    def validate(self, step):
+        return {"validation": "unknown"}
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.setattr(registry, "_adapters", dict(registry._adapters))
+    monkeypatch.setattr(registry, "_contracts", dict(registry._contracts))
+    detector = Detector()
+    registry.register_adapter("spec_detector", detector)
+    executor = ExecutorAgent(default_detection="spec_detector", output_dir=str(tmp_path), speculative=True,
+                             ui_atlas=UIAtlas(path=str(tmp_path / "atlas.json")))
+    executor.set_upcoming([compile_step({"step_id": 2, "description": "Click the OK button"})])
+    frames = []
+    for i, color in enumerate([(240, 240, 240), (240, 240, 240), (30, 30, 120)]):
+        path = str(tmp_path / f"frame_{i}.png")
+        Image.new("RGB", (320, 200), color).save(path)
+        frames.append(path)
+    return executor, detector, frames
+
+
+def test_hit_reuses_the_prefetched_detection(env):
+    executor, detector, (after, same, _) = env
+    executor._speculate(after)
+    assert executor._detect_bbox("Click the OK button", image_path=same) == BOXES["OK"]
+    assert executor._last_detection["source"] == "held"
+    assert [shot for _, shot in detector.calls] == [after]  # no second detector call
+
+
+def test_stale_frame_is_detected_again(env):
+    executor, detector, (after, _, changed) = env
+    executor._speculate(after)
+    assert executor._detect_bbox("Click the OK button", image_path=changed) == BOXES["OK"]
+    assert executor._last_detection["source"] == "detector"
+    assert [shot for _, shot in detector.calls] == [after, changed]
+
+
+def test_wrong_guess_does_not_hold_up_the_real_detection(env):
+    executor, detector, (after, same, _) = env
+    detector.gate.clear()  # the speculative call hangs
+    executor._speculate(after)
+    t0 = time.perf_counter()
+    try:
+        assert executor._detect_bbox("Click the Help button", image_path=same) == BOXES["Help"]
+        assert time.perf_counter() - t0 < 5
+        assert "ok" not in executor._held
+    finally:
+        detector.gate.set()
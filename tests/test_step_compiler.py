@@ -0,0 +1,40 @@
+from os_automation.core.step_compiler import compile_plan, compile_step, match_mcp_adapter
+from os_automation.core.tal import PlannedStep
+
+
+def test_compile_type_step():
+    op = compile_step(PlannedStep(step_id=3, description="Type 'hello.py'"))
+    assert op.step_id == 3
+    assert op.action == "gui_type"
+    assert op.event_spec() == {"event": "type", "text": "hello.py"}
+    assert op.hints.is_type_step
+    assert op.hints.expected_text == "hello.py"
+
+
+def test_compile_routing_actions():
+    ops = compile_plan([
+        {"step_id": 1, "description": "Press Super key"},
+        {"step_id": 2, "description": "Press Enter"},
+        {"step_id": 3, "description": "Wait 3 seconds"},
+        {"step_id": 4, "description": "Open Terminal"},
+        {"step_id": 5, "description": "Click New File button"},
+    ])
+    assert [o.action for o in ops] == ["os_launcher", "gui_enter", "wait", "open_terminal", "visual"]
+    assert ops[2].duration == 3.0
+    assert ops[4].event == "click"
+    assert ops[4].target_query == "new file"
+    assert ops[4].hints.is_click
+
+
+def test_compile_hotkeys_and_keys():
+    assert compile_step("Press Ctrl+S").event_spec() == {"event": "hotkey", "keys": ["ctrl", "s"]}
+    assert compile_step("Press '+'").event_spec() == {"event": "keypress", "key": "+"}
+    assert compile_step("Scroll Down").event_spec() == {"event": "scroll", "direction": "down"}
+    assert compile_step("do something").event == "unknown"
+
+
+def test_browser_and_mcp_signals():
+    assert compile_step("Submit the login form").browser_task
+    assert not compile_step("Click Run button").browser_task
+    assert match_mcp_adapter("Open the website and inspect the DOM") == "gemini_mcp_chrome_devtools"
+    assert match_mcp_adapter("Open calculator") is None
@@ -1,5 +1,5 @@
-from os_automation.core.tal import (ExecutionResult, PlannedStep,
-                                    ValidationReport)
+from os_automation.core.tal import (ExecutionResult, PlannedStep, StepOutcome,
+                                    ValidationReport, ValidationResult)
 
 
 def test_planned_step_and_models():
@@ -9,3 +9,35 @@ def test_planned_step_and_models():
     assert er.status == "success"
     vr = ValidationReport(task_id="t1", overall_status="success", validated_steps=[{"step_id": 1}])
     assert vr.overall_status == "success"
+
+
+def test_execution_result_report_round_trip():
+    er = ExecutionResult(
+        step_id=2, repo_used="pyautogui", decided_event="click", status="success",
+        screenshot_before="b.png", screenshot_after="a.png", bbox=[1, 2, 3, 4],
+        raw={"adapter_raw": {"status": "success"}},
+    )
+    report = er.to_report()
+    assert report == {
+        "status": "success", "before": "b.png", "after": "a.png", "event": "click",
+        "bbox": [1, 2, 3, 4], "adapter_raw": {"status": "success"},
+    }
+    back = ExecutionResult.from_report(2, report, repo_used="pyautogui")
+    assert back == er
+
+
+def test_step_outcome_report_layout():
+    outcome = StepOutcome(
+        attempts=1,
+        last=ExecutionResult(step_id=1, repo_used="pyautogui", decided_event="", status="failed",
+                             error="no_bbox_detected"),
+        validation=ValidationResult(validation_status="fail", details={"reason": "executor_failed"}),
+        escalate=True,
+    )
+    assert not outcome.validation.passed
+    report = outcome.to_report()
+    assert report["execution"]["attempts"] == 1
+    assert report["execution"]["last"]["error"] == "no_bbox_detected"
+    assert "event" not in report["execution"]["last"]
+    assert report["validation"] == {"validation_status": "fail", "details": {"reason": "executor_failed"}}
+    assert report["escalate"] is True
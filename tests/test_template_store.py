@@ -0,0 +1,88 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from os_automation.agents import executor_agent
+from os_automation.agents.executor_agent import ExecutorAgent
+from os_automation.core.registry import registry
+from os_automation.repos.cascade_adapter import CascadeDetector
+from os_automation.repos.template_adapter import TemplateAdapter
+from os_automation.tools.template_store import TemplateStore, ncc_map
+from os_automation.tools.ui_atlas import UIAtlas
+
+
+def _frame(offset=(0, 0)):
+    img = Image.new("RGB", (400, 300), (240, 240, 240))
+    d = ImageDraw.Draw(img)
+    ox, oy = offset
+    d.rectangle([100 + ox, 80 + oy, 160 + ox, 110 + oy], fill=(30, 90, 200))
+    d.text((108 + ox, 88 + oy), "Save", fill="white")
+    d.ellipse([300, 200, 330, 230], fill=(200, 40, 40))
+    return img
+
+
+def test_ncc_map_matches_brute_force():
+    rng = np.random.default_rng(0)
+    image = rng.random((24, 30))
+    templ = image[5:12, 8:17].copy()
+    scores = ncc_map(image, templ)
+    assert np.unravel_index(np.argmax(scores), scores.shape) == (5, 8)
+    assert scores[5, 8] > 0.999
+
+    # spot-check one position against the textbook formula
+    win = image[3:10, 2:11]
+    a, b = win - win.mean(), templ - templ.mean()
+    expected = (a * b).sum() / np.sqrt((a * a).sum() * (b * b).sum())
+    assert abs(scores[3, 2] - expected) < 1e-6
+
+
+def test_store_relocates_moved_patch(tmp_path):
+    store = TemplateStore(root=str(tmp_path))
+    key = store.make_key("gedit", "click save button")
+    assert store.remember(key, _frame(), (100, 80, 61, 31))
+
+    hit = store.locate(key, _frame(offset=(25, -10)))
+    assert hit is not None and hit.score > 0.95
+    assert hit.bbox == (125, 70, 61, 31)
+
+    # persisted index is reloaded by a fresh store
+    assert TemplateStore(root=str(tmp_path)).locate(key, _frame()) is not None
+    assert store.locate(store.make_key("other", "click save button"), _frame()) is None
+
+
+def test_adapter_learns_validated_detection(tmp_path):
+    shot = tmp_path / "shot.png"
+    _frame().save(shot)
+    adapter = TemplateAdapter(store=TemplateStore(root=str(tmp_path / "store")))
+    step = {"image_path": str(shot), "text": "button", "description": "Click Save button", "app": "gedit"}
+
+    assert adapter.detect(step)["bbox"] is None
+    assert adapter.learn(step, {"bbox": [100, 80, 61, 31]})
+    res = adapter.detect(step)
+    assert res["type"] == "template" and res["bbox"] == [100, 80, 61, 31]
+
+
+def test_failed_validation_evicts_the_template(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.setattr(registry, "_adapters", dict(registry._adapters))
+    monkeypatch.setattr(registry, "_contracts", dict(registry._contracts))
+    monkeypatch.setattr(executor_agent, "active_window_info", lambda: {"app": "gedit"})
+    shot = str(tmp_path / "shot.png")
+    _frame().save(shot)
+    store = TemplateStore(root=str(tmp_path / "store"))
+    template = TemplateAdapter(store=store)
+    # a patch remembered at the wrong place (the circle, not the Save button)
+    assert template.learn({"image_path": shot, "description": "Click Save button", "app": "gedit"},
+                          {"bbox": [300, 200, 31, 31]})
+    registry.register_adapter("tpl_template", template)
+    registry.register_adapter("tpl_cascade", CascadeDetector(tiers=[("tpl_template", 0.9)]))
+    executor = ExecutorAgent(default_detection="tpl_cascade", output_dir=str(tmp_path),
+                             ui_atlas=UIAtlas(path=str(tmp_path / "atlas.json")))
+
+    assert executor._detect_bbox("Click Save button", image_path=shot) == [300, 200, 31, 31]
+    key = store.make_key("gedit", "click save button")
+    assert TemplateStore(root=store.root)._index[key][0]["hits"] == 1  # persisted, not only in memory
+
+    executor._reject_detection()  # the click did not validate
+    assert store.locate(key, _frame()) is None
+    assert key not in TemplateStore(root=store.root).keys()
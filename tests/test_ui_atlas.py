@@ -0,0 +1,54 @@
+from PIL import Image, ImageDraw
+
+from os_automation.tools.ui_atlas import UIAtlas
+from os_automation.utils.window_info import window_fingerprint
+
+
+def _screen(win_x=100, win_y=50, label_color=(20, 120, 220)):
+    img = Image.new("RGB", (800, 600), (200, 200, 200))
+    d = ImageDraw.Draw(img)
+    d.rectangle([win_x, win_y, win_x + 400, win_y + 300], fill=(250, 250, 250))
+    # a button inside the window with some texture
+    d.rectangle([win_x + 40, win_y + 60, win_x + 120, win_y + 90], fill=label_color)
+    d.rectangle([win_x + 50, win_y + 70, win_x + 70, win_y + 80], fill="white")
+    return img
+
+
+def test_atlas_persists_and_follows_window(tmp_path):
+    path = str(tmp_path / "atlas.json")
+    atlas = UIAtlas(path=path)
+    atlas.record("gedit", "click save button", _screen(), [140, 110, 81, 31], window=[100, 50, 401, 301])
+
+    reloaded = UIAtlas(path=path)
+    assert len(reloaded) == 1
+    # window moved: relative coordinates follow it
+    bbox = reloaded.lookup("gedit", "click save button", _screen(300, 200), window=[300, 200, 401, 301])
+    assert bbox == [340, 260, 81, 31]
+    assert reloaded.lookup("gedit", "click open button", _screen()) is None
+
+
+def test_atlas_rejects_changed_appearance_and_invalidates(tmp_path):
+    atlas = UIAtlas(path=str(tmp_path / "atlas.json"))
+    atlas.record("app", "target", _screen(), [140, 110, 81, 31])
+
+    blank = Image.new("RGB", (800, 600), (200, 200, 200))
+    ImageDraw.Draw(blank).rectangle([140, 110, 180, 125], fill="black")
+    assert atlas.lookup("app", "target", blank) is None
+
+    assert atlas.lookup("app", "target", _screen()) == [140, 110, 81, 31]
+    atlas.invalidate("app", "target")
+    assert atlas.lookup("app", "target", _screen()) is None
+
+
+def test_window_fingerprint():
+    assert window_fingerprint({"app": "Gedit", "title": "notes.txt - gedit"}) == "gedit"
+    assert window_fingerprint({"app": "Code", "title": "a.py - proj - Visual Studio Code"}) == "code|visual studio code"
+    assert window_fingerprint({}) == ""
+
+
+def test_executor_keeps_its_atlas_in_output_dir(tmp_path, monkeypatch):
+    from os_automation.agents.executor_agent import ExecutorAgent
+
+    monkeypatch.delenv("UI_ATLAS_PATH", raising=False)
+    executor = ExecutorAgent(output_dir=str(tmp_path))
+    assert executor.atlas.path == str(tmp_path / "ui_atlas.json")
@@ -0,0 +1,75 @@
+import numpy as np
+
+from os_automation.agents import executor_agent
+from os_automation.agents.executor_agent import ExecutorAgent
+from os_automation.core.registry import registry
+from os_automation.core.step_compiler import compile_step
+from os_automation.repos.virtual_screen_adapter import VirtualScreenAdapter
+from os_automation.tools.ui_atlas import UIAtlas
+from os_automation.tools.virtual_screen import VirtualScreen
+
+SCENE = [
+    {"type": "field", "label": "Search field", "bbox": [20, 20, 300, 30]},
+    {"type": "button", "label": "Go", "bbox": [340, 20, 60, 30], "submit": True,
+     "set": {"Result": "searched"}, "show": ["Next"], "hide": ["Go"]},
+    {"type": "button", "label": "Next", "bbox": [420, 20, 60, 30], "hidden": True},
+    {"type": "label", "label": "Result", "bbox": [20, 70, 300, 30], "text": "idle"},
+]
+
+
+def _pixels(screen):
+    return np.asarray(screen.screenshot())
+
+
+def test_inputs_change_state_and_pixels():
+    screen = VirtualScreen(SCENE, width=500, height=120)
+    blank = _pixels(screen)
+    screen.write("ignored")  # nothing focused
+    assert screen.fields() == {"Search field": ""}
+
+    screen.click(50, 30)
+    screen.write("cats")
+    screen.press("backspace")
+    typed = _pixels(screen)
+    assert screen.fields() == {"Search field": "cat"}
+    assert (typed != blank).any()
+
+    assert screen.find("Click the Next button") is None  # hidden
+    go = screen.find("Click the Go button")
+    screen.click(go.bbox[0] + 5, go.bbox[1] + 5)
+    assert screen.state["submitted"] == {"Search field": "cat"}
+    assert screen.widget("Result").text == "searched"
+    assert screen.find("Next").label == "Next" and screen.find("Go") is None
+    assert screen.size() == (500, 120)
+
+
+def test_adapter_detects_and_executes():
+    adapter = VirtualScreenAdapter(VirtualScreen(SCENE))
+    hit = adapter.detect({"text": "field", "description": "Click the Search field"})
+    assert hit["bbox"] == [20, 20, 300, 30] and hit["confidence"] == 1.0
+    assert adapter.detect({"text": "nothing"})["type"] == "no_match"
+    adapter.execute({"event": "click", "bbox": hit["bbox"]})
+    adapter.execute({"event": "type", "bbox": hit["bbox"], "text": "x"})
+    assert adapter.screen.fields() == {"Search field": "x"}
+
+    always_miss = VirtualScreenAdapter(VirtualScreen(SCENE), miss_rate=1.0)
+    assert always_miss.detect({"text": "Go"})["bbox"] is None
+
+
+def test_executor_runs_steps_on_the_virtual_screen(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)  # local rewrite, no LLM tie-breaks
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.setattr(registry, "_adapters", dict(registry._adapters))  # registrations end with the test
+    monkeypatch.setattr(registry, "_contracts", dict(registry._contracts))
+    adapter = VirtualScreenAdapter()
+    registry.register_adapter("virtual_screen", adapter)
+    executor = ExecutorAgent(default_detection="virtual_screen", default_executor="virtual_screen",
+                             output_dir=str(tmp_path), ui_atlas=UIAtlas(path=str(tmp_path / "atlas.json")))
+    other = ExecutorAgent(output_dir=str(tmp_path / "other"), ui_atlas=UIAtlas(path=str(tmp_path / "other.json")))
+    assert executor.screen is adapter.screen and other.screen is executor_agent.pyautogui  # per executor
+
+    for i, description in enumerate(["Click the Name field", "Type 'Ada'", "Click the Register button"], 1):
+        outcome = executor.run_step_op(compile_step({"step_id": i, "description": description}))
+        assert outcome.validation.passed, (description, outcome.validation)
+    assert adapter.screen.state["submitted"]["Name field"] == "Ada"
+    assert adapter.screen.widget("Status").text == "registered"